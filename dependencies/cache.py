@@ -0,0 +1,96 @@
+import threading
+import time
+from collections import OrderedDict
+
+DEFAULT_TTL_SECONDS = 300
+DEFAULT_MAX_ENTRIES = 4096
+
+
+class TTLCache:
+    """TTL + LRU 캐시. 이벤트 루프와 수집 워커 스레드에서 함께 쓰므로 잠금으로 보호한다.
+
+    조회 결과가 없을 때(None)는 캐시하지 않는다. 새로 등록된 행은 다음 조회 때 바로 보인다.
+    """
+
+    def __init__(self, name, ttl=DEFAULT_TTL_SECONDS, max_entries=DEFAULT_MAX_ENTRIES):
+        self.name = name
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at > time.monotonic():
+                    self.entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self.entries[key]
+            self.misses += 1
+            return None
+
+    def set(self, key, value):
+        if value is None:
+            return None
+        with self.lock:
+            self.entries[key] = (value, time.monotonic() + self.ttl)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+        return value
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self.entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+            }
+
+
+# 프로세스 전역 참조 데이터 캐시 (id -> 행, 이름 -> 행)
+user_cache = TTLCache("user")
+store_cache = TTLCache("store")
+camera_cache = TTLCache("camera")
+event_type_cache = TTLCache("event_type")
+# 수집 워커용: output/<user>/<store> 디렉터리 -> (user_id, store_id, camera_id)
+path_ids_cache = TTLCache("path_ids")
+
+CACHES = [user_cache, store_cache, camera_cache, event_type_cache, path_ids_cache]
+
+
+def invalidate_users():
+    user_cache.clear()
+    path_ids_cache.clear()
+
+
+def invalidate_stores():
+    store_cache.clear()
+    path_ids_cache.clear()
+
+
+def invalidate_cameras():
+    camera_cache.clear()
+    path_ids_cache.clear()
+
+
+def invalidate_event_types():
+    event_type_cache.clear()
+
+
+def cache_stats():
+    return {cache.name: cache.stats() for cache in CACHES}
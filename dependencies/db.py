@@ -1,11 +1,59 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, inspect, text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
-import sqlite3
 
 DB_PATH = "cctv_system.db"
-engine = create_engine(f"sqlite:///{DB_PATH}", connect_args={"check_same_thread": False})
+
+# 라우트는 비동기 엔진(aiosqlite), 수집 워커/마이그레이션/스크립트는 동기 엔진을 쓴다. 두 엔진 모두 같은 설정의 연결 풀이다
+POOL_SIZE = 8
+POOL_MAX_OVERFLOW = 16
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",          # 수집 워커가 쓰는 동안에도 API 읽기가 막히지 않는다
+    "synchronous": "NORMAL",        # WAL에서는 NORMAL로도 DB가 깨지지 않는다 (전원 장애 시 마지막 커밋만 유실 가능)
+    "busy_timeout": 5000,           # 쓰기 잠금 대기 (ms)
+    "cache_size": -32000,           # 연결당 페이지 캐시 32MB
+    "mmap_size": 256 * 1024 * 1024,
+    "temp_store": "MEMORY",
+}
+# 빈 DB에 넣는 기본 이벤트 종류 (id, type, risk_level). id는 탐지기의 기본값(yolo/detect.py DEFAULT_EVENT_TYPES)과 같다
+DEFAULT_EVENT_TYPES = [
+    (1, "theft", "high"),
+    (2, "fall", "medium"),
+    (3, "fight", "high"),
+    (4, "smoke", "low"),
+]
+
+def set_sqlite_pragmas(dbapi_connection, _):
+    cursor = dbapi_connection.cursor()
+    for name, value in SQLITE_PRAGMAS.items():
+        cursor.execute(f"PRAGMA {name}={value}")
+    cursor.close()
+
+def create_db_engine(db_path=DB_PATH):
+    db_engine = create_engine(
+        f"sqlite:///{db_path}",
+        connect_args={"check_same_thread": False, "cached_statements": 256}, # 연결별 prepared statement 캐시
+        pool_size=POOL_SIZE,
+        max_overflow=POOL_MAX_OVERFLOW,
+    )
+    event.listen(db_engine, "connect", set_sqlite_pragmas)
+    return db_engine
+
+def create_async_db_engine(db_path=DB_PATH):
+    db_engine = create_async_engine(
+        f"sqlite+aiosqlite:///{db_path}",
+        connect_args={"cached_statements": 256},
+        pool_size=POOL_SIZE,
+        max_overflow=POOL_MAX_OVERFLOW,
+    )
+    event.listen(db_engine.sync_engine, "connect", set_sqlite_pragmas)
+    return db_engine
+
+engine = create_db_engine()
 SessionLocal = sessionmaker(bind=engine, autoflush=False)
+async_engine = create_async_db_engine()
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
 Base = declarative_base()
 
 def get_db():
@@ -15,7 +63,40 @@ def get_db():
     finally:
         db.close()
 
-def get_connection():
-    conn = sqlite3.connect(DB_PATH, check_same_thread=False)
-    conn.row_factory = sqlite3.Row
-    return conn
\ No newline at end of file
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+def migrate_db():
+    # create_all은 이미 있는 테이블에 컬럼/인덱스를 추가하지 않으므로 시작할 때 빠진 것을 만든다
+    with engine.begin() as conn:
+        event_columns = {column["name"] for column in inspect(conn).get_columns("event")}
+        if "playlist_url" not in event_columns:
+            conn.execute(text("ALTER TABLE event ADD COLUMN playlist_url VARCHAR"))
+        event_indexes = {index["name"] for index in inspect(conn).get_indexes("event")}
+        if "ux_event_video_url" not in event_indexes:
+            # unique 인덱스를 만들기 전에 같은 클립으로 중복 저장된 이벤트는 가장 먼저 들어온 것만 남긴다.
+            # 지운 행은 나중에 추적할 수 있도록 video_url별로 남긴 id와 지운 id를 로그에 남긴다
+            duplicates = conn.execute(text(
+                "SELECT video_url, MIN(id), GROUP_CONCAT(id) FROM event WHERE video_url IS NOT NULL "
+                "GROUP BY video_url HAVING COUNT(*) > 1"
+            )).all()
+            if duplicates:
+                removed = conn.execute(text(
+                    "DELETE FROM event WHERE video_url IS NOT NULL AND id NOT IN "
+                    "(SELECT MIN(id) FROM event WHERE video_url IS NOT NULL GROUP BY video_url)"
+                )).rowcount
+                print(f"[migrate_db] Removed {removed} duplicate event rows for {len(duplicates)} video_urls "
+                      f"before creating ux_event_video_url")
+                for video_url, kept_id, ids in duplicates:
+                    removed_ids = sorted(int(event_id) for event_id in ids.split(",") if int(event_id) != kept_id)
+                    print(f"[migrate_db]   {video_url}: kept id {kept_id}, removed ids {removed_ids}")
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(conn, checkfirst=True)
+        # event_type이 비어 있으면 탐지기는 기본 종류로 클립을 만드는데 수집 워커는 종류를 몰라 모두 버리므로 같은 기본값을 넣는다
+        if conn.execute(text("SELECT COUNT(*) FROM event_type")).scalar() == 0:
+            conn.execute(text("INSERT INTO event_type (id, type, risk_level) VALUES (:id, :type, :risk_level)"),
+                         [{"id": type_id, "type": name, "risk_level": risk_level}
+                          for type_id, name, risk_level in DEFAULT_EVENT_TYPES])
+            print(f"[migrate_db] Seeded {len(DEFAULT_EVENT_TYPES)} default event types into empty event_type table")
\ No newline at end of file
@@ -0,0 +1,80 @@
+from sqlalchemy import select
+from dependencies.cache import user_cache, store_cache, camera_cache, event_type_cache
+from dependencies.models import User, Store, Camera, EventType
+
+# 캐시에는 세션과 무관한 dict 스냅샷을 넣는다
+USER_FIELDS = ("id", "username", "email")
+STORE_FIELDS = ("id", "user_id", "name", "location")
+CAMERA_FIELDS = ("id", "user_id", "store_id", "name", "video_url", "image_url")
+EVENT_TYPE_FIELDS = ("id", "type", "risk_level")
+
+def to_row(obj, fields):
+    return {field: getattr(obj, field) for field in fields} if obj is not None else None
+
+async def get_user(db, user_id: int):
+    key = ("id", user_id)
+    row = user_cache.get(key)
+    if row is None:
+        row = user_cache.set(key, to_row(await db.get(User, user_id), USER_FIELDS))
+    return row
+
+async def get_store(db, store_id: int):
+    key = ("id", store_id)
+    row = store_cache.get(key)
+    if row is None:
+        row = store_cache.set(key, to_row(await db.get(Store, store_id), STORE_FIELDS))
+    return row
+
+async def find_store(db, name: str, user_id: int = None):
+    key = ("name", user_id, name)
+    row = store_cache.get(key)
+    if row is None:
+        statement = select(Store).where(Store.name == name)
+        if user_id is not None:
+            statement = statement.where(Store.user_id == user_id)
+        store = (await db.execute(statement.limit(1))).scalars().first()
+        row = store_cache.set(key, to_row(store, STORE_FIELDS))
+    return row
+
+async def find_camera(db, store_id: int, name: str):
+    key = ("name", store_id, name)
+    row = camera_cache.get(key)
+    if row is None:
+        camera = (await db.execute(
+            select(Camera).where(Camera.store_id == store_id, Camera.name == name).limit(1)
+        )).scalars().first()
+        row = camera_cache.set(key, to_row(camera, CAMERA_FIELDS))
+    return row
+
+async def list_cameras(db, store_id: int):
+    key = ("store", store_id)
+    rows = camera_cache.get(key)
+    if rows is None:
+        cameras = (await db.execute(select(Camera).where(Camera.store_id == store_id))).scalars().all()
+        rows = camera_cache.set(key, [to_row(camera, CAMERA_FIELDS) for camera in cameras])
+    return rows
+
+async def get_event_types(db):
+    # event_type 테이블 전체 (id -> 행). 행 수가 적으므로 통째로 캐시한다
+    types = event_type_cache.get("all")
+    if types is None:
+        rows = (await db.execute(select(EventType))).scalars().all()
+        types = event_type_cache.set("all", {row.id: to_row(row, EVENT_TYPE_FIELDS) for row in rows})
+    return types
+
+def load_event_type_ids(db):
+    # 수집 워커(동기 세션)용: 클립 파일 이름의 종류 -> type_id
+    ids = event_type_cache.get("ids_by_name")
+    if ids is None:
+        rows = db.execute(select(EventType)).scalars().all()
+        ids = event_type_cache.set("ids_by_name", {row.type.lower(): row.id for row in rows})
+    return ids
+
+async def find_event_type_ids(db, event_type: str = None, risk_level: str = None):
+    # 종류/위험도 필터를 type_id 목록으로 바꾼다. 필터가 없으면 None
+    if not event_type and not risk_level:
+        return None
+    return [
+        type_id for type_id, row in (await get_event_types(db)).items()
+        if (not event_type or row["type"] == event_type) and (not risk_level or row["risk_level"] == risk_level)
+    ]
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Index
 from sqlalchemy.orm import relationship
 from dependencies.db import Base
 from datetime import datetime
@@ -23,6 +23,10 @@ class Store(Base):
     cameras = relationship("Camera", back_populates="store")
     user = relationship("User") # User와의 관계 추가 (Store가 어떤 User에 속하는지)
 
+    __table_args__ = (
+        Index("ix_store_user_id_name", "user_id", "name"), # 사용자별 매장 조회
+    )
+
 
 class Camera(Base):
     __tablename__ = "camera"
@@ -37,6 +41,10 @@ class Camera(Base):
     store = relationship("Store", back_populates="cameras")
     user = relationship("User") # User와의 관계 추가 (Camera가 어떤 User에 속하는지)
 
+    __table_args__ = (
+        Index("ix_camera_store_id_name", "store_id", "name"), # 매장별 카메라 조회
+    )
+
 
 # --- 새로 추가되는 EventType 클래스 ---
 class EventType(Base):
@@ -59,9 +67,16 @@ class Event(Base):
 
     event_time = Column(DateTime, default=datetime.utcnow)
     video_url = Column(String, nullable=True)
+    playlist_url = Column(String, nullable=True) # HLS master.m3u8 (HLS 출력을 켠 경우에만)
 
     # 관계 설정: 다른 모델 객체에 접근할 수 있게 해줌
     user = relationship("User")
     store = relationship("Store")
     camera = relationship("Camera")
-    event_type = relationship("EventType") # EventType과의 관계 추가
\ No newline at end of file
+    event_type = relationship("EventType") # EventType과의 관계 추가
+
+    __table_args__ = (
+        Index("ix_event_user_id_event_time", "user_id", "event_time"), # 사용자 알림 조회 (get_alerts)
+        Index("ix_event_store_id_camera_id_event_time", "store_id", "camera_id", "event_time"), # 카메라별 이벤트 조회
+        Index("ux_event_video_url", "video_url", unique=True), # 클립 하나당 이벤트 하나
+    )
\ No newline at end of file
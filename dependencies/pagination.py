@@ -0,0 +1,62 @@
+import base64
+from datetime import datetime
+from fastapi import HTTPException, Response
+from sqlalchemy import tuple_
+from dependencies.models import Event
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+def encode_cursor(event: Event) -> str:
+    raw = f"{event.event_time.isoformat()}|{event.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        event_time, event_id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(event_time), int(event_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def filter_event_type(statement, type_ids=None):
+    # 이벤트 종류/위험도 필터는 캐시된 event_type 표로 type_id 목록을 만든 뒤 SQL 조건으로 넣는다 (lookups.find_event_type_ids)
+    if type_ids is not None:
+        statement = statement.where(Event.type_id.in_(type_ids))
+    return statement
+
+async def paginate_events(db, statement, response: Response, limit: int, before: str = None, after: str = None):
+    """(event_time, id) 기준 keyset 페이지네이션. statement는 Event를 조회하는 select()이고 결과는 항상 최신순이다.
+
+    before: 이 커서보다 오래된 이벤트 (다음 페이지), after: 이 커서보다 새로운 이벤트 (새 이벤트 확인).
+    X-Next-Cursor 헤더는 다음 before 값, X-Prev-Cursor 헤더는 다음 after 값이다.
+    """
+    if before and after:
+        raise HTTPException(status_code=400, detail="Use either before or after, not both")
+
+    key = tuple_(Event.event_time, Event.id)
+    if after:
+        # 커서 바로 다음의 limit개를 오래된 순으로 가져와 최신순으로 뒤집는다
+        statement = (
+            statement.where(key > decode_cursor(after))
+            .order_by(Event.event_time.asc(), Event.id.asc())
+            .limit(limit)
+        )
+        rows = (await db.execute(statement)).scalars().all()
+        events = rows[::-1]
+        has_older = True
+    else:
+        if before:
+            statement = statement.where(key < decode_cursor(before))
+        statement = statement.order_by(Event.event_time.desc(), Event.id.desc()).limit(limit + 1)
+        rows = (await db.execute(statement)).scalars().all()
+        events = rows[:limit]
+        has_older = len(rows) > limit
+
+    if events:
+        response.headers["X-Prev-Cursor"] = encode_cursor(events[0])
+        if has_older:
+            response.headers["X-Next-Cursor"] = encode_cursor(events[-1])
+    elif after:
+        response.headers["X-Prev-Cursor"] = after
+    return events
@@ -48,18 +48,35 @@ class CameraOut(BaseModel):
         from_attributes = True
 
 class VideoInfo(BaseModel):
+    id: int
     date: str
     url: str
     type: str
     risk_level: str
+    thumbnail_url: Optional[str] = None
+    playlist_url: Optional[str] = None
 
 class Alert(BaseModel):
+    id: int
     user_id: int
     store_id: int
     camera_id: int
     type_id: int
     event_time: datetime
     video_url: Optional[str]
+    playlist_url: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
+class EventTypeCreate(BaseModel):
+    type: str
+    risk_level: str
+
+class EventTypeOut(BaseModel):
+    id: int
+    type: str
+    risk_level: str
 
     class Config:
         from_attributes = True
@@ -69,4 +86,5 @@ class EventCreate(BaseModel):
     store_id: int
     camera_id: int
     type_id: int
-    video_url: Optional[str] = None
\ No newline at end of file
+    video_url: Optional[str] = None
+    playlist_url: Optional[str] = None
\ No newline at end of file
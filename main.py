@@ -1,19 +1,32 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
-from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
-from dependencies.db import Base, engine
+from dependencies.db import Base, engine, migrate_db
 import uvicorn
 
 from routes.auth import auth_router
 from routes.store import store_router
 from routes.camera import camera_router
 from routes.user import user_router
-from routes.events import events_router
+from routes.events import events_router, notify_clip_finished, start_ingestion
+from routes.detection import detection_router, detection_service
+from routes.media import media_router
+from routes.previews import previews_router
 
 # DB 테이블 생성
 Base.metadata.create_all(bind=engine)
+migrate_db()
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 탐지 워커 프로세스는 앱 수명 동안 한 번만 띄운다. 완성된 클립은 바로 이벤트 수집 큐로 전달된다
+    detection_service.start(on_clip_saved=notify_clip_finished)
+    # 이벤트 수집 워커도 로그인마다가 아니라 앱 시작 시 한 번만 띄운다
+    start_ingestion()
+    yield
+    detection_service.shutdown()
+
+app = FastAPI(lifespan=lifespan)
 
 # CORS 설정
 app.add_middleware(
@@ -22,18 +35,20 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Prev-Cursor", # 이벤트 목록 페이지네이션 커서
+                    "Accept-Ranges", "Content-Range", "Content-Length", "ETag", "Last-Modified"], # 영상 탐색(Range)
 )
 
-# Static 파일
-app.mount("/videos", StaticFiles(directory="videos"), name="videos")
-app.mount("/output", StaticFiles(directory="output"), name="output")
-
 # 라우터 등록
 app.include_router(auth_router)
 app.include_router(store_router)
 app.include_router(camera_router)
 app.include_router(user_router)
 app.include_router(events_router)
+app.include_router(detection_router)
+app.include_router(previews_router)
+# /videos, /output 정적 파일 (Range/조건부 요청/캐시 헤더)
+app.include_router(media_router)
 
 if __name__ == "__main__":
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
@@ -0,0 +1,104 @@
+import asyncio
+import json
+import threading
+
+from dependencies.pagination import encode_cursor
+
+HEARTBEAT_SECONDS = 15
+SUBSCRIBER_QUEUE_SIZE = 100
+
+
+def alert_payload(event):
+    return {
+        "id": event.id,
+        "user_id": event.user_id,
+        "store_id": event.store_id,
+        "camera_id": event.camera_id,
+        "type_id": event.type_id,
+        "event_time": event.event_time.isoformat(),
+        "video_url": event.video_url,
+        "playlist_url": event.playlist_url,
+        "cursor": encode_cursor(event),
+    }
+
+
+class AlertBroker:
+    """사용자별 구독자에게 새 이벤트를 나눠 주는 프로세스 내 pub/sub.
+
+    구독자는 이벤트 루프의 asyncio.Queue로 기다리므로 대기 중인 연결은 DB 조회도 스레드도 쓰지 않는다.
+    publish는 수집 워커 스레드나 동기 라우트에서 호출해도 된다.
+    """
+
+    def __init__(self, queue_size=SUBSCRIBER_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self.subscribers = {}
+        self.lock = threading.Lock()
+
+    def subscribe(self, user_id):
+        subscriber = (asyncio.Queue(maxsize=self.queue_size), asyncio.get_running_loop())
+        with self.lock:
+            self.subscribers.setdefault(user_id, set()).add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, user_id, subscriber):
+        with self.lock:
+            subscribers = self.subscribers.get(user_id)
+            if subscribers is not None:
+                subscribers.discard(subscriber)
+                if not subscribers:
+                    del self.subscribers[user_id]
+
+    def publish(self, user_id, payload):
+        with self.lock:
+            subscribers = list(self.subscribers.get(user_id, ()))
+        for queue, loop in subscribers:
+            try:
+                loop.call_soon_threadsafe(self._put, queue, payload)
+            except RuntimeError:
+                pass  # 이미 닫힌 이벤트 루프
+
+    @staticmethod
+    def _put(queue, payload):
+        try:
+            queue.put_nowait(payload)
+        except asyncio.QueueFull:
+            # 따라오지 못하는 클라이언트는 끊고, 재접속 시 Last-Event-ID로 DB에서 이어 받게 한다
+            queue.overflowed = True
+
+    def subscriber_count(self):
+        with self.lock:
+            return sum(len(subscribers) for subscribers in self.subscribers.values())
+
+
+def format_sse(payload):
+    return f"id: {payload['cursor']}\nevent: alert\ndata: {json.dumps(payload)}\n\n"
+
+
+async def alert_event_stream(request, user_id, backlog, subscriber):
+    """backlog(재접속 시 놓친 이벤트, 페이지 단위로 읽는 async iterator)를 먼저 보내고,
+    이후 broker로 들어오는 이벤트와 heartbeat를 보낸다"""
+    queue, _ = subscriber
+    # backlog 조회 중에 publish된 이벤트는 두 번 보내지 않는다
+    backlog_ids = set()
+    try:
+        yield "retry: 3000\n\n"
+        async for payload in backlog:
+            backlog_ids.add(payload["id"])
+            yield format_sse(payload)
+
+        while True:
+            if getattr(queue, "overflowed", False) or await request.is_disconnected():
+                break
+            try:
+                payload = await asyncio.wait_for(queue.get(), timeout=HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            if payload["id"] in backlog_ids:
+                continue
+            yield format_sse(payload)
+    finally:
+        alert_broker.unsubscribe(user_id, subscriber)
+
+
+alert_broker = AlertBroker()
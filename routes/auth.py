@@ -1,12 +1,15 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from dependencies.models import User, Store
 from dependencies.schemas import SignUpModel, SignInRequest
-from dependencies.db import get_db
+from dependencies.db import get_async_db
+from dependencies.cache import invalidate_users
 from routes import events
-import hashlib, os, subprocess
+import hashlib, os
 from datetime import datetime
-from routes.events import start_alert_scheduler
+from routes.detection import detection_service
 
 auth_router = APIRouter()
 
@@ -17,12 +20,13 @@ def normalize_username(username: str) -> str:
     return username.strip().lower().replace(" ", "_")
 
 @auth_router.post("/signup")
-def signup(user: SignUpModel, db: Session = Depends(get_db)):
+async def signup(user: SignUpModel, db: AsyncSession = Depends(get_async_db)):
     hashed_pw = hash_password(user.password)
     new_user = User(username=user.username, email=user.email, password_hash=hashed_pw)
     try:
         db.add(new_user)
-        db.commit()
+        await db.commit()
+        invalidate_users()
 
         username = user.username
         video_dir = os.path.join("videos", username)
@@ -31,16 +35,16 @@ def signup(user: SignUpModel, db: Session = Depends(get_db)):
         os.makedirs(output_dir, exist_ok=True)
 
     except:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=400, detail="Username or email already exists.")
 
     return {"message": "User created successfully"}
 
 @auth_router.post("/login")
-def login(req: SignInRequest, db: Session = Depends(get_db)):
-    user = db.query(User).filter(
-        (User.email == req.identifier) | (User.username == req.identifier)
-    ).first()
+async def login(req: SignInRequest, db: AsyncSession = Depends(get_async_db)):
+    user = (await db.execute(
+        select(User).where((User.email == req.identifier) | (User.username == req.identifier))
+    )).scalars().first()
 
     hashed_input_pw = hash_password(req.password)
     if not user or user.password_hash != hashed_input_pw:
@@ -49,24 +53,17 @@ def login(req: SignInRequest, db: Session = Depends(get_db)):
     normalized_username = normalize_username(user.username)
 
     try:
-        stores = db.query(Store).filter(Store.user_id == user.id).all()
-        for store in stores:
-            clips_path = os.path.join("videos", normalized_username, store.name, "clips")
-            output_path = os.path.join("output", normalized_username, store.name)
-            if not os.path.exists(clips_path):
-                continue
-            yolo_script = os.path.join("yolo", "process_videos.py")
-            cmd = ["python", yolo_script, "--video_dir", clips_path, "--output_base", output_path, "--debug"]
-            subprocess.Popen(cmd)
-
-        # 스케줄러 실행
-        start_alert_scheduler(user.id, normalized_username)
+        # 탐지 작업은 상주 탐지 서비스 큐에 넣기만 한다 (같은 카메라/영상은 중복 실행되지 않음)
+        stores = (await db.execute(select(Store.name).where(Store.user_id == user.id))).scalars().all()
+        for store_name in stores:
+            clips_path = os.path.join("videos", normalized_username, store_name, "clips")
+            output_path = os.path.join("output", normalized_username, store_name)
+            # 영상 폴더 조회/stat은 파일 I/O이므로 이벤트 루프 밖에서 한다
+            await run_in_threadpool(detection_service.enqueue_directory, clips_path, output_path)
 
     except Exception as e:
+        # 탐지 작업을 넣지 못해도 로그인은 성공시킨다 (다음 로그인이나 카메라 등록 때 다시 넣는다)
         print(f"Error during YOLO execution: {e}")
-        # 로그인 시간 갱신도 실패할 수 있으니 여기서도 갱신하도록 함
-        events.user_last_login_time[user.id] = datetime.utcnow()
-        raise HTTPException(status_code=500, detail="Post login processing failed")
 
     # 로그인 시간 기록 (try-except 밖, 무조건 갱신)
     events.user_last_login_time[user.id] = datetime.utcnow()
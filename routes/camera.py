@@ -1,44 +1,41 @@
-from fastapi import APIRouter, HTTPException, Query, Depends
-from sqlalchemy.orm import Session
-from typing import List
-from datetime import datetime
-import requests
+from fastapi import APIRouter, HTTPException, Query, Depends, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
 import os
-import shutil
-import subprocess
-from dependencies.db import get_db, get_connection
+from dependencies.db import get_async_db
 from dependencies.schemas import CameraCreate, VideoInfo, CameraOut
-from dependencies.models import Camera, Store, User
+from dependencies.models import Camera, Event
+from dependencies.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, filter_event_type, paginate_events
+from dependencies.lookups import get_user, get_store, find_store, find_camera, list_cameras, get_event_types, find_event_type_ids
+from dependencies.cache import invalidate_cameras
+from routes.detection import detection_service
+from routes.media_import import media_imports, start_camera_import
+from routes.previews import event_thumbnail_url
 
 camera_router = APIRouter()
 
 def sanitize_name(name: str) -> str:
     return name.lower().replace(' ', '_')
 
-def download_file(url: str, dest: str) -> bool:
-    import requests
+def queue_camera_detection(video_path: str, output_base: str, cam_name: str):
+    # 결과는 output/[username]/[storename]/[cam_name] 에 저장된다
     try:
-        response = requests.get(url, stream=True)
-        if response.status_code == 200:
-            with open(dest, "wb") as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    f.write(chunk)
-            return True
-        return False
+        job = detection_service.enqueue(video_path, output_base, camera=cam_name)
+        print(f"YOLO job {job['id']} queued for: {video_path}")
     except Exception as e:
-        print(f"Download failed: {e}")
-        return False
+        print(f"Failed to queue YOLO job: {e}")
 
 @camera_router.post("/api/cameras", response_model=CameraOut)
-def register_camera(camera: CameraCreate, db: Session = Depends(get_db)):
-    # 사용자 및 매장 정보 조회
-    user = db.query(User).filter(User.id == camera.user_id).first()
-    store = db.query(Store).filter(Store.id == camera.store_id).first()
+async def register_camera(camera: CameraCreate, db: AsyncSession = Depends(get_async_db)):
+    # 사용자 및 매장 정보 조회 (캐시)
+    user = await get_user(db, camera.user_id)
+    store = await get_store(db, camera.store_id)
     if not user or not store:
         raise HTTPException(status_code=404, detail="User or Store not found")
 
-    username = user.username
-    storename = store.name
+    username = user["username"]
+    storename = store["name"]
     cam_name = sanitize_name(camera.name)
 
     # ---- 폴더 경로 생성 ----
@@ -54,38 +51,6 @@ def register_camera(camera: CameraCreate, db: Session = Depends(get_db)):
     dest_image_path = os.path.join(captures_path, f"{cam_name}.jpg")
     dest_video_path = os.path.join(clips_path, f"{cam_name}.mp4")
 
-    # ---- 이미지 복사 ----
-    try:
-        if camera.image_url.startswith("http"):
-            temp_image_path = "temp_image.jpg"
-            if download_file(camera.image_url, temp_image_path):
-                shutil.copy2(temp_image_path, dest_image_path)
-                os.remove(temp_image_path)
-            else:
-                print(f"Image download failed: {camera.image_url}")
-        elif os.path.exists(camera.image_url):
-            shutil.copy2(camera.image_url, dest_image_path)
-        else:
-            print(f"Image not found: {camera.image_url}")
-    except Exception as e:
-        print(f"Image copy error: {e}")
-
-    # ---- 동영상 복사 ----
-    try:
-        if camera.video_url.startswith("http"):
-            temp_video_path = "temp_video.mp4"
-            if download_file(camera.video_url, temp_video_path):
-                shutil.copy2(temp_video_path, dest_video_path)
-                os.remove(temp_video_path)
-            else:
-                print(f"Video download failed: {camera.video_url}")
-        elif os.path.exists(camera.video_url):
-            shutil.copy2(camera.video_url, dest_video_path)
-        else:
-            print(f"Video not found: {camera.video_url}")
-    except Exception as e:
-        print(f"Video copy error: {e}")
-
     # ---- HTTP URL 생성 ----
     http_base = "http://localhost:8000"
     image_http_url = f"{http_base}/videos/{username}/{storename}/captures/{cam_name}.jpg"
@@ -100,84 +65,83 @@ def register_camera(camera: CameraCreate, db: Session = Depends(get_db)):
         video_url=video_http_url,
     )
     db.add(db_camera)
-    db.commit()
-    db.refresh(db_camera)
+    await db.commit()
+    await db.refresh(db_camera)
+    invalidate_cameras()
 
-    # ---- YOLO 실행 ----
-    try:
-        yolo_script_path = os.path.abspath("yolo/process_videos.py")
-        subprocess.Popen([
-            "python", yolo_script_path,
-            "--video_dir", clips_path,
-            "--output_base", output_cam_path,
-            "--debug"
-        ])
-        print(f"YOLO process started for: {dest_video_path}")
-    except Exception as e:
-        print(f"Failed to start YOLO process: {e}")
+    # ---- 이미지/영상 가져오기 (백그라운드, 진행 상황은 /api/cameras/{id}/import) ----
+    # 영상이 준비되면 YOLO 탐지 서비스 큐에 등록한다
+    output_base = os.path.join("output", username, storename)
+
+    def on_import_complete(status):
+        if status["files"]["video"]["state"] == "done":
+            queue_camera_detection(dest_video_path, output_base, cam_name)
 
+    start_camera_import(db_camera.id, camera.image_url, dest_image_path, camera.video_url, dest_video_path,
+                        on_complete=on_import_complete)
     return db_camera
 
-# 특정 매장-카메라 조합의 이벤트 정보 조회
-@camera_router.get("/api/store/events", response_model=List[VideoInfo])
-def get_camera_events(store: str = Query(...), camera_label: str = Query(...)):
-    conn = get_connection()
-    cursor = conn.cursor()
+@camera_router.get("/api/cameras/{camera_id}/import")
+async def get_camera_import(camera_id: int):
+    status = media_imports.get(camera_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail="No media import for this camera")
+    return status
 
-    # 매장 ID 조회
-    cursor.execute("SELECT id FROM store WHERE name = ?", (store,))
-    store_row = cursor.fetchone()
+# 특정 매장-카메라 조합의 이벤트 정보 조회 (최신순, keyset 페이지네이션)
+@camera_router.get("/api/store/events", response_model=List[VideoInfo])
+async def get_camera_events(
+    response: Response,
+    store: str = Query(...),
+    camera_label: str = Query(...),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    before: Optional[str] = Query(None),
+    after: Optional[str] = Query(None),
+    type: Optional[str] = Query(None),
+    risk_level: Optional[str] = Query(None),
+    db: AsyncSession = Depends(get_async_db),
+):
+    # 매장 ID 조회 (캐시)
+    store_row = await find_store(db, store)
     if not store_row:
-        conn.close()
         raise HTTPException(status_code=404, detail="Store not found")
-    store_id = store_row["id"]
 
-    # 카메라 ID 조회
-    cursor.execute("SELECT id FROM camera WHERE store_id = ? AND name = ?", (store_id, camera_label))
-    cam_row = cursor.fetchone()
-    if not cam_row:
-        conn.close()
+    # 카메라 ID 조회 (캐시)
+    camera = await find_camera(db, store_row["id"], camera_label)
+    if not camera:
         raise HTTPException(status_code=404, detail="Camera not found")
-    camera_id = cam_row["id"]
-
-    # 이벤트 조회
-    cursor.execute('''
-        SELECT e.event_time, e.video_url, et.type, et.risk_level
-        FROM event e
-        JOIN event_type et ON e.type_id = et.id
-        WHERE e.store_id = ? AND e.camera_id = ?
-        ORDER BY e.event_time DESC
-    ''', (store_id, camera_id))
-
-    videos = []
-    for row in cursor.fetchall():
-        try:
-            formatted_date = datetime.fromisoformat(row["event_time"]).strftime("%Y-%m-%d")
-        except Exception:
-            formatted_date = row["event_time"]
-
-        videos.append({
-            "date": formatted_date,
-            "url": row["video_url"],
-            "type": row["type"],
-            "risk_level": row["risk_level"],
-        })
-
-    conn.close()
-    return videos
+
+    # 이벤트 조회 (종류/위험도는 캐시된 event_type 표에서 채운다)
+    event_types = await get_event_types(db)
+    statement = select(Event).where(Event.store_id == store_row["id"], Event.camera_id == camera["id"])
+    statement = filter_event_type(statement, await find_event_type_ids(db, type, risk_level))
+    events = await paginate_events(db, statement, response, limit, before, after)
+
+    unknown_type = {"type": "unknown", "risk_level": "unknown"}
+    return [
+        {
+            "id": event.id,
+            "date": event.event_time.strftime("%Y-%m-%d"),
+            "url": event.video_url,
+            "type": event_types.get(event.type_id, unknown_type)["type"],
+            "risk_level": event_types.get(event.type_id, unknown_type)["risk_level"],
+            "thumbnail_url": event_thumbnail_url(event),
+            "playlist_url": event.playlist_url,
+        }
+        for event in events
+    ]
 
 # 매장 이름과 userid로 카메라 목록 조회
 @camera_router.get("/api/store/cameras", response_model=List[CameraOut])
-def get_cameras_by_store(
+async def get_cameras_by_store(
     user_id: int = Query(..., description="User ID who owns the store"),
     store: str = Query(..., description="Store name"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    # 1. user_id와 store 이름으로 Store 객체 찾기
-    store_obj = db.query(Store).filter(Store.user_id == user_id, Store.name == store).first()
-    if not store_obj:
+    # 1. user_id와 store 이름으로 Store 찾기 (캐시)
+    store_row = await find_store(db, store, user_id)
+    if not store_row:
         raise HTTPException(status_code=404, detail="Store not found or user does not own the store")
 
-    # 2. store_id로 카메라 조회
-    cameras = db.query(Camera).filter(Camera.store_id == store_obj.id).all()
-    return cameras
\ No newline at end of file
+    # 2. store_id로 카메라 조회 (캐시)
+    return await list_cameras(db, store_row["id"])
\ No newline at end of file
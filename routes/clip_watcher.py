@@ -0,0 +1,139 @@
+import ctypes
+import ctypes.util
+import errno
+import os
+import struct
+import threading
+
+# inotify 이벤트 마스크 (linux/inotify.h)
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+
+_EVENT_HEADER = struct.Struct("iIII")
+
+# 클립이 생기지 않는 카메라 하위 폴더. HLS는 클립마다 폴더가 생기므로 감시하면 watch 수가 클립 수만큼 늘어난다
+SKIPPED_DIRS = {"hls", "thumbnails", "captures"}
+
+
+def is_clip_path(path: str) -> bool:
+    return path.endswith(".mp4") and os.path.basename(os.path.dirname(path)) == "clips"
+
+
+def walk_clip_dirs(path):
+    """os.walk와 같지만 SKIPPED_DIRS 아래는 내려가지 않는다"""
+    for dirpath, dirnames, filenames in os.walk(path):
+        dirnames[:] = [name for name in dirnames if name not in SKIPPED_DIRS]
+        yield dirpath, dirnames, filenames
+
+
+class ClipWatcher:
+    """output 폴더 트리를 inotify로 감시하다가 clips 폴더에 .mp4가 완성되면 on_clip(path)를 호출한다.
+
+    디렉터리 단위로만 watch를 걸고 클립마다 폴더가 생기는 SKIPPED_DIRS는 감시하지 않으므로
+    저장된 클립 수가 늘어나도 감시 비용은 늘지 않는다.
+    inotify를 쓸 수 없는 환경에서는 생성자에서 OSError가 발생한다.
+    watch를 걸지 못했거나(max_user_watches 한도 등) 이벤트 큐가 넘쳐 놓친 클립이 있을 수 있으면 on_overflow(reason)를 호출한다.
+    """
+
+    def __init__(self, base_dir, on_clip, on_overflow=None):
+        libc_name = ctypes.util.find_library("c")
+        if not libc_name:
+            raise OSError("libc not found")
+        libc = ctypes.CDLL(libc_name, use_errno=True)
+        if not hasattr(libc, "inotify_init1"):
+            raise OSError("inotify is not available")
+        libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+
+        self._libc = libc
+        self.fd = libc.inotify_init1(os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+        self.base_dir = base_dir
+        self.on_clip = on_clip
+        self.on_overflow = on_overflow
+        self.watch_failures = 0
+        self._overflow_reason = None
+        self.watches = {}
+        self.thread = None
+        self._add_tree(base_dir)
+
+    def _add_watch(self, path):
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), WATCH_MASK)
+        if wd >= 0:
+            self.watches[wd] = path
+            return
+        err = ctypes.get_errno()
+        if err == errno.ENOENT:
+            return  # 감시를 걸기 전에 지워진 폴더
+        self.watch_failures += 1
+        hint = " (fs.inotify.max_user_watches 한도)" if err == errno.ENOSPC else ""
+        print(f"[ClipWatcher] inotify_add_watch failed for {path}: {os.strerror(err)}{hint}")
+        self._overflow_reason = f"add_watch failed: {os.strerror(err)}"
+
+    def _report_overflow(self):
+        # 생성자에서 watch를 걸다 실패한 경우도 호출한 쪽의 잠금과 겹치지 않도록 감시 스레드에서 알린다
+        reason, self._overflow_reason = self._overflow_reason, None
+        if reason is not None and self.on_overflow is not None:
+            self.on_overflow(reason)
+
+    def _add_tree(self, path):
+        if os.path.basename(path) in SKIPPED_DIRS:
+            return
+        for dirpath, _, _ in walk_clip_dirs(path):
+            self._add_watch(dirpath)
+
+    def _on_new_directory(self, path):
+        # watch를 걸기 전에 이미 만들어진 클립이 있을 수 있으므로 새 디렉터리는 한 번 훑어본다
+        if os.path.basename(path) in SKIPPED_DIRS:
+            return
+        self._add_tree(path)
+        for dirpath, _, filenames in walk_clip_dirs(path):
+            for fname in filenames:
+                full_path = os.path.join(dirpath, fname)
+                if is_clip_path(full_path):
+                    self.on_clip(full_path)
+
+    def start(self):
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+        return self
+
+    def run(self):
+        while True:
+            self._report_overflow()
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except OSError:
+                break
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+                name = data[offset + _EVENT_HEADER.size:offset + _EVENT_HEADER.size + length].rstrip(b"\0")
+                offset += _EVENT_HEADER.size + length
+
+                if mask & IN_Q_OVERFLOW:
+                    print("[ClipWatcher] inotify event queue overflowed, some clip events were lost")
+                    self._overflow_reason = "event queue overflow"
+                    continue
+                if mask & IN_IGNORED:
+                    self.watches.pop(wd, None)
+                    continue
+                dir_path = self.watches.get(wd)
+                if dir_path is None or not name:
+                    continue
+                path = os.path.join(dir_path, os.fsdecode(name))
+
+                if mask & IN_ISDIR:
+                    if mask & (IN_CREATE | IN_MOVED_TO):
+                        self._on_new_directory(path)
+                elif mask & (IN_CLOSE_WRITE | IN_MOVED_TO) and is_clip_path(path):
+                    self.on_clip(path)
+
+    def close(self):
+        os.close(self.fd)
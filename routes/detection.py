@@ -0,0 +1,212 @@
+from fastapi import APIRouter, HTTPException, Query
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from typing import Optional
+import itertools
+import multiprocessing
+import os
+import sys
+import threading
+from dependencies.db import DB_PATH
+
+YOLO_DIR = "yolo"
+MODEL_PATH = os.path.join(YOLO_DIR, "best.pt")
+DETECTION_WORKERS = 2
+# 이벤트 클립을 mp4와 함께 여러 화질의 HLS로도 저장할지 (인코딩 시간이 늘어난다)
+DETECTION_HLS = False
+
+detection_router = APIRouter()
+
+# ---- 워커 프로세스 ----
+# 워커는 앱 수명 동안 유지되며 모델을 처음 한 번만 올려 두고 작업 사이에 재사용한다
+_worker_detector = None
+_worker_clip_queue = None
+
+def _init_detection_worker(yolo_dir, clip_queue):
+    global _worker_clip_queue
+    sys.path.insert(0, os.path.abspath(yolo_dir))
+    _worker_clip_queue = clip_queue
+
+def _notify_clip_saved(clip_path, img_path):
+    _worker_clip_queue.put(clip_path)
+
+def _run_detection_job(video_path, output_base, model_path, db_path, hls):
+    global _worker_detector
+    from detect import YOLODetector, YOLOEventClipper, load_event_types
+    if _worker_detector is None:
+        _worker_detector = YOLODetector(model_path)
+    # 이벤트 종류는 작업마다 event_type 테이블에서 다시 읽어 새로 추가된 종류도 바로 반영한다
+    clipper = YOLOEventClipper.run_for_path(video_path, output_base, debug=True,
+                                            detector=_worker_detector, on_clip_saved=_notify_clip_saved,
+                                            event_types=load_event_types(db_path), hls=hls)
+    return len(clipper.event_logs)
+
+
+class DetectionService:
+    def __init__(self, max_workers=DETECTION_WORKERS, model_path=MODEL_PATH, db_path=DB_PATH, hls=DETECTION_HLS):
+        self.max_workers = max_workers
+        self.model_path = model_path
+        self.db_path = db_path
+        self.hls = hls
+        self.executor = None
+        self.clip_queue = None
+        self.clip_forwarder = None
+        self.on_clip_saved = None
+        self.jobs = {}
+        self.job_ids_by_key = {}
+        self.job_counter = itertools.count(1)
+        self.lock = threading.Lock()
+
+    def start(self, on_clip_saved=None):
+        if on_clip_saved is not None:
+            self.on_clip_saved = on_clip_saved
+        if self.executor is None:
+            context = multiprocessing.get_context("spawn")
+            # 워커가 클립을 완성하면 경로를 이 큐로 보내고, 전달 스레드가 on_clip_saved로 넘긴다
+            self.clip_queue = context.Queue()
+            self.clip_forwarder = threading.Thread(target=self._forward_clips, args=(self.clip_queue,), daemon=True)
+            self.clip_forwarder.start()
+            self.executor = self._create_executor()
+
+    def _create_executor(self):
+        return ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_detection_worker,
+            initargs=(YOLO_DIR, self.clip_queue),
+        )
+
+    def _submit(self, *args):
+        # 워커가 죽으면(예: YOLO 중 OOM) 풀이 영구히 깨지므로 새 풀을 만들어 한 번 더 넣는다.
+        # 깨진 풀에 남아 있던 작업은 BrokenProcessPool로 실패 처리되고, 다시 enqueue하면 새 풀에서 실행된다
+        try:
+            return self.executor.submit(*args)
+        except BrokenProcessPool:
+            print("[Detection] worker pool is broken, restarting it")
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = self._create_executor()
+            return self.executor.submit(*args)
+
+    def shutdown(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+            self.clip_queue.put(None)
+            self.clip_queue = None
+
+    def _forward_clips(self, clip_queue):
+        while True:
+            clip_path = clip_queue.get()
+            if clip_path is None:
+                break
+            if self.on_clip_saved is not None:
+                self.on_clip_saved(clip_path)
+
+    def enqueue(self, video_path, output_base, camera=None):
+        # (카메라, 영상 경로)가 같은 작업이 대기/실행 중이거나 영상이 바뀌지 않은 채 끝났다면 다시 넣지 않는다
+        camera = camera or os.path.splitext(os.path.basename(video_path))[0]
+        key = (camera, os.path.abspath(video_path))
+        video_mtime = os.path.getmtime(video_path)
+
+        with self.lock:
+            job_id = self.job_ids_by_key.get(key)
+            if job_id is not None:
+                job = self.jobs[job_id]
+                status = self._status(job)
+                if status in ("queued", "running") or (status == "done" and job["video_mtime"] == video_mtime):
+                    return self._public(job)
+
+            if self.executor is None:
+                self.start()
+            # 제출에 성공한 작업만 등록한다 (future가 없는 작업이 남으면 조회/재등록이 모두 실패한다)
+            future = self._submit(_run_detection_job, video_path, output_base, self.model_path, self.db_path, self.hls)
+            job_id = next(self.job_counter)
+            job = {
+                "id": job_id,
+                "camera": camera,
+                "video_path": video_path,
+                "output_base": output_base,
+                "video_mtime": video_mtime,
+                "created_at": datetime.utcnow(),
+                "finished_at": None,
+                "clips": None,
+                "error": None,
+                "future": future,
+            }
+            self.jobs[job_id] = job
+            self.job_ids_by_key[key] = job_id
+        job["future"].add_done_callback(lambda future, job=job: self._on_done(job, future))
+        return self._public(job)
+
+    def enqueue_directory(self, video_dir, output_base):
+        if not os.path.isdir(video_dir):
+            return []
+        jobs = []
+        for f in sorted(os.listdir(video_dir)):
+            if not f.endswith(".mp4"):
+                continue
+            try:
+                jobs.append(self.enqueue(os.path.join(video_dir, f), output_base))
+            except Exception as e:
+                # 영상 하나를 넣지 못해도 나머지 영상은 계속 넣는다
+                print(f"[Detection] failed to enqueue {f}: {e}")
+        return jobs
+
+    def _on_done(self, job, future):
+        job["finished_at"] = datetime.utcnow()
+        if future.cancelled():
+            return
+        error = future.exception()
+        if error is not None:
+            job["error"] = str(error)
+            print(f"[Detection] job {job['id']} failed: {error}")
+        else:
+            job["clips"] = future.result()
+
+    def _status(self, job):
+        future = job["future"]
+        if future.cancelled():
+            return "cancelled"
+        if future.done():
+            return "failed" if job["error"] is not None or future.exception() is not None else "done"
+        return "running" if future.running() else "queued"
+
+    def _public(self, job):
+        return {
+            "id": job["id"],
+            "camera": job["camera"],
+            "video_path": job["video_path"],
+            "output_base": job["output_base"],
+            "status": self._status(job),
+            "created_at": job["created_at"],
+            "finished_at": job["finished_at"],
+            "clips": job["clips"],
+            "error": job["error"],
+        }
+
+    def get_job(self, job_id):
+        with self.lock:
+            job = self.jobs.get(job_id)
+            return self._public(job) if job else None
+
+    def list_jobs(self, status=None):
+        with self.lock:
+            jobs = [self._public(job) for job in self.jobs.values()]
+        if status:
+            jobs = [job for job in jobs if job["status"] == status]
+        return jobs
+
+
+detection_service = DetectionService()
+
+@detection_router.get("/api/detection/jobs")
+async def list_detection_jobs(status: Optional[str] = Query(None)):
+    return detection_service.list_jobs(status)
+
+@detection_router.get("/api/detection/jobs/{job_id}")
+async def get_detection_job(job_id: int):
+    job = detection_service.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
@@ -1,188 +1,443 @@
-from fastapi import APIRouter, Depends, Request, BackgroundTasks, HTTPException, Query
+from fastapi import APIRouter, Depends, Request, Response, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from datetime import datetime
-import os, time, threading, schedule, subprocess
+import os, time, queue, threading, schedule
 
-from dependencies.db import get_db
+from dependencies.db import get_async_db, SessionLocal, AsyncSessionLocal
 from dependencies.models import Event, User, Store, Camera, EventType
-from dependencies.schemas import Alert, EventCreate
+from dependencies.schemas import Alert, EventCreate, EventTypeCreate, EventTypeOut
+from dependencies.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, decode_cursor, filter_event_type, paginate_events
+from dependencies.lookups import get_user, get_store, get_event_types, find_event_type_ids, load_event_type_ids
+from dependencies.cache import path_ids_cache, cache_stats, invalidate_event_types
+from routes.camera import sanitize_name
+from routes.detection import detection_service
+from routes.clip_watcher import ClipWatcher, is_clip_path, walk_clip_dirs
+from routes.alert_stream import alert_broker, alert_event_stream, alert_payload
 
 BASE_OUTPUT_DIR = "output"
 MIN_ALERT_INTERVAL = 1
+INGEST_BATCH_SIZE = 500
+URL_QUERY_CHUNK = 500
 processed_files = set()
 last_alert_time_for_auto_event = datetime.min
 last_alert_lock = threading.Lock()
 
+# 완성된 클립 경로 큐: 탐지 서비스 알림과 inotify 감시(또는 폴링) 결과가 모두 여기로 들어온다
+clip_queue = queue.Queue()
+ingestion_thread = None
+clip_watcher = None
+polling_thread = None
+ingestion_lock = threading.Lock()
+ingestion_stats = {
+    "watch_mode": None,
+    "watch_started_at": None,
+    "watches": 0,
+    "watch_failures": 0,
+    "ingested_clips": 0,
+    "created_events": 0,
+    "last_ingest_seconds": 0.0,
+    "max_ingest_seconds": 0.0,
+    "scans": 0,
+    "last_scan_seconds": 0.0,
+    "max_scan_seconds": 0.0,
+}
+ingestion_stats_lock = threading.Lock()
+
 user_last_login_time = {}
 events_router = APIRouter()
 
 @events_router.get("/api/user/alerts/", response_model=List[Alert])
-def get_alerts(request: Request, db: Session = Depends(get_db)):
+async def get_alerts(
+    request: Request,
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    before: Optional[str] = Query(None),
+    after: Optional[str] = Query(None),
+    type: Optional[str] = Query(None),
+    risk_level: Optional[str] = Query(None),
+    db: AsyncSession = Depends(get_async_db),
+):
     user_id = int(request.query_params.get("user_id", 0))
     if user_id not in user_last_login_time:
         raise HTTPException(status_code=401, detail="Please login first to view alerts.")
 
     login_time = user_last_login_time[user_id]
-    events = (
-        db.query(Event)
-        .filter(Event.user_id == user_id)
-        .filter(Event.event_time >= login_time)
-        .order_by(Event.event_time.desc())
-        .all()
-    )
+    statement = select(Event).where(Event.user_id == user_id, Event.event_time >= login_time)
+    statement = filter_event_type(statement, await find_event_type_ids(db, type, risk_level))
+    events = await paginate_events(db, statement, response, limit, before, after)
     return [Alert.from_orm(event) for event in events]
 
+@events_router.get("/api/user/alerts/stream")
+async def stream_alerts(request: Request, user_id: int = Query(...), last_event_id: Optional[str] = Query(None)):
+    # SSE로 새 이벤트를 바로 보낸다. 재접속 시 Last-Event-ID(또는 last_event_id) 이후 놓친 이벤트부터 이어 보낸다
+    if user_id not in user_last_login_time:
+        raise HTTPException(status_code=401, detail="Please login first to view alerts.")
+
+    last_event_id = request.headers.get("last-event-id") or last_event_id
+    subscriber = alert_broker.subscribe(user_id)
+    first_page = []
+    if last_event_id:
+        try:
+            first_page = await load_alert_backlog(user_id, last_event_id)
+        except Exception:
+            alert_broker.unsubscribe(user_id, subscriber)
+            raise
+    return StreamingResponse(
+        alert_event_stream(request, user_id, iter_alert_backlog(user_id, first_page), subscriber),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+async def load_alert_backlog(user_id: int, cursor: str):
+    async with AsyncSessionLocal() as db:
+        events = (await db.execute(
+            select(Event)
+            .where(Event.user_id == user_id, tuple_(Event.event_time, Event.id) > decode_cursor(cursor))
+            .order_by(Event.event_time.asc(), Event.id.asc())
+            .limit(MAX_PAGE_SIZE)
+        )).scalars().all()
+        return [alert_payload(event) for event in events]
+
+async def iter_alert_backlog(user_id: int, page):
+    # 오래 끊겨 있던 클라이언트도 놓친 이벤트를 전부 받도록, 마지막 페이지(MAX_PAGE_SIZE 미만)까지 이어서 읽는다
+    while page:
+        for payload in page:
+            yield payload
+        if len(page) < MAX_PAGE_SIZE:
+            break
+        page = await load_alert_backlog(user_id, page[-1]["cursor"])
+
 @events_router.post("/api/user/alerts/")
-def create_event(event_data: EventCreate, db: Session = Depends(get_db)):
+async def create_event(event_data: EventCreate, db: AsyncSession = Depends(get_async_db)):
     event = Event(
         user_id=event_data.user_id,
         store_id=event_data.store_id,
         camera_id=event_data.camera_id,
         type_id=event_data.type_id,
         event_time=datetime.utcnow(),
-        video_url=event_data.video_url
+        video_url=event_data.video_url,
+        playlist_url=event_data.playlist_url,
     )
     db.add(event)
-    db.commit()
-    db.refresh(event)
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(status_code=409, detail="Event for this video already exists")
+    alert_broker.publish(event.user_id, alert_payload(event))
     send_fcm_alert(event_data.store_id, event_data.camera_id, event_data.type_id)
     return {"message": "Event saved and alert sent"}
 
+@events_router.get("/api/event-types", response_model=List[EventTypeOut])
+async def list_event_types(db: AsyncSession = Depends(get_async_db)):
+    return list((await get_event_types(db)).values())
+
+@events_router.post("/api/event-types", response_model=EventTypeOut)
+async def create_event_type(event_type: EventTypeCreate, db: AsyncSession = Depends(get_async_db)):
+    # 새 종류는 수집 워커에는 바로, 탐지 작업에는 다음 작업부터 반영된다 (모델 클래스 이름에 종류 이름이 들어 있어야 한다)
+    row = EventType(type=event_type.type.strip().lower(), risk_level=event_type.risk_level)
+    db.add(row)
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(status_code=409, detail="Event type already exists")
+    invalidate_event_types()
+    return row
+
 @events_router.post("/api/start-detection/")
-async def start_detection(store_id: int, camera_id: int, background_tasks: BackgroundTasks):
-    def run_detect_script():
-        try:
-            subprocess.run(["python", "yolo/detect.py"], check=True)
-        except subprocess.CalledProcessError as e:
-            print(f"Detection script failed: {e}")
-    background_tasks.add_task(run_detect_script)
-    return {"message": "Detection started"}
+async def start_detection(store_id: int, camera_id: int, db: AsyncSession = Depends(get_async_db)):
+    camera = await db.get(Camera, camera_id)
+    if not camera or camera.store_id != store_id:
+        raise HTTPException(status_code=404, detail="Camera not found")
+    store = await get_store(db, store_id)
+    user = await get_user(db, camera.user_id)
+    if not store or not user:
+        raise HTTPException(status_code=404, detail="User or Store not found")
+
+    cam_name = sanitize_name(camera.name)
+    video_path = os.path.join("videos", user["username"], store["name"], "clips", f"{cam_name}.mp4")
+    if not os.path.exists(video_path):
+        raise HTTPException(status_code=404, detail="Camera video not found")
+
+    job = detection_service.enqueue(video_path, os.path.join("output", user["username"], store["name"]), camera=cam_name)
+    return {"message": "Detection started", "job": job}
 
 def send_fcm_alert(store_id: int, camera_id: int, type_id: int):
     print(f"[Alert] Store {store_id}, Camera {camera_id}, EventType {type_id} detected")
 
 def get_ids_from_path(db: Session, video_path: str):
+    # output/<username>/<storename>/<cam_name>/clips/... 에서 cam_name은 sanitize_name(camera.name)이다
     parts = video_path.split(os.sep)
-    if len(parts) < 3:
+    if len(parts) < 4:
         return None, None, None
     username = parts[1]
     store_name = parts[2]
+    camera_dir = parts[3]
     user = db.query(User).filter(User.username == username).first()
     if not user:
         return None, None, None
     store = db.query(Store).filter(Store.user_id == user.id, Store.name == store_name).first()
     if not store:
         return user.id, None, None
-    camera = db.query(Camera).filter(Camera.store_id == store.id).first()
+    cameras = db.query(Camera).filter(Camera.store_id == store.id).all()
+    camera = next((camera for camera in cameras if sanitize_name(camera.name) == camera_dir), None)
     return user.id, store.id, camera.id if camera else None
 
-def process_new_video_file(db: Session, video_file_path: str):
-    global last_alert_time_for_auto_event
-    with last_alert_lock:
-        current_time = datetime.utcnow()
-        if (current_time - last_alert_time_for_auto_event).total_seconds() < MIN_ALERT_INTERVAL:
-            return False
-
-    abs_path = os.path.abspath(video_file_path)
-    if abs_path in processed_files:
-        return False
+def get_cached_ids(db: Session, video_path: str):
+    # (user, store, camera) 디렉터리 단위로 ID를 캐시한다. 아직 매장/카메라가 없으면 캐시하지 않고 다음에 다시 조회한다
+    key = tuple(video_path.split(os.sep)[1:4])
+    ids = path_ids_cache.get(key)
+    if ids is None:
+        ids = get_ids_from_path(db, video_path)
+        if all(ids):
+            path_ids_cache.set(key, ids)
+    return ids
 
+def parse_clip_file(video_file_path: str, event_type_ids):
     fname = os.path.basename(video_file_path)
     name_parts = fname.split('_')
     if len(name_parts) < 4:
         print(f"[process_new_video_file] Unexpected filename format (less than 4 parts): {fname}")
-        return False
+        return None
+
+    # 안전하게 필요한 부분만 추출
+    timestamp_str = name_parts[0]
+    event_type = name_parts[1]
+    idx_ext = name_parts[-1]
+    index_str = idx_ext.split('.')[0]
+
+    type_id = event_type_ids.get(event_type.lower())
+    if not type_id:
+        print(f"[process_new_video_file] Unknown event type: {event_type}")
+        return None
+
+    clips_dir = os.path.dirname(video_file_path)
+    captures_dir = clips_dir.replace("clips", "captures")
+    image_filename = f"{timestamp_str}_{event_type}_capture_{index_str}.jpg"
+    image_path = os.path.join(captures_dir, image_filename)
+
+    if not os.path.exists(image_path):
+        print(f"[process_new_video_file] Capture image not found: {image_path}")
+        return None
+
+    # HLS 출력을 켠 탐지기는 mp4보다 먼저 <카메라>/hls/<클립 이름>/master.m3u8을 만든다
+    playlist_path = os.path.join(os.path.dirname(clips_dir), "hls", os.path.splitext(fname)[0], "master.m3u8")
+    playlist_url = None
+    if os.path.exists(playlist_path):
+        playlist_url = f"http://localhost:8000/{playlist_path.replace(os.sep, '/')}"
+
+    return {
+        "path": video_file_path,
+        "image_path": image_path,
+        "type_id": type_id,
+        "video_url": f"http://localhost:8000/{video_file_path.replace(os.sep, '/')}",
+        "playlist_url": playlist_url,
+    }
 
+def ingest_clip_batch(db: Session, video_file_paths):
+    # 클립 여러 개를 한 번에 처리한다: ID는 디렉터리 캐시로, 중복 확인은 IN 쿼리 한 번으로, 저장은 트랜잭션 하나로
+    global last_alert_time_for_auto_event
+    clips = {}
     try:
-        # 안전하게 필요한 부분만 추출
-        timestamp_str = name_parts[0]
-        event_type = name_parts[1]
-        idx_ext = name_parts[-1]
-        index_str = idx_ext.split('.')[0]
-
-        event_type_map = {"theft": 1, "fall": 2, "fight": 3, "smoke": 4}
-        type_id = event_type_map.get(event_type.lower())
-        if not type_id:
-            print(f"[process_new_video_file] Unknown event type: {event_type}")
-            return False
-
-        clips_dir = os.path.dirname(video_file_path)
-        captures_dir = clips_dir.replace("clips", "captures")
-        image_filename = f"{timestamp_str}_{event_type}_capture_{index_str}.jpg"
-        image_path = os.path.join(captures_dir, image_filename)
-
-        if not os.path.exists(image_path):
-            print(f"[process_new_video_file] Capture image not found: {image_path}")
-            return False
-
-        video_url = f"http://localhost:8000/{video_file_path.replace(os.sep, '/')}"
-        image_url = f"http://localhost:8000/{image_path.replace(os.sep, '/')}"
-
-        user_id, store_id, camera_id = get_ids_from_path(db, video_file_path)
-        if not all([user_id, store_id, camera_id]):
-            print(f"[process_new_video_file] Failed to get IDs from path: {video_file_path}")
-            return False
-
-        existing_event = db.query(Event).filter(Event.video_url == video_url).first()
-        if existing_event:
-            processed_files.add(abs_path)
-            processed_files.add(os.path.abspath(image_path))
-            return False
-
-        new_event = Event(
-            user_id=user_id,
-            store_id=store_id,
-            camera_id=camera_id,
-            type_id=type_id,
-            event_time=datetime.utcnow(),
-            video_url=video_url,
-        )
-        db.add(new_event)
+        event_type_ids = load_event_type_ids(db)
+        for video_file_path in video_file_paths:
+            if os.path.abspath(video_file_path) in processed_files:
+                continue
+            clip = parse_clip_file(video_file_path, event_type_ids)
+            if clip is None:
+                continue
+            user_id, store_id, camera_id = get_cached_ids(db, video_file_path)
+            if not all([user_id, store_id, camera_id]):
+                print(f"[process_new_video_file] Failed to get IDs from path: {video_file_path}")
+                continue
+            clip.update(user_id=user_id, store_id=store_id, camera_id=camera_id)
+            clips.setdefault(clip["video_url"], clip)
+        if not clips:
+            return 0
+
+        urls = list(clips)
+        existing_urls = set()
+        for i in range(0, len(urls), URL_QUERY_CHUNK):
+            rows = db.query(Event.video_url).filter(Event.video_url.in_(urls[i:i + URL_QUERY_CHUNK])).all()
+            existing_urls.update(url for url, in rows)
+
+        new_clips = [clip for url, clip in clips.items() if url not in existing_urls]
+        new_events = [
+            Event(
+                user_id=clip["user_id"],
+                store_id=clip["store_id"],
+                camera_id=clip["camera_id"],
+                type_id=clip["type_id"],
+                event_time=datetime.utcnow(),
+                video_url=clip["video_url"],
+                playlist_url=clip["playlist_url"],
+            )
+            for clip in new_clips
+        ]
+        db.add_all(new_events)
+        # commit 후에는 속성이 만료되므로 스트림으로 보낼 내용은 flush 직후에 만들어 둔다
+        db.flush()
+        payloads = [alert_payload(event) for event in new_events]
         db.commit()
-        db.refresh(new_event)
+    except Exception as e:
+        print(f"[process_new_video_file] Error processing new video files: {e}")
+        db.rollback()
+        return 0
 
-        processed_files.add(abs_path)
-        processed_files.add(os.path.abspath(image_path))
+    for clip in clips.values():
+        processed_files.add(os.path.abspath(clip["path"]))
+        processed_files.add(os.path.abspath(clip["image_path"]))
 
+    if new_clips:
         with last_alert_lock:
             last_alert_time_for_auto_event = datetime.utcnow()
+        for clip in new_clips:
+            send_fcm_alert(clip["store_id"], clip["camera_id"], clip["type_id"])
+        for payload in payloads:
+            alert_broker.publish(payload["user_id"], payload)
+    return len(new_clips)
 
-        send_fcm_alert(store_id, camera_id, type_id)
-        return True
+def process_new_video_file(db: Session, video_file_path: str):
+    return ingest_clip_batch(db, [video_file_path]) > 0
 
-    except Exception as e:
-        print(f"[process_new_video_file] Error processing new video file: {e}")
-        db.rollback()
-        return False
 
+def notify_clip_finished(video_file_path: str):
+    if os.path.isabs(video_file_path):
+        video_file_path = os.path.relpath(video_file_path)
+    clip_queue.put(video_file_path)
 
-def scan_clips_folder():
-    with next(get_db()) as db:
-        for dirpath, _, filenames in os.walk(BASE_OUTPUT_DIR):
-            if os.path.basename(dirpath) != "clips":
+def wait_for_alert_interval():
+    # 자동 이벤트 알림은 MIN_ALERT_INTERVAL 간격을 두고 보낸다
+    with last_alert_lock:
+        elapsed = (datetime.utcnow() - last_alert_time_for_auto_event).total_seconds()
+    if elapsed < MIN_ALERT_INTERVAL:
+        time.sleep(MIN_ALERT_INTERVAL - elapsed)
+
+def drain_clip_queue():
+    # 첫 항목이 올 때까지 기다린 뒤, 그 사이 쌓인 클립을 INGEST_BATCH_SIZE까지 한꺼번에 꺼낸다
+    batch = [clip_queue.get()]
+    while len(batch) < INGEST_BATCH_SIZE:
+        try:
+            batch.append(clip_queue.get_nowait())
+        except queue.Empty:
+            break
+    return batch
+
+def ingest_next_batch():
+    # 탐지 서비스 알림과 inotify가 같은 클립을 두 번 넣을 수 있으므로 배치 안에서도 중복을 없앤다
+    batch = [path for path in dict.fromkeys(drain_clip_queue()) if os.path.abspath(path) not in processed_files]
+    if not batch:
+        return
+    wait_for_alert_interval()
+    started = time.perf_counter()
+    db = SessionLocal()
+    try:
+        created = ingest_clip_batch(db, batch)
+    finally:
+        db.close()
+    elapsed = time.perf_counter() - started
+    with ingestion_stats_lock:
+        ingestion_stats["ingested_clips"] += len(batch)
+        ingestion_stats["created_events"] += created
+        ingestion_stats["last_ingest_seconds"] = elapsed
+        ingestion_stats["max_ingest_seconds"] = max(ingestion_stats["max_ingest_seconds"], elapsed)
+
+def run_ingestion_worker():
+    # 앱이 떠 있는 동안 하나뿐인 스레드이므로, 배치 하나가 실패해도 죽지 않고 다음 배치를 계속 처리한다
+    while True:
+        try:
+            ingest_next_batch()
+        except Exception as e:
+            print(f"[run_ingestion_worker] Error ingesting clip batch: {e}")
+
+def seed_processed_files():
+    # 폴링 대체 경로에서 기존 클립이 한꺼번에 새 이벤트로 들어오지 않도록 시작 시 한 번만 기록해 둔다
+    for dirpath, _, filenames in os.walk(BASE_OUTPUT_DIR):
+        for fname in filenames:
+            if fname.endswith(".mp4") or fname.endswith(".jpg"):
+                processed_files.add(os.path.abspath(os.path.join(dirpath, fname)))
+
+def scan_clips_folder(since=None):
+    # inotify를 쓸 수 없을 때의 폴링 대체 경로. since(타임스탬프)를 주면 그 뒤에 수정된 클립만 넣는다
+    started = time.perf_counter()
+    for dirpath, _, filenames in walk_clip_dirs(BASE_OUTPUT_DIR):
+        if os.path.basename(dirpath) != "clips":
+            continue
+        for fname in filenames:
+            full_path = os.path.join(dirpath, fname)
+            if not is_clip_path(full_path) or os.path.abspath(full_path) in processed_files:
                 continue
-            for fname in filenames:
-                if fname.endswith(".mp4"):
-                    full_path = os.path.join(dirpath, fname)
-                    process_new_video_file(db, full_path)
+            try:
+                if since is not None and os.path.getmtime(full_path) < since:
+                    continue
+            except OSError:
+                continue
+            clip_queue.put(full_path)
+    elapsed = time.perf_counter() - started
+    with ingestion_stats_lock:
+        ingestion_stats["scans"] += 1
+        ingestion_stats["last_scan_seconds"] = elapsed
+        ingestion_stats["max_scan_seconds"] = max(ingestion_stats["max_scan_seconds"], elapsed)
 
-def run_scheduler():
-    schedule.every(5).seconds.do(scan_clips_folder)
+def run_scheduler(since=None):
+    schedule.every(5).seconds.do(scan_clips_folder, since)
     while True:
         schedule.run_pending()
         time.sleep(1)
 
-def start_alert_scheduler(user_id: int, username: str):
-    user_output_dir = os.path.join(BASE_OUTPUT_DIR, username)
-    if not os.path.exists(user_output_dir):
-        print(f"Output dir not found for user {username}, skipping processed_files init")
-    else:
-        for dirpath, _, filenames in os.walk(user_output_dir):
-            for fname in filenames:
-                if fname.endswith(".mp4") or fname.endswith(".jpg"):
-                    abs_path = os.path.abspath(os.path.join(dirpath, fname))
-                    processed_files.add(abs_path)
-
-    thread = threading.Thread(target=run_scheduler, daemon=True)
-    thread.start()
\ No newline at end of file
+def on_watcher_overflow(reason):
+    # inotify가 놓친 클립이 있을 수 있다: 감시를 시작한 뒤 생긴 클립을 바로 다시 훑고, 이후로는 폴링도 함께 돌린다.
+    # 감시 시작 전 클립은 원래 수집 대상이 아니므로 since로 거른다 (이미 들어간 클립은 video_url로 걸러진다)
+    global polling_thread
+    print(f"[ClipWatcher] {reason}, rescanning {BASE_OUTPUT_DIR} and polling every 5 s")
+    since = ingestion_stats["watch_started_at"]
+    scan_clips_folder(since)
+    with ingestion_lock:
+        if polling_thread is None:
+            polling_thread = threading.Thread(target=run_scheduler, args=(since,), daemon=True)
+            polling_thread.start()
+            ingestion_stats["watch_mode"] = "inotify+polling"
+
+def start_ingestion():
+    # 앱 수명 동안 수집 워커 하나가 모든 사용자의 클립을 처리한다 (lifespan에서 한 번 호출)
+    global ingestion_thread, clip_watcher
+    with ingestion_lock:
+        if ingestion_thread is not None:
+            return
+        ingestion_thread = threading.Thread(target=run_ingestion_worker, daemon=True)
+        ingestion_thread.start()
+
+        # 탐지 서비스 밖(process_videos.py 직접 실행 등)에서 만든 클립은 inotify로 감지한다
+        os.makedirs(BASE_OUTPUT_DIR, exist_ok=True)
+        try:
+            ingestion_stats["watch_started_at"] = time.time()
+            ingestion_stats["watch_mode"] = "inotify"
+            clip_watcher = ClipWatcher(BASE_OUTPUT_DIR, notify_clip_finished, on_watcher_overflow).start()
+        except OSError as e:
+            print(f"inotify unavailable ({e}), falling back to polling {BASE_OUTPUT_DIR}")
+            seed_processed_files()
+            threading.Thread(target=run_scheduler, daemon=True).start()
+            ingestion_stats["watch_mode"] = "polling"
+
+@events_router.get("/api/ingestion/stats")
+async def get_ingestion_stats():
+    with ingestion_stats_lock:
+        stats = dict(ingestion_stats)
+    stats["queue_depth"] = clip_queue.qsize()
+    if clip_watcher is not None:
+        stats["watches"] = len(clip_watcher.watches)
+        stats["watch_failures"] = clip_watcher.watch_failures
+    stats["worker_alive"] = ingestion_thread is not None and ingestion_thread.is_alive()
+    stats["active_threads"] = threading.active_count()
+    stats["stream_subscribers"] = alert_broker.subscriber_count()
+    return stats
+
+@events_router.get("/api/cache/stats")
+async def get_cache_stats():
+    return cache_stats()
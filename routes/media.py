@@ -0,0 +1,186 @@
+from email.utils import formatdate, parsedate_to_datetime
+from functools import partial
+import mimetypes
+import os
+import stat
+
+import aiofiles
+import anyio
+from fastapi import APIRouter, HTTPException, Request
+from starlette.responses import Response
+
+# videos/, output/ 정적 파일 서빙. 모바일 플레이어의 탐색(seek)을 위한 Range(206), ETag/Last-Modified 조건부 응답,
+# 이벤트 클립 영구 캐시, 서버가 지원하면 zero-copy 전송(ASGI http.response.zerocopysend)까지 처리한다
+MEDIA_ROOTS = {"videos": "videos", "output": "output"}
+MEDIA_CHUNK_SIZE = 1024 * 1024
+# 카메라 원본 영상은 같은 이름으로 다시 등록되고, 이벤트 클립/캡처/썸네일/HLS도 체크포인트 재시작이나
+# 탐지 재실행 때 같은 이름으로 다시 쓰인다(.part -> rename). 그래서 모두 매번 ETag로 재검증한다 (바뀌지 않았으면 304)
+MEDIA_CACHE_CONTROL = "public, no-cache"
+
+# 시스템 mimetypes 표에 따라 .ts가 다른 형식으로 잡히는 경우가 있어 HLS 형식은 직접 등록한다
+mimetypes.add_type("application/vnd.apple.mpegurl", ".m3u8")
+mimetypes.add_type("video/mp2t", ".ts")
+
+media_router = APIRouter()
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+def resolve_media_path(root: str, file_path: str):
+    root_path = os.path.realpath(root)
+    full_path = os.path.realpath(os.path.join(root_path, file_path))
+    # 루트 밖으로 나가는 경로와 아직 쓰는 중인 임시 파일/폴더(HLS)는 내주지 않는다
+    if os.path.commonpath([root_path, full_path]) != root_path:
+        return None
+    if any(part.endswith(".part") for part in os.path.relpath(full_path, root_path).split(os.sep)):
+        return None
+    return full_path
+
+
+def parse_range(range_header: str, size: int):
+    """단일 bytes 범위만 해석해 (start, end)를 돌려준다 (end 포함).
+    형식이 틀렸거나 범위가 여러 개면 None(전체 파일 200 응답), 파일 밖의 범위면 RangeNotSatisfiable"""
+    unit, _, spec = range_header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    start_str, dash, end_str = spec.strip().partition("-")
+    if not dash:
+        return None
+    try:
+        if start_str:
+            start = int(start_str)
+            end = int(end_str) if end_str else max(start, size - 1)
+            if start > end:
+                return None
+        else:
+            suffix = int(end_str)
+            if suffix == 0:
+                raise RangeNotSatisfiable()
+            start, end = max(0, size - suffix), size - 1
+    except ValueError:
+        return None
+    if start >= size:
+        raise RangeNotSatisfiable()
+    return start, min(end, size - 1)
+
+
+def etag_matches(header: str, etag: str) -> bool:
+    return any(tag.strip() in ("*", etag, f"W/{etag}") for tag in header.split(","))
+
+
+def not_modified(request: Request, etag: str, mtime: float) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return etag_matches(if_none_match, etag)
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            return int(mtime) <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def range_still_valid(request: Request, etag: str, last_modified: str) -> bool:
+    # If-Range가 현재 ETag/Last-Modified와 다르면 파일이 바뀐 것이므로 범위 대신 전체를 보낸다
+    if_range = request.headers.get("if-range")
+    return if_range is None or if_range.strip() in (etag, last_modified)
+
+
+class MediaFileResponse(Response):
+    """파일의 [start, start + count) 구간을 보낸다.
+    서버가 zerocopysend 확장을 지원하면 sendfile로, 아니면 MEDIA_CHUNK_SIZE 단위로 읽어 보낸다."""
+
+    def __init__(self, path, start, count, status_code, headers, send_body=True):
+        super().__init__(status_code=status_code, headers=headers)
+        self.path = path
+        self.start = start
+        self.count = count
+        self.send_body = send_body
+
+    async def __call__(self, scope, receive, send):
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        if not self.send_body or self.count == 0:
+            await send({"type": "http.response.body", "body": b""})
+            return
+        # 플레이어는 탐색할 때마다 이전 요청을 끊으므로 연결이 끊기면 파일 읽기도 바로 멈춘다
+        async with anyio.create_task_group() as task_group:
+            async def run_until_cancelled(func):
+                await func()
+                task_group.cancel_scope.cancel()
+
+            task_group.start_soon(run_until_cancelled, partial(self._send_file, scope, send))
+            await run_until_cancelled(partial(self._wait_for_disconnect, receive))
+
+    async def _wait_for_disconnect(self, receive):
+        while (await receive())["type"] != "http.disconnect":
+            pass
+
+    async def _send_file(self, scope, send):
+        if "http.response.zerocopysend" in scope.get("extensions", {}):
+            with open(self.path, "rb") as f:
+                await send({"type": "http.response.zerocopysend", "file": f, "offset": self.start, "count": self.count})
+            return
+        async with aiofiles.open(self.path, "rb") as f:
+            await f.seek(self.start)
+            remaining = self.count
+            while remaining > 0:
+                chunk = await f.read(min(MEDIA_CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+            if remaining > 0:
+                # 보내는 도중 파일이 줄어든 경우
+                await send({"type": "http.response.body", "body": b""})
+
+
+async def serve_media(request: Request, root: str, file_path: str):
+    full_path = resolve_media_path(MEDIA_ROOTS[root], file_path)
+    try:
+        st = os.stat(full_path) if full_path else None
+    except OSError:
+        st = None
+    if st is None or not stat.S_ISREG(st.st_mode):
+        raise HTTPException(status_code=404, detail="Not Found")
+
+    size = st.st_size
+    etag = f'"{st.st_mtime_ns:x}-{size:x}"'
+    last_modified = formatdate(st.st_mtime, usegmt=True)
+    headers = {
+        "accept-ranges": "bytes",
+        "etag": etag,
+        "last-modified": last_modified,
+        "cache-control": MEDIA_CACHE_CONTROL,
+    }
+    if not_modified(request, etag, st.st_mtime):
+        return Response(status_code=304, headers=headers)
+
+    headers["content-type"] = mimetypes.guess_type(full_path)[0] or "application/octet-stream"
+    start, end, status_code = 0, size - 1, 200
+    range_header = request.headers.get("range")
+    if range_header and range_still_valid(request, etag, last_modified):
+        try:
+            byte_range = parse_range(range_header, size)
+        except RangeNotSatisfiable:
+            return Response(status_code=416, headers={**headers, "content-range": f"bytes */{size}"})
+        if byte_range is not None:
+            start, end = byte_range
+            status_code = 206
+            headers["content-range"] = f"bytes {start}-{end}/{size}"
+
+    count = end - start + 1
+    headers["content-length"] = str(count)
+    return MediaFileResponse(full_path, start, count, status_code, headers, send_body=request.method != "HEAD")
+
+
+@media_router.api_route("/videos/{file_path:path}", methods=["GET", "HEAD"], include_in_schema=False)
+async def get_video_file(file_path: str, request: Request):
+    return await serve_media(request, "videos", file_path)
+
+
+@media_router.api_route("/output/{file_path:path}", methods=["GET", "HEAD"], include_in_schema=False)
+async def get_output_file(file_path: str, request: Request):
+    return await serve_media(request, "output", file_path)
@@ -0,0 +1,134 @@
+import asyncio
+import os
+import shutil
+import uuid
+from datetime import datetime
+
+import aiofiles
+import httpx
+from fastapi.concurrency import run_in_threadpool
+
+# 카메라 등록 시 대표 이미지/영상을 가져오는 비동기 가져오기.
+# 내려받거나 복사한 내용은 같은 폴더의 고유한 임시 파일(.part)에 쓰고 끝나면 os.replace로 한 번에 바꿔 넣는다
+MAX_IMAGE_BYTES = 20 * 1024 * 1024
+MAX_VIDEO_BYTES = 2 * 1024 * 1024 * 1024
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+DOWNLOAD_TIMEOUT = httpx.Timeout(30.0, connect=10.0)
+MAX_TRACKED_IMPORTS = 256
+FICLONE = 0x40049409  # Linux reflink ioctl
+
+media_imports = {}
+import_tasks = set()
+
+
+class MediaTooLarge(Exception):
+    pass
+
+
+def _clone_file(source, dest):
+    # 같은 파일시스템이면 하드링크, 안 되면 reflink(FICLONE), 둘 다 안 되면 바이트 복사
+    try:
+        os.link(source, dest)
+        return "hardlink"
+    except OSError:
+        pass
+    try:
+        import fcntl
+        with open(source, "rb") as src, open(dest, "wb") as dst:
+            fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+        return "reflink"
+    except (ImportError, OSError):
+        pass
+    shutil.copyfile(source, dest)
+    return "copy"
+
+
+async def _download(client, url, temp_path, max_bytes, progress):
+    async with client.stream("GET", url) as response:
+        response.raise_for_status()
+        total = response.headers.get("content-length")
+        if total is not None:
+            progress["total"] = int(total)
+            if progress["total"] > max_bytes:
+                raise MediaTooLarge(f"{progress['total']} bytes > {max_bytes}")
+        async with aiofiles.open(temp_path, "wb") as f:
+            async for chunk in response.aiter_bytes(DOWNLOAD_CHUNK_SIZE):
+                progress["bytes"] += len(chunk)
+                if progress["bytes"] > max_bytes:
+                    raise MediaTooLarge(f"more than {max_bytes} bytes")
+                await f.write(chunk)
+    return "download"
+
+
+async def import_media(client, source, dest, max_bytes, progress):
+    """source(URL 또는 로컬 경로)를 dest로 가져온다. 진행 상황은 progress dict에 기록한다."""
+    temp_path = f"{dest}.{uuid.uuid4().hex}.part"
+    progress["state"] = "running"
+    try:
+        if source.startswith(("http://", "https://")):
+            progress["method"] = await _download(client, source, temp_path, max_bytes, progress)
+        elif os.path.isfile(source):
+            size = os.path.getsize(source)
+            progress["total"] = size
+            if size > max_bytes:
+                raise MediaTooLarge(f"{size} bytes > {max_bytes}")
+            progress["method"] = await run_in_threadpool(_clone_file, source, temp_path)
+            progress["bytes"] = size
+        else:
+            raise FileNotFoundError(source)
+        os.replace(temp_path, dest)
+        progress["state"] = "done"
+        return True
+    except Exception as e:
+        progress["state"] = "failed"
+        progress["error"] = f"{type(e).__name__}: {e}"
+        print(f"Media import failed ({source}): {progress['error']}")
+        return False
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+def _forget_finished_imports():
+    finished = [camera_id for camera_id, status in media_imports.items() if status["state"] != "running"]
+    for camera_id in finished[:max(0, len(media_imports) - MAX_TRACKED_IMPORTS)]:
+        del media_imports[camera_id]
+
+
+async def _run_import(status, files, on_complete):
+    async with httpx.AsyncClient(timeout=DOWNLOAD_TIMEOUT, follow_redirects=True) as client:
+        results = await asyncio.gather(*[
+            import_media(client, source, dest, max_bytes, status["files"][kind])
+            for kind, (source, dest, max_bytes) in files.items()
+        ])
+    status["state"] = "done" if all(results) else "failed"
+    status["finished_at"] = datetime.utcnow()
+    if on_complete is not None:
+        try:
+            on_complete(status)
+        except Exception as e:
+            print(f"Media import callback failed: {e}")
+
+
+def start_camera_import(camera_id, image_source, image_dest, video_source, video_dest, on_complete=None):
+    # 이미지와 영상을 동시에 가져오는 백그라운드 작업을 시작하고 상태 dict를 돌려준다
+    files = {
+        "image": (image_source, image_dest, MAX_IMAGE_BYTES),
+        "video": (video_source, video_dest, MAX_VIDEO_BYTES),
+    }
+    status = {
+        "camera_id": camera_id,
+        "state": "running",
+        "started_at": datetime.utcnow(),
+        "finished_at": None,
+        "files": {
+            kind: {"source": source, "state": "pending", "method": None, "bytes": 0, "total": None, "error": None}
+            for kind, (source, _, _) in files.items()
+        },
+    }
+    _forget_finished_imports()
+    media_imports[camera_id] = status
+    task = asyncio.create_task(_run_import(status, files, on_complete))
+    import_tasks.add(task)
+    task.add_done_callback(import_tasks.discard)
+    return status
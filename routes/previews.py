@@ -0,0 +1,112 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from urllib.parse import urlsplit
+import json
+import os
+
+import aiofiles
+
+from dependencies.db import get_async_db
+from dependencies.models import Event
+from routes.media import MEDIA_ROOTS, resolve_media_path, serve_media
+
+# 이벤트 썸네일/스프라이트 시트. 파일은 탐지기가 클립을 저장할 때 메모리의 프레임으로 미리 만들어 둔다
+# (yolo/detect.py write_clip_previews): <카메라>/thumbnails/<시각>_<종류>_preview_<번호>.json 과 이미지들
+HTTP_BASE = "http://localhost:8000"
+PREVIEW_FORMATS = ("webp", "jpg")
+
+previews_router = APIRouter()
+
+
+def thumbnail_url(event_id: int) -> str:
+    return f"{HTTP_BASE}/api/events/{event_id}/thumbnail"
+
+
+def preview_manifest_path(video_url: str):
+    """클립 URL(.../output/<...>/clips/<시각>_<종류>_clip_<번호>.mp4)에서
+    미리보기 목록 파일의 output/ 기준 상대 경로(<...>/thumbnails/<시각>_<종류>_preview_<번호>.json)를 구한다"""
+    root, _, relative_path = urlsplit(video_url or "").path.lstrip("/").partition("/")
+    clips_dir, filename = os.path.split(relative_path)
+    prefix, sep, index_ext = filename.rpartition("_clip_")
+    if root != "output" or not sep or os.path.basename(clips_dir) != "clips":
+        return None
+    index = os.path.splitext(index_ext)[0]
+    return os.path.join(os.path.dirname(clips_dir), "thumbnails", f"{prefix}_preview_{index}.json")
+
+
+def event_thumbnail_url(event):
+    # 미리보기가 없는 이벤트(기능 추가 전 클립, 미리보기 생성 실패)에는 404가 날 URL 대신 None을 준다
+    manifest_path = preview_manifest_path(event.video_url)
+    full_path = resolve_media_path(MEDIA_ROOTS["output"], manifest_path) if manifest_path else None
+    if full_path is None or not os.path.isfile(full_path):
+        return None
+    return thumbnail_url(event.id)
+
+
+async def load_previews(db: AsyncSession, event_id: int):
+    # (목록 dict, output/ 기준 thumbnails 폴더) 반환. 이벤트나 미리보기가 없으면 404
+    event = await db.get(Event, event_id)
+    if event is None:
+        raise HTTPException(status_code=404, detail="Event not found")
+    manifest_path = preview_manifest_path(event.video_url)
+    full_path = resolve_media_path(MEDIA_ROOTS["output"], manifest_path) if manifest_path else None
+    if full_path is None or not os.path.isfile(full_path):
+        raise HTTPException(status_code=404, detail="Preview not found")
+    async with aiofiles.open(full_path, "rb") as f:
+        manifest = json.loads(await f.read())
+    return manifest, os.path.dirname(manifest_path)
+
+
+def pick_format(available, image_format):
+    if image_format in available:
+        return image_format
+    return next((candidate for candidate in PREVIEW_FORMATS if candidate in available), None)
+
+
+@previews_router.get("/api/events/{event_id}/previews")
+async def get_event_previews(event_id: int, db: AsyncSession = Depends(get_async_db)):
+    manifest, preview_dir = await load_previews(db, event_id)
+    base_url = f"{HTTP_BASE}/output/{preview_dir.replace(os.sep, '/')}"
+    thumbnails = [
+        {**{key: value for key, value in thumbnail.items() if key != "file"}, "url": f"{base_url}/{thumbnail['file']}"}
+        for thumbnail in manifest["thumbnails"]
+    ]
+    sprite = manifest.get("sprite")
+    if sprite:
+        sprite = {**{key: value for key, value in sprite.items() if key != "files"},
+                  "urls": {image_format: f"{base_url}/{filename}" for image_format, filename in sprite["files"].items()}}
+    return {"event_id": event_id, "thumbnails": thumbnails, "sprite": sprite}
+
+
+@previews_router.get("/api/events/{event_id}/thumbnail")
+async def get_event_thumbnail(
+    event_id: int,
+    request: Request,
+    width: int = Query(160, ge=1),
+    format: str = Query("webp", pattern="^(webp|jpg)$"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    # 요청한 너비 이상인 것 중 가장 작은 썸네일, 없으면 가장 큰 썸네일. 형식이 없으면 다른 형식으로 대신한다
+    manifest, preview_dir = await load_previews(db, event_id)
+    image_format = pick_format({thumbnail["format"] for thumbnail in manifest["thumbnails"]}, format)
+    candidates = sorted((thumbnail for thumbnail in manifest["thumbnails"] if thumbnail["format"] == image_format),
+                        key=lambda thumbnail: thumbnail["width"])
+    if not candidates:
+        raise HTTPException(status_code=404, detail="Thumbnail not found")
+    thumbnail = next((thumbnail for thumbnail in candidates if thumbnail["width"] >= width), candidates[-1])
+    return await serve_media(request, "output", os.path.join(preview_dir, thumbnail["file"]))
+
+
+@previews_router.get("/api/events/{event_id}/sprite")
+async def get_event_sprite(
+    event_id: int,
+    request: Request,
+    format: str = Query("webp", pattern="^(webp|jpg)$"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    manifest, preview_dir = await load_previews(db, event_id)
+    sprite = manifest.get("sprite")
+    image_format = pick_format(sprite["files"], format) if sprite else None
+    if image_format is None:
+        raise HTTPException(status_code=404, detail="Sprite not found")
+    return await serve_media(request, "output", os.path.join(preview_dir, sprite["files"][image_format]))
@@ -0,0 +1,51 @@
+"""배치 크기별 YOLOEventClipper 처리 속도(frames/sec) 측정
+
+python scripts/bench_batch_inference.py --model yolo/best.pt --batch_sizes 1 4 8 16
+"""
+import argparse
+import glob
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "yolo"))
+
+from detect import YOLOEventClipper
+
+
+def bench(video_path, model_path, batch_size):
+    with tempfile.TemporaryDirectory() as output_dir:
+        clipper = YOLOEventClipper(
+            model_path=model_path,
+            video_path=video_path,
+            output_dir=output_dir,
+            batch_size=batch_size,
+        )
+        started = time.perf_counter()
+        clipper.run()
+        elapsed = time.perf_counter() - started
+    return clipper.frame_count, elapsed, clipper.event_frames
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", default=os.path.join(ROOT, "yolo", "best.pt"))
+    parser.add_argument("--videos", nargs="*", default=sorted(glob.glob(os.path.join(ROOT, "test_data", "*.mp4"))))
+    parser.add_argument("--batch_sizes", nargs="*", type=int, default=[1, 4, 8, 16])
+    args = parser.parse_args()
+
+    rows = []
+    for video_path in args.videos:
+        baseline_events = None
+        for batch_size in args.batch_sizes:
+            frames, elapsed, events = bench(video_path, args.model, batch_size)
+            if baseline_events is None:
+                baseline_events = events
+            rows.append((os.path.basename(video_path), batch_size, frames, elapsed,
+                         frames / elapsed if elapsed else 0.0, events == baseline_events))
+
+    print(f"\n{'video':<20} {'batch':>5} {'frames':>7} {'sec':>8} {'fps':>8}  same_events")
+    for name, batch_size, frames, elapsed, fps, same in rows:
+        print(f"{name:<20} {batch_size:>5} {frames:>7} {elapsed:>8.2f} {fps:>8.1f}  {same}")
@@ -0,0 +1,142 @@
+"""알림 조회(읽기)와 이벤트 수집(쓰기)을 동시에 돌려 기본 SQLite 엔진과 WAL/풀 설정 엔진의 p50/p99 지연 비교
+
+python scripts/bench_db_concurrency.py --readers 16 --seconds 10
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from dependencies.db import Base, create_db_engine
+from dependencies.models import Event
+
+NUM_USERS = 100
+
+
+def seed(db_engine, num_events):
+    Base.metadata.create_all(bind=db_engine)
+    started = datetime.utcnow() - timedelta(days=30)
+    rows = [
+        (random.randint(1, NUM_USERS), random.randint(1, 300), random.randint(1, 1000), random.randint(1, 4),
+         (started + timedelta(seconds=5 * i)).strftime("%Y-%m-%d %H:%M:%S.%f"), f"seed/{i}.mp4")
+        for i in range(num_events)
+    ]
+    with db_engine.begin() as conn:
+        conn.exec_driver_sql(
+            "INSERT INTO event (user_id, store_id, camera_id, type_id, event_time, video_url) VALUES (?, ?, ?, ?, ?, ?)",
+            rows)
+
+
+def percentile(values, pct):
+    if not values:
+        return float("nan")
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def run(db_engine, readers, seconds, write_batch):
+    session_factory = sessionmaker(bind=db_engine, autoflush=False)
+    stop = threading.Event()
+    since = datetime.utcnow() - timedelta(days=7)
+    read_times, write_times, errors = [], [], []
+    lock = threading.Lock()
+
+    def reader():
+        while not stop.is_set():
+            started = time.perf_counter()
+            db = session_factory()
+            try:
+                # get_alerts 첫 페이지와 같은 쿼리
+                (db.query(Event)
+                   .filter(Event.user_id == random.randint(1, NUM_USERS))
+                   .filter(Event.event_time >= since)
+                   .order_by(Event.event_time.desc(), Event.id.desc())
+                   .limit(51)
+                   .all())
+                elapsed = time.perf_counter() - started
+                with lock:
+                    read_times.append(elapsed)
+            except Exception as e:
+                with lock:
+                    errors.append(str(e))
+            finally:
+                db.close()
+
+    def writer():
+        counter = 0
+        while not stop.is_set():
+            started = time.perf_counter()
+            db = session_factory()
+            try:
+                # 수집 워커처럼 클립 묶음을 한 트랜잭션으로 저장한다
+                db.add_all([
+                    Event(user_id=random.randint(1, NUM_USERS), store_id=1, camera_id=1, type_id=1,
+                          event_time=datetime.utcnow(), video_url=f"bench/{threading.get_ident()}/{counter + i}.mp4")
+                    for i in range(write_batch)
+                ])
+                db.commit()
+                counter += write_batch
+                elapsed = time.perf_counter() - started
+                with lock:
+                    write_times.append(elapsed)
+            except Exception as e:
+                db.rollback()
+                with lock:
+                    errors.append(str(e))
+            finally:
+                db.close()
+
+    threads = [threading.Thread(target=reader) for _ in range(readers)] + [threading.Thread(target=writer)]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return read_times, write_times, errors
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--events", type=int, default=200000)
+    parser.add_argument("--readers", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--write_batch", type=int, default=20)
+    args = parser.parse_args()
+
+    engines = [
+        # 이전 설정: 기본 저널 모드, pragma 없음
+        ("default", lambda path: create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})),
+        ("wal+pool", create_db_engine),
+    ]
+
+    rows = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for name, make_engine in engines:
+            db_engine = make_engine(os.path.join(workdir, f"{name}.db"))
+            seed(db_engine, args.events)
+            read_times, write_times, errors = run(db_engine, args.readers, args.seconds, args.write_batch)
+            db_engine.dispose()
+            rows.append((name, read_times, write_times, errors))
+
+    print(f"\n{'engine':<10} {'reads/s':>8} {'read p50':>9} {'read p99':>9} "
+          f"{'writes/s':>9} {'write p50':>10} {'write p99':>10} {'errors':>7}")
+    for name, read_times, write_times, errors in rows:
+        print(f"{name:<10} {len(read_times) / args.seconds:>8.0f} "
+              f"{percentile(read_times, 50) * 1000:>7.1f}ms {percentile(read_times, 99) * 1000:>7.1f}ms "
+              f"{len(write_times) / args.seconds:>9.1f} "
+              f"{percentile(write_times, 50) * 1000:>8.1f}ms {percentile(write_times, 99) * 1000:>8.1f}ms "
+              f"{len(errors):>7}")
+        if errors:
+            print(f"  e.g. {statistics.mode(errors)[:100]}")
@@ -0,0 +1,70 @@
+"""추론 간격(stride)과 모션 게이트 사용 시 건너뛴 프레임 비율과 이벤트 재현율 비교
+
+python scripts/bench_frame_skipping.py --model yolo/best.pt --strides 2 4 8 --motion_thresholds 1 2 4
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "yolo"))
+
+from detect import YOLOEventClipper
+
+
+def run_mode(video_path, model_path, batch_size, **gate_kwargs):
+    with tempfile.TemporaryDirectory() as output_dir:
+        clipper = YOLOEventClipper(
+            model_path=model_path,
+            video_path=video_path,
+            output_dir=output_dir,
+            batch_size=batch_size,
+            **gate_kwargs
+        )
+        started = time.perf_counter()
+        clipper.run()
+        elapsed = time.perf_counter() - started
+    return clipper, elapsed
+
+
+def recall(reference_events, events):
+    # 같은 라벨이면서 프레임 구간이 겹치는 이벤트가 있으면 재현된 것으로 본다
+    if not reference_events:
+        return 1.0
+    matched = 0
+    for label, start, end in reference_events:
+        if any(l == label and s <= end and start <= e for l, s, e in events):
+            matched += 1
+    return matched / len(reference_events)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", default=os.path.join(ROOT, "yolo", "best.pt"))
+    parser.add_argument("--videos", nargs="*", default=[os.path.join(ROOT, "test_data", "theft.mp4"),
+                                                       os.path.join(ROOT, "test_data", "smoke.mp4")])
+    parser.add_argument("--strides", nargs="*", type=int, default=[2, 4, 8])
+    parser.add_argument("--motion_thresholds", nargs="*", type=float, default=[1.0, 2.0, 4.0])
+    parser.add_argument("--batch_size", type=int, default=1)
+    args = parser.parse_args()
+
+    modes = [("full", {})]
+    modes += [(f"stride={k}", {"inference_stride": k}) for k in args.strides]
+    modes += [(f"motion<{t:g}", {"motion_threshold": t}) for t in args.motion_thresholds]
+
+    rows = []
+    for video_path in args.videos:
+        reference_events = None
+        for name, gate_kwargs in modes:
+            clipper, elapsed = run_mode(video_path, args.model, args.batch_size, **gate_kwargs)
+            if reference_events is None:
+                reference_events = clipper.event_frames
+            skipped = 1.0 - clipper.inferred_frames / clipper.frame_count if clipper.frame_count else 0.0
+            rows.append((os.path.basename(video_path), name, skipped, len(clipper.event_frames),
+                         recall(reference_events, clipper.event_frames), elapsed))
+
+    print(f"\n{'video':<14} {'mode':<12} {'skipped':>8} {'events':>7} {'recall':>7} {'sec':>8}")
+    for video, name, skipped, n_events, event_recall, elapsed in rows:
+        print(f"{video:<14} {name:<12} {skipped:>8.1%} {n_events:>7} {event_recall:>7.1%} {elapsed:>8.2f}")
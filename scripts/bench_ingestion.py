@@ -0,0 +1,107 @@
+"""과거 클립 디렉터리 백필 시 파일 단위 수집과 배치 수집(ingest_clip_batch) 속도 비교
+
+python scripts/bench_ingestion.py --clips 10000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from dependencies.db import Base
+from dependencies.models import User, Store, Camera, Event, EventType
+from dependencies.cache import invalidate_event_types
+from routes import events
+
+LABELS = ["theft", "fall", "fight", "smoke"]
+
+
+def make_clips(num_clips):
+    # 임시 작업 디렉터리 아래에 탐지기와 같은 output/<user>/<store>/<camera>/{clips,captures} 구조로 빈 클립/캡처를 만든다
+    # (카메라 폴더 이름은 sanitize_name(camera.name)이어야 수집 시 ID를 찾는다)
+    clips_dir = os.path.join("output", "benchuser", "benchstore", "cam1", "clips")
+    captures_dir = os.path.join("output", "benchuser", "benchstore", "cam1", "captures")
+    os.makedirs(clips_dir)
+    os.makedirs(captures_dir)
+    paths = []
+    for i in range(num_clips):
+        timestamp = f"20250101{i // 3600 % 24:02d}{i // 60 % 60:02d}{i % 60:02d}"
+        label = LABELS[i % len(LABELS)]
+        clip_path = os.path.join(clips_dir, f"{timestamp}_{label}_clip_{i}.mp4")
+        open(clip_path, "wb").close()
+        open(os.path.join(captures_dir, f"{timestamp}_{label}_capture_{i}.jpg"), "wb").close()
+        paths.append(clip_path)
+    return paths
+
+
+def reset_db(session_factory, engine):
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    db = session_factory()
+    user = User(username="benchuser", email="bench@example.com", password_hash="x")
+    db.add(user)
+    db.flush()
+    store = Store(user_id=user.id, name="benchstore", location="")
+    db.add(store)
+    db.flush()
+    db.add(Camera(user_id=user.id, store_id=store.id, name="cam1"))
+    db.add_all([EventType(type=label, risk_level="high") for label in LABELS])
+    db.commit()
+    db.close()
+    events.processed_files.clear()
+    events.path_ids_cache.clear()
+    invalidate_event_types()
+
+
+def run_per_file(db, paths):
+    for path in paths:
+        # 예전 수집 방식과 같게 파일마다 ID를 다시 조회하고 커밋한다
+        events.path_ids_cache.clear()
+        events.process_new_video_file(db, path)
+
+
+def run_batched(db, paths):
+    for i in range(0, len(paths), events.INGEST_BATCH_SIZE):
+        events.ingest_clip_batch(db, paths[i:i + events.INGEST_BATCH_SIZE])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clips", type=int, default=10000)
+    parser.add_argument("--per_file_clips", type=int, default=None,
+                        help="파일 단위 수집은 느리므로 일부만 측정해 전체 시간을 추정할 수 있다")
+    args = parser.parse_args()
+
+    events.send_fcm_alert = lambda *_: None
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        paths = make_clips(args.clips)
+        engine = create_engine(f"sqlite:///{os.path.join(workdir, 'bench.db')}")
+        session_factory = sessionmaker(bind=engine, autoflush=False)
+
+        rows = []
+        per_file_paths = paths[:args.per_file_clips] if args.per_file_clips else paths
+        for name, runner, run_paths in [("per-file", run_per_file, per_file_paths),
+                                        ("batched", run_batched, paths)]:
+            reset_db(session_factory, engine)
+            db = session_factory()
+            started = time.perf_counter()
+            runner(db, run_paths)
+            elapsed = time.perf_counter() - started
+            created = db.query(Event).count()
+            db.close()
+            # 클립이 수집되지 않으면(경로/ID 불일치) 아무것도 측정하지 않은 것이므로 바로 알린다
+            assert created == len(run_paths), f"{name}: {created} events for {len(run_paths)} clips"
+            rows.append((name, len(run_paths), created, elapsed, elapsed * len(paths) / len(run_paths)))
+        engine.dispose()
+        os.chdir(ROOT)
+
+    print(f"\n{'mode':<10} {'clips':>7} {'events':>7} {'sec':>8} {'clips/s':>9} {'est. sec':>9}")
+    for name, n_clips, created, elapsed, estimated in rows:
+        print(f"{name:<10} {n_clips:>7} {created:>7} {elapsed:>8.2f} {n_clips / elapsed:>9.0f} {estimated:>9.2f}")
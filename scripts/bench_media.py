@@ -0,0 +1,95 @@
+"""output/ 이벤트 클립에 동시 탐색(Range) 요청을 보내 처리량(MB/s)과 첫 바이트까지 시간(TTFB) 측정.
+모바일 플레이어처럼 임의 위치에서 range_kb 크기만큼 요청하고, 일부는 첫 바이트만 받고 끊는다(탐색 중 취소).
+
+python scripts/bench_media.py --output_dir output --clients 64 --seconds 20
+(서버가 먼저 실행 중이어야 한다: uvicorn main:app)
+"""
+import argparse
+import asyncio
+import os
+import random
+import time
+
+import httpx
+
+
+def percentile(values, pct):
+    if not values:
+        return float("nan")
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def find_clips(output_dir):
+    clips = []
+    for root, _, files in os.walk(output_dir):
+        if os.path.basename(root) != "clips":
+            continue
+        for name in files:
+            if name.endswith(".mp4"):
+                path = os.path.join(root, name)
+                url = "/" + os.path.relpath(path, os.path.dirname(os.path.abspath(output_dir))).replace(os.sep, "/")
+                clips.append((url, os.path.getsize(path)))
+    return clips
+
+
+async def client_loop(client, clips, args, deadline, results, rng):
+    range_bytes = args.range_kb * 1024
+    while time.perf_counter() < deadline:
+        url, size = rng.choice(clips)
+        start = rng.randrange(0, max(1, size - range_bytes))
+        headers = {"Range": f"bytes={start}-{start + range_bytes - 1}"}
+        abort = rng.random() < args.abort_ratio
+        started = time.perf_counter()
+        try:
+            async with client.stream("GET", url, headers=headers) as res:
+                ttfb = None
+                received = 0
+                async for chunk in res.aiter_raw():
+                    if ttfb is None:
+                        ttfb = time.perf_counter() - started
+                    received += len(chunk)
+                    if abort:
+                        break
+                results["status"][res.status_code] = results["status"].get(res.status_code, 0) + 1
+        except httpx.HTTPError:
+            results["errors"] += 1
+            continue
+        if ttfb is not None:
+            results["ttfb"].append(ttfb)
+        results["latency"].append(time.perf_counter() - started)
+        results["bytes"] += received
+
+
+async def main(args):
+    clips = find_clips(args.output_dir)
+    if not clips:
+        raise SystemExit(f"no clips under {args.output_dir}")
+    limits = httpx.Limits(max_connections=args.clients, max_keepalive_connections=args.clients)
+    results = {"ttfb": [], "latency": [], "bytes": 0, "errors": 0, "status": {}}
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=60) as client:
+        deadline = time.perf_counter() + args.seconds
+        started = time.perf_counter()
+        await asyncio.gather(*[client_loop(client, clips, args, deadline, results, random.Random(i))
+                               for i in range(args.clients)])
+        elapsed = time.perf_counter() - started
+
+    requests_done = len(results["latency"])
+    print(f"\n{len(clips)} clips, {args.clients} clients, {args.range_kb} KB ranges, {elapsed:.1f}s")
+    print(f"requests/s {requests_done / elapsed:.0f}, throughput {results['bytes'] / elapsed / 1024 / 1024:.1f} MB/s, "
+          f"errors {results['errors']}, status {results['status']}")
+    print(f"TTFB p50 {percentile(results['ttfb'], 50) * 1000:.1f} ms, p99 {percentile(results['ttfb'], 99) * 1000:.1f} ms; "
+          f"request p50 {percentile(results['latency'], 50) * 1000:.1f} ms, "
+          f"p99 {percentile(results['latency'], 99) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--base_url", default="http://localhost:8000")
+    parser.add_argument("--output_dir", default="output")
+    parser.add_argument("--clients", type=int, default=64)
+    parser.add_argument("--seconds", type=float, default=20.0)
+    parser.add_argument("--range_kb", type=int, default=1024)
+    parser.add_argument("--abort_ratio", type=float, default=0.3, help="첫 바이트만 받고 끊는 요청 비율")
+    args = parser.parse_args()
+    asyncio.run(main(args))
@@ -0,0 +1,86 @@
+"""카메라 수(1~32)를 늘려 가며 InferenceScheduler 하나로 여러 스트림을 처리할 때의 총 처리 fps와 카메라별 지연 측정.
+카메라마다 같은 영상을 실제 속도로 반복 재생해 스트림 대신 쓴다.
+
+python scripts/bench_multi_camera.py --video test_data/theft.mp4 --cameras 1 2 4 8 16 32 --seconds 30
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "yolo"))
+
+from multi_camera import MultiCameraRunner, SCHEDULING_POLICIES
+
+
+def jain_fairness(values):
+    # 1이면 모든 카메라가 똑같이 처리됨, 1/N에 가까울수록 일부 카메라만 처리됨
+    total = sum(values)
+    squares = sum(value * value for value in values)
+    return total * total / (len(values) * squares) if squares else 1.0
+
+
+def run_cameras(args, num_cameras):
+    sources = {f"cam{i:02d}": args.video for i in range(num_cameras)}
+    with tempfile.TemporaryDirectory() as output_base:
+        runner = MultiCameraRunner(
+            sources,
+            output_base,
+            model_path=args.model,
+            inference_workers=args.inference_workers,
+            max_batch_frames=args.max_batch_frames,
+            batch_timeout=args.batch_timeout_ms / 1000,
+            policy=args.policy,
+            realtime=True,
+            max_reconnects=None,
+            reconnect_delay=0.0,
+            max_lag_seconds=args.max_lag_seconds,
+            max_buffer_seconds=args.max_buffer_seconds,
+        )
+        started = time.perf_counter()
+        runner.run(duration=args.seconds)
+        elapsed = time.perf_counter() - started
+
+    stats = runner.scheduler.camera_stats()
+    camera_fps = [clipper.inferred_frames / elapsed for clipper in runner.clippers.values()]
+    decoded = sum(clipper.frames_buffer.end_frame if clipper.frames_buffer else 0 for clipper in runner.clippers.values())
+    dropped = sum(clipper.dropped_frames + clipper.stale_frames + clipper.skipped_frames
+                  for clipper in runner.clippers.values())
+    waits = [stat["wait_seconds"] / stat["requests"] for stat in stats.values() if stat["requests"]]
+    max_wait = max((stat["max_wait_seconds"] for stat in stats.values()), default=0.0)
+    return {
+        "cameras": num_cameras,
+        "total_fps": sum(camera_fps),
+        "min_fps": min(camera_fps),
+        "max_fps": max(camera_fps),
+        "fairness": jain_fairness(camera_fps),
+        "mean_wait_ms": sum(waits) / len(waits) * 1000 if waits else 0.0,
+        "max_wait_ms": max_wait * 1000,
+        "dropped": dropped / decoded if decoded else 0.0,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--video", default=os.path.join(ROOT, "test_data", "theft.mp4"))
+    parser.add_argument("--model", default=os.path.join(ROOT, "yolo", "best.pt"))
+    parser.add_argument("--cameras", nargs="*", type=int, default=[1, 2, 4, 8, 16, 32])
+    parser.add_argument("--seconds", type=float, default=30.0)
+    parser.add_argument("--policy", choices=SCHEDULING_POLICIES, default="round_robin")
+    parser.add_argument("--inference_workers", type=int, default=1)
+    parser.add_argument("--max_batch_frames", type=int, default=16)
+    parser.add_argument("--batch_timeout_ms", type=float, default=5.0)
+    parser.add_argument("--max_lag_seconds", type=float, default=2.0)
+    parser.add_argument("--max_buffer_seconds", type=float, default=5.0,
+                        help="카메라마다 링 버퍼를 잡으므로 카메라가 많으면 줄여 둔다")
+    args = parser.parse_args()
+
+    rows = [run_cameras(args, num_cameras) for num_cameras in args.cameras]
+
+    print(f"\n{'cameras':>7} {'total fps':>10} {'cam fps min':>12} {'cam fps max':>12} {'fairness':>9} "
+          f"{'wait ms':>8} {'max wait ms':>12} {'dropped':>8}")
+    for row in rows:
+        print(f"{row['cameras']:>7} {row['total_fps']:>10.1f} {row['min_fps']:>12.2f} {row['max_fps']:>12.2f} "
+              f"{row['fairness']:>9.3f} {row['mean_wait_ms']:>8.1f} {row['max_wait_ms']:>12.1f} {row['dropped']:>8.1%}")
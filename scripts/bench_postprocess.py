@@ -0,0 +1,99 @@
+"""프레임당 탐지 후처리(_update_events) 비교: 박스마다 도는 기존 파이썬 루프 vs NumPy 마스크/조회표/최대값 축약
+
+python scripts/bench_postprocess.py --boxes 10 100 500 --frames 2000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "yolo"))
+
+from detect import YOLOEventClipper
+
+NUM_CLASSES = 80
+EVENT_CLASSES = {3: "theft", 17: "fall_down", 42: "fight", 65: "smoke_event"}
+
+
+class SyntheticDetector:
+    # 모델 없이 클래스 이름만 제공한다. 탐지 결과는 벤치마크가 직접 만든다
+    names = {idx: EVENT_CLASSES.get(idx, f"class_{idx}") for idx in range(NUM_CLASSES)}
+
+
+def make_detections(num_frames, num_boxes, seed):
+    rng = np.random.default_rng(seed)
+    return [(rng.integers(0, NUM_CLASSES, num_boxes), rng.uniform(0.5, 1.0, num_boxes).astype(np.float32))
+            for _ in range(num_frames)]
+
+
+def legacy_update_events(clipper, frame_count, classes, confidences):
+    # 기존 구현: 박스마다 이름 조회 -> str -> 부분 문자열 정규화 -> confidence 비교
+    fps = clipper.fps
+    detected_norm_labels = set()
+    for cls_idx, conf in zip(classes, confidences):
+        if conf < clipper.CONFIDENCE_THERESHOLD:
+            continue
+        raw_label = str(clipper.names.get(cls_idx, cls_idx))
+        norm_label = next((label for label in clipper.VALID_EVENT_LABELS if label in raw_label), raw_label)
+        if norm_label not in clipper.VALID_EVENT_LABELS:
+            continue
+        detected_norm_labels.add(norm_label)
+        if norm_label not in clipper.active_events:
+            clipper.active_events[norm_label] = {
+                'start_frame': frame_count,
+                'end_frame': frame_count + int(clipper.BASE_CLIP_DURATION * fps),
+                'last_seen_frame': frame_count,
+                'max_confidence': conf
+            }
+        else:
+            ev = clipper.active_events[norm_label]
+            ev['last_seen_frame'] = frame_count
+            ev['end_frame'] = max(ev['end_frame'], frame_count + int(clipper.BASE_CLIP_DURATION * fps))
+            ev['max_confidence'] = max(ev['max_confidence'], conf)
+    # 끝난 이벤트 정리는 두 구현이 같으므로 측정에서 뺀다 (병합 간격을 길게 둬 클립이 저장되지 않게 한다)
+    return detected_norm_labels
+
+
+def run(update, detections, output_dir, threshold):
+    clipper = YOLOEventClipper(output_dir=output_dir, detector=SyntheticDetector(),
+                               confidence_threshold=threshold, merge_gap_seconds=1e9)
+    clipper.fps = 30.0
+    started = time.perf_counter()
+    for frame_count, (classes, confidences) in enumerate(detections):
+        update(clipper, frame_count, classes, confidences)
+    elapsed = time.perf_counter() - started
+    return clipper.active_events, elapsed
+
+
+def snapshot(active_events):
+    return {label: (ev['start_frame'], ev['end_frame'], ev['last_seen_frame'], round(float(ev['max_confidence']), 6))
+            for label, ev in active_events.items()}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--boxes", nargs="*", type=int, default=[10, 100, 500])
+    parser.add_argument("--frames", type=int, default=2000)
+    parser.add_argument("--threshold", type=float, default=0.9)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rows = []
+    with tempfile.TemporaryDirectory() as output_dir:
+        for num_boxes in args.boxes:
+            detections = make_detections(args.frames, num_boxes, args.seed)
+            legacy_events, legacy_sec = run(legacy_update_events, detections, output_dir, args.threshold)
+            vector_events, vector_sec = run(YOLOEventClipper._update_events, detections, output_dir, args.threshold)
+            same = snapshot(legacy_events) == snapshot(vector_events)
+            rows.append((num_boxes, legacy_sec, vector_sec, same))
+
+    print(f"\n{'boxes':>6} {'loop us/frame':>14} {'numpy us/frame':>15} {'speedup':>8} {'same':>5}")
+    for num_boxes, legacy_sec, vector_sec, same in rows:
+        print(f"{num_boxes:>6} {legacy_sec / args.frames * 1e6:>14.1f} {vector_sec / args.frames * 1e6:>15.1f} "
+              f"{legacy_sec / vector_sec:>7.1f}x {str(same):>5}")
+    if not all(row[3] for row in rows):
+        sys.exit(1)
@@ -0,0 +1,101 @@
+"""이벤트 클립 미리보기(썸네일 + 스프라이트 시트) 생성 시간과 파일 크기 측정.
+메모리의 클립 프레임으로 만드는 방식(write_clip_previews)과 저장된 mp4를 다시 디코딩해 만드는 방식을 비교하고,
+이벤트 목록 화면이 내려받는 크기(썸네일/스프라이트)를 클립 mp4 크기와 비교한다.
+
+python scripts/bench_previews.py --image test_data/theft.jpg --seconds 10 --fps 30 --repeat 5
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import cv2
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "yolo"))
+
+from detect import SPRITE_FRAMES, write_clip_previews
+
+
+def make_clip(args):
+    # 실제 영상이 있으면 그 앞부분을, 없으면 사진을 조금씩 옮겨 가며 움직이는 클립을 만든다
+    num_frames = int(args.seconds * args.fps)
+    if args.video:
+        cap = cv2.VideoCapture(args.video)
+        frames = []
+        while len(frames) < num_frames:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            frames.append(frame)
+        cap.release()
+        if frames:
+            return np.stack(frames)
+    image = cv2.imread(args.image)
+    return np.stack([np.roll(image, i * 4, axis=1) for i in range(num_frames)])
+
+
+def encode_mp4(clip_frames, fps, path):
+    height, width = clip_frames.shape[1:3]
+    cmd = ["ffmpeg", "-y", "-loglevel", "error", "-f", "rawvideo", "-pix_fmt", "bgr24", "-s", f"{width}x{height}",
+           "-r", str(fps), "-i", "-", "-vcodec", "libx264", "-preset", "veryfast", "-pix_fmt", "yuv420p", path]
+    subprocess.run(cmd, input=memoryview(np.ascontiguousarray(clip_frames)).cast("B"), check=True)
+
+
+def read_back_frames(clip_path, sprite_frames):
+    # 다시 디코딩하는 방식: 저장된 클립에서 스프라이트에 쓸 프레임을 탐색해 읽는다
+    cap = cv2.VideoCapture(clip_path)
+    total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    frames = []
+    for idx in np.unique(np.linspace(0, total - 1, min(sprite_frames, total)).round().astype(int)):
+        cap.set(cv2.CAP_PROP_POS_FRAMES, int(idx))
+        ret, frame = cap.read()
+        if ret:
+            frames.append(frame)
+    cap.release()
+    return np.stack(frames)
+
+
+def timed(func, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--video", default=None, help="클립으로 쓸 영상 (없으면 --image로 만든다)")
+    parser.add_argument("--image", default=os.path.join(ROOT, "test_data", "theft.jpg"))
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--fps", type=float, default=30.0)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    clip_frames = make_clip(args)
+    with tempfile.TemporaryDirectory() as output_dir:
+        clip_path = os.path.join(output_dir, "clip.mp4")
+        encode_mp4(clip_frames, args.fps, clip_path)
+        preview_base = os.path.join(output_dir, "event_preview_0")
+
+        in_memory = timed(lambda: write_clip_previews(clip_frames, args.fps, preview_base), args.repeat)
+        decode_again = timed(lambda: write_clip_previews(read_back_frames(clip_path, SPRITE_FRAMES), args.fps,
+                                                         preview_base), args.repeat)
+        manifest = write_clip_previews(clip_frames, args.fps, preview_base)
+
+        clip_size = os.path.getsize(clip_path)
+        print(f"\nclip: {len(clip_frames)} frames {clip_frames.shape[2]}x{clip_frames.shape[1]}, "
+              f"mp4 {clip_size / 1024:.0f} KB")
+        print(f"previews from memory     {in_memory * 1000:8.1f} ms")
+        print(f"previews by re-decoding  {decode_again * 1000:8.1f} ms")
+        print(f"\n{'file':<28} {'KB':>8} {'of clip':>8}")
+        files = [(f"thumbnail {t['width']}px {t['format']}", t["file"]) for t in manifest["thumbnails"]]
+        files += [(f"sprite {image_format}", filename) for image_format, filename in manifest["sprite"]["files"].items()]
+        for name, filename in files:
+            size = os.path.getsize(os.path.join(output_dir, filename))
+            print(f"{name:<28} {size / 1024:>8.1f} {size / clip_size:>8.2%}")
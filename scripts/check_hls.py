@@ -0,0 +1,139 @@
+"""이벤트 클립 HLS 출력 검사: 재생 목록 형식, 화질별 해상도, 세그먼트 길이를 로컬 ffmpeg/ffprobe로만 확인한다 (ffprobe가 없으면 OpenCV).
+--hls_dir을 주지 않으면 사진으로 만든 클립을 write_hls로 인코딩해 검사한다. 실패하면 종료 코드 1.
+
+python scripts/check_hls.py --seconds 9.5 --fps 30
+python scripts/check_hls.py --hls_dir output/user1/store1/main/hls/2025-06-18T17-45-52_theft_clip_0
+"""
+import argparse
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+
+import cv2
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "yolo"))
+
+from detect import HLS_SEGMENT_SECONDS, write_hls
+
+failures = []
+
+
+def check(ok, message):
+    print(f"[{'PASS' if ok else 'FAIL'}] {message}")
+    if not ok:
+        failures.append(message)
+    return ok
+
+
+def read_playlist(path):
+    with open(path) as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def probe_video(path):
+    # (width, height, frames, fps). ffprobe가 없으면 OpenCV(내장 FFmpeg)로 끝까지 읽어 센다
+    if shutil.which("ffprobe"):
+        out = subprocess.run(["ffprobe", "-v", "error", "-select_streams", "v:0", "-count_frames",
+                              "-show_entries", "stream=width,height,avg_frame_rate,nb_read_frames", "-of", "json",
+                              path], capture_output=True, text=True, check=True).stdout
+        stream = json.loads(out)["streams"][0]
+        num, _, den = stream["avg_frame_rate"].partition("/")
+        return stream["width"], stream["height"], int(stream["nb_read_frames"]), float(num) / float(den or 1)
+    cap = cv2.VideoCapture(path)
+    width, height = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    frames = 0
+    while cap.grab():
+        frames += 1
+    cap.release()
+    return width, height, frames, fps
+
+
+def check_variant(hls_dir, uri, resolution, segment_seconds):
+    path = os.path.join(hls_dir, uri)
+    lines = read_playlist(path)
+    check(lines[0] == "#EXTM3U", f"{uri}: starts with #EXTM3U")
+    check("#EXT-X-ENDLIST" in lines and "#EXT-X-PLAYLIST-TYPE:VOD" in lines, f"{uri}: complete VOD playlist")
+    target = next((int(line.split(":")[1]) for line in lines if line.startswith("#EXT-X-TARGETDURATION:")), None)
+    if not check(target is not None, f"{uri}: has #EXT-X-TARGETDURATION"):
+        return []
+
+    segments = [(float(line.split(":")[1].rstrip(",")), lines[i + 1])
+                for i, line in enumerate(lines) if line.startswith("#EXTINF:")]
+    check(len(segments) > 0, f"{uri}: has segments")
+    durations = []
+    for i, (duration, segment_uri) in enumerate(segments):
+        segment_path = os.path.join(os.path.dirname(path), segment_uri)
+        if not check(os.path.isfile(segment_path), f"{uri}: {segment_uri} exists"):
+            continue
+        width, height, frames, fps = probe_video(segment_path)
+        probed = frames / fps
+        frame = 1.0 / fps
+        check(round(duration) <= target, f"{uri}: {segment_uri} EXTINF {duration:.3f}s within target {target}s")
+        check(abs(probed - duration) <= frame + 1e-6,
+              f"{uri}: {segment_uri} has {frames} frames ({probed:.3f}s), EXTINF {duration:.3f}s")
+        if i < len(segments) - 1:
+            check(abs(duration - segment_seconds) <= frame + 1e-6,
+                  f"{uri}: {segment_uri} is {segment_seconds}s (keyframes aligned)")
+        check(f"{width}x{height}" == resolution, f"{uri}: {segment_uri} is {width}x{height} (master {resolution})")
+        durations.append(probed)
+    return durations
+
+
+def check_hls(hls_dir, expected_seconds=None, segment_seconds=HLS_SEGMENT_SECONDS):
+    master_path = os.path.join(hls_dir, "master.m3u8")
+    if not check(os.path.isfile(master_path), "master.m3u8 exists"):
+        return
+    lines = read_playlist(master_path)
+    check(lines[0] == "#EXTM3U", "master.m3u8 starts with #EXTM3U")
+    variants = []
+    for i, line in enumerate(lines):
+        if line.startswith("#EXT-X-STREAM-INF:"):
+            attributes = dict(re.findall(r'([A-Z-]+)=("[^"]*"|[^,]*)', line.split(":", 1)[1]))
+            check("BANDWIDTH" in attributes and "RESOLUTION" in attributes,
+                  f"variant {lines[i + 1]} declares BANDWIDTH and RESOLUTION")
+            variants.append((lines[i + 1], int(attributes.get("BANDWIDTH", 0)), attributes.get("RESOLUTION")))
+    check(len(variants) >= 2, f"{len(variants)} renditions")
+    check([bandwidth for _, bandwidth, _ in variants] == sorted((b for _, b, _ in variants), reverse=True),
+          "renditions ordered by bandwidth")
+
+    segment_counts = set()
+    for uri, _, resolution in variants:
+        durations = check_variant(hls_dir, uri, resolution, segment_seconds)
+        segment_counts.add(len(durations))
+        if expected_seconds is not None and durations:
+            check(abs(sum(durations) - expected_seconds) < 0.05,
+                  f"{uri}: total {sum(durations):.3f}s (clip {expected_seconds:.3f}s)")
+    check(len(segment_counts) == 1, "every rendition has the same number of segments")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--hls_dir", default=None, help="검사할 HLS 폴더 (master.m3u8가 있는 곳)")
+    parser.add_argument("--image", default=os.path.join(ROOT, "test_data", "theft.jpg"))
+    parser.add_argument("--seconds", type=float, default=9.5, help="세그먼트 길이로 나누어떨어지지 않게 잡아 마지막 세그먼트도 검사한다")
+    parser.add_argument("--fps", type=float, default=30.0)
+    parser.add_argument("--segment_seconds", type=float, default=HLS_SEGMENT_SECONDS)
+    args = parser.parse_args()
+
+    if args.hls_dir:
+        check_hls(args.hls_dir, segment_seconds=args.segment_seconds)
+    else:
+        image = cv2.imread(args.image)
+        num_frames = int(round(args.seconds * args.fps))
+        clip_frames = np.stack([np.roll(image, i * 4, axis=1) for i in range(num_frames)])
+        with tempfile.TemporaryDirectory() as output_dir:
+            hls_dir = os.path.join(output_dir, "clip")
+            check(write_hls(clip_frames, args.fps, hls_dir, segment_seconds=args.segment_seconds) is not None,
+                  "write_hls succeeded")
+            check(not os.path.exists(hls_dir + ".part"), "temporary .part folder removed")
+            check_hls(hls_dir, num_frames / args.fps, args.segment_seconds)
+
+    print(f"\n{'FAILED' if failures else 'OK'}: {len(failures)} failed checks")
+    sys.exit(1 if failures else 0)
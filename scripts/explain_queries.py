@@ -0,0 +1,247 @@
+"""라우트에서 실행하는 조회 쿼리의 EXPLAIN QUERY PLAN 출력 (전체 테이블 스캔/임시 정렬이 있으면 표시)
+
+SQL을 옮겨 적지 않고 라우트 함수와 수집 워커 함수를 그대로 호출해, 실제로 실행된 SELECT 문과 파라미터의 계획을 확인한다.
+임시 작업 디렉터리에서 실행하므로 videos/, output/ 아래 파일을 건드리지 않고, 수집 워커가 넣는 이벤트는 롤백한다.
+
+python scripts/explain_queries.py                      # 빈 임시 DB에 스키마, 인덱스, 샘플 사용자/매장/카메라만 만들어 확인
+python scripts/explain_queries.py --events 10000000    # 이벤트 행을 채우고 ANALYZE 후 확인
+python scripts/explain_queries.py --db cctv_system.db  # 실제 DB 확인 (첫 번째 카메라 기준, 인덱스 마이그레이션이 먼저 적용된다)
+"""
+import argparse
+import asyncio
+import os
+import random
+import re
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from fastapi import HTTPException, Response
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import Session
+from starlette.requests import Request
+
+from dependencies import db as db_module
+from dependencies.cache import CACHES
+from dependencies.models import User, Store, Camera, Event
+from dependencies.pagination import encode_cursor
+from dependencies.schemas import SignInRequest
+from routes import auth, camera, events, previews, store, user
+
+SAMPLE_PASSWORD = "explain"
+# 행 수가 적어 통째로 읽어 캐시하는 테이블 (lookups.get_event_types). 전체 스캔이어도 표시하지 않는다
+WHOLE_TABLE_READS = {"event_type"}
+
+# 라우트별로 실행된 SELECT 문 (라우트, SQL, 파라미터)
+captured = []
+current_route = None
+
+
+def capture_select(conn, cursor, statement, parameters, context, executemany):
+    if current_route and statement.lstrip().upper().startswith("SELECT"):
+        entry = (current_route, statement, tuple(parameters))
+        if entry not in captured:
+            captured.append(entry)
+
+
+def fill_events(conn, num_events, batch=100000):
+    started = datetime.utcnow() - timedelta(days=365)
+    for offset in range(0, num_events, batch):
+        rows = [
+            (random.randint(1, 100), random.randint(1, 300), random.randint(1, 1000), random.randint(1, 4),
+             (started + timedelta(seconds=3 * i)).strftime("%Y-%m-%d %H:%M:%S.%f"),
+             f"http://localhost:8000/output/bench/clips/{i}.mp4")
+            for i in range(offset, min(offset + batch, num_events))
+        ]
+        conn.exec_driver_sql(
+            "INSERT INTO event (user_id, store_id, camera_id, type_id, event_time, video_url) VALUES (?, ?, ?, ?, ?, ?)",
+            rows)
+    conn.exec_driver_sql("ANALYZE")
+
+
+def add_sample_rows(conn):
+    # 임시 DB: 라우트가 404로 끝나지 않고 끝까지 조회하도록 사용자/매장/카메라를 하나씩 만든다 (이벤트 행과 같은 id 1)
+    conn.execute(User.__table__.insert().values(
+        id=1, username="user1", email="user1@example.com", password_hash=auth.hash_password(SAMPLE_PASSWORD)))
+    conn.execute(Store.__table__.insert().values(id=1, user_id=1, name="store1", location=""))
+    conn.execute(Camera.__table__.insert().values(id=1, user_id=1, store_id=1, name="cam1"))
+
+
+def load_sample(conn):
+    # 첫 번째 카메라와 그 매장/사용자, 이벤트 종류 하나를 라우트 파라미터로 쓴다
+    row = conn.execute(text(
+        "SELECT user.id, user.username, store.id, store.name, camera.id, camera.name FROM camera "
+        "JOIN store ON store.id = camera.store_id JOIN user ON user.id = camera.user_id ORDER BY camera.id LIMIT 1"
+    )).first()
+    if row is None:
+        return None
+    event_type = conn.execute(text("SELECT type FROM event_type ORDER BY id LIMIT 1")).scalar()
+    event_id = conn.execute(text("SELECT MAX(id) FROM event")).scalar() or 1
+    keys = ("user_id", "username", "store_id", "store_name", "camera_id", "camera_name")
+    return dict(zip(keys, row), event_type=event_type, event_id=event_id)
+
+
+def alerts_request(user_id):
+    return Request({"type": "http", "method": "GET", "query_string": f"user_id={user_id}".encode(), "headers": []})
+
+
+def route_calls(sample, cursor):
+    """(라우트, 호출) 목록. 호출은 async 세션을 받아 라우트 함수를 FastAPI 없이 직접 부른다"""
+    user_id, store_name, camera_name = sample["user_id"], sample["store_name"], sample["camera_name"]
+    page = dict(limit=events.DEFAULT_PAGE_SIZE, before=None, after=None, type=None, risk_level=None)
+    return [
+        ("POST /login", lambda db: auth.login(
+            SignInRequest(identifier=sample["username"], password=SAMPLE_PASSWORD), db)),
+        ("GET /api/user/profile", lambda db: user.get_user_profile(user_id=user_id, db=db)),
+        ("GET /api/user/stores", lambda db: store.get_user_stores(user_id=str(user_id), db=db)),
+        ("GET /api/user/stores/detail", lambda db: store.get_user_stores_detail(user_id=str(user_id), db=db)),
+        ("GET /api/store/cameras", lambda db: camera.get_cameras_by_store(user_id=user_id, store=store_name, db=db)),
+        ("GET /api/user/alerts/", lambda db: events.get_alerts(
+            alerts_request(user_id), Response(), db=db, **page)),
+        ("GET /api/user/alerts/?before=", lambda db: events.get_alerts(
+            alerts_request(user_id), Response(), db=db, **dict(page, before=cursor))),
+        ("GET /api/user/alerts/?after=&type=", lambda db: events.get_alerts(
+            alerts_request(user_id), Response(), db=db, **dict(page, after=cursor, type=sample["event_type"]))),
+        ("GET /api/user/alerts/stream (backlog)", lambda db: events.load_alert_backlog(user_id, cursor)),
+        ("GET /api/store/events", lambda db: camera.get_camera_events(
+            Response(), store=store_name, camera_label=camera_name, db=db, **page)),
+        ("GET /api/store/events?before=&risk_level=", lambda db: camera.get_camera_events(
+            Response(), store=store_name, camera_label=camera_name, db=db, **dict(page, before=cursor, risk_level="high"))),
+        ("GET /api/event-types", lambda db: events.list_event_types(db=db)),
+        ("POST /api/start-detection/", lambda db: events.start_detection(sample["store_id"], sample["camera_id"], db=db)),
+        ("GET /api/events/{event_id}/previews", lambda db: previews.load_previews(db, sample["event_id"])),
+    ]
+
+
+def create_rollback_engine(db_path):
+    # pysqlite 드라이버는 BEGIN을 직접 보내지 않아 SAVEPOINT 안의 commit이 그대로 확정된다.
+    # 드라이버의 트랜잭션 처리를 끄고 BEGIN을 직접 보내야 바깥 트랜잭션 롤백으로 전부 되돌릴 수 있다
+    rollback_engine = create_engine(f"sqlite:///{db_path}")
+
+    @event.listens_for(rollback_engine, "connect")
+    def disable_driver_transactions(dbapi_connection, _):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(rollback_engine, "begin")
+    def emit_begin(conn):
+        conn.exec_driver_sql("BEGIN")
+
+    event.listen(rollback_engine, "before_cursor_execute", capture_select)
+    return rollback_engine
+
+
+def run_ingestion(sample, db_path):
+    # 탐지기와 같은 output/<user>/<store>/<camera>/{clips,captures} 구조로 빈 클립/캡처를 만들어 ingest_clip_batch를 그대로 실행한다.
+    # 바깥 트랜잭션을 롤백하므로 함수 안의 commit이 있어도 DB에는 남지 않는다
+    camera_dir = os.path.join(events.BASE_OUTPUT_DIR, sample["username"], sample["store_name"],
+                              camera.sanitize_name(sample["camera_name"]))
+    os.makedirs(os.path.join(camera_dir, "clips"), exist_ok=True)
+    os.makedirs(os.path.join(camera_dir, "captures"), exist_ok=True)
+    clip_path = os.path.join(camera_dir, "clips", f"20250101T00-00-00_{sample['event_type']}_clip_0.mp4")
+    open(clip_path, "wb").close()
+    open(os.path.join(camera_dir, "captures", f"20250101T00-00-00_{sample['event_type']}_capture_0.jpg"), "wb").close()
+    rollback_engine = create_rollback_engine(db_path)
+    with rollback_engine.connect() as conn:
+        transaction = conn.begin()
+        db = Session(bind=conn, join_transaction_mode="create_savepoint")
+        try:
+            events.ingest_clip_batch(db, [clip_path])
+        finally:
+            db.close()
+            transaction.rollback()
+    rollback_engine.dispose()
+
+
+async def run_routes(sample, cursor, db_path):
+    global current_route
+    session_factory = async_sessionmaker(bind=db_module.async_engine, autoflush=False, expire_on_commit=False)
+    # 알림 스트림 백로그는 라우트 세션이 아니라 모듈의 세션 팩토리로 조회한다
+    events.AsyncSessionLocal = session_factory
+    statuses = {}
+    for route, call in route_calls(sample, cursor) + [("ingestion (ingest_clip_batch)", None)]:
+        # 라우트마다 캐시가 비어 있을 때 실행되는 쿼리를 모두 본다
+        for cache in CACHES:
+            cache.clear()
+        current_route = route
+        try:
+            if call is None:
+                run_ingestion(sample, db_path)
+            else:
+                async with session_factory() as db:
+                    await call(db)
+        except HTTPException as e:
+            # 샘플 데이터에 없는 영상/미리보기 등은 404로 끝난다. 그 전까지 실행된 쿼리는 그대로 확인한다
+            statuses[route] = f"HTTP {e.status_code}: {e.detail}"
+        current_route = None
+    return statuses
+
+
+def short_sql(sql):
+    # 컬럼 목록은 길기만 하므로 줄인다
+    sql = " ".join(sql.split())
+    return re.sub(r"^SELECT (.+?) FROM ", lambda m: "SELECT ... FROM " if "," in m.group(1) else m.group(0), sql)
+
+
+def is_full_scan(detail):
+    # "SCAN <table>"은 인덱스 없이 테이블 전체를 읽는다 (covering index 스캔도 전체를 읽으므로 함께 표시)
+    if detail.startswith("SCAN"):
+        return detail.split()[1] not in WHOLE_TABLE_READS
+    return "TEMP B-TREE" in detail
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--db", default=None, help="확인할 SQLite 파일 (없으면 임시 DB 사용)")
+    parser.add_argument("--events", type=int, default=0, help="임시 DB에 채울 이벤트 행 수")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        db_path = os.path.abspath(args.db) if args.db else os.path.join(workdir, "explain.db")
+        os.chdir(workdir)
+        db_module.engine = create_engine(f"sqlite:///{db_path}")
+        db_module.async_engine = db_module.create_async_db_engine(db_path)
+        db_module.Base.metadata.create_all(bind=db_module.engine)
+        db_module.migrate_db()
+
+        with db_module.engine.begin() as conn:
+            if not args.db:
+                if args.events:
+                    fill_events(conn, args.events)
+                # ANALYZE 뒤에 넣어, 한두 행짜리 테이블을 전체 스캔하는 계획이 나오지 않게 한다 (실제 DB는 행이 많다)
+                add_sample_rows(conn)
+            sample = load_sample(conn)
+        if sample is None:
+            print(f"{db_path}: 카메라가 없어 라우트를 실행할 수 없습니다")
+            sys.exit(1)
+        # 로그인 비밀번호가 다른 실제 DB에서도 알림 조회가 401로 끝나지 않게 한다
+        events.user_last_login_time.setdefault(sample["user_id"], datetime.utcnow())
+        cursor = encode_cursor(Event(event_time=datetime.utcnow(), id=sample["event_id"]))
+
+        event.listen(db_module.engine, "before_cursor_execute", capture_select)
+        event.listen(db_module.async_engine.sync_engine, "before_cursor_execute", capture_select)
+        statuses = asyncio.run(run_routes(sample, cursor, db_path))
+        asyncio.run(db_module.async_engine.dispose())
+        event.remove(db_module.engine, "before_cursor_execute", capture_select)
+
+        problems = 0
+        last_route = None
+        with db_module.engine.connect() as conn:
+            for route, sql, params in captured:
+                if route != last_route:
+                    print(f"\n{route}" + (f" ({statuses[route]})" if route in statuses else ""))
+                    last_route = route
+                plan = [row[3] for row in conn.exec_driver_sql("EXPLAIN QUERY PLAN " + sql, params)]
+                flagged = any(is_full_scan(detail) for detail in plan)
+                problems += flagged
+                print(f"  {'!!' if flagged else 'ok'} {short_sql(sql)}")
+                for detail in plan:
+                    print(f"       {detail}")
+        db_module.engine.dispose()
+        os.chdir(ROOT)
+
+    print(f"\n{len(captured)} queries, {problems} with full scans or temp sorts")
+    sys.exit(1 if problems else 0)
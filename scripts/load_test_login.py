@@ -0,0 +1,49 @@
+"""같은 사용자로 여러 번 로그인해도 로그인 비용과 수집 워커 상태가 일정한지 확인
+
+python scripts/load_test_login.py --identifier testuser --password 1234 --logins 50
+(서버가 먼저 실행 중이어야 한다: uvicorn main:app)
+"""
+import argparse
+import statistics
+import time
+
+import requests
+
+
+def get_stats(base_url):
+    return requests.get(f"{base_url}/api/ingestion/stats", timeout=10).json()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--base_url", default="http://localhost:8000")
+    parser.add_argument("--identifier", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--logins", type=int, default=50)
+    args = parser.parse_args()
+
+    before = get_stats(args.base_url)
+    latencies = []
+    thread_counts = []
+    queue_depths = []
+    for i in range(args.logins):
+        started = time.perf_counter()
+        res = requests.post(f"{args.base_url}/login",
+                            json={"identifier": args.identifier, "password": args.password}, timeout=60)
+        latencies.append(time.perf_counter() - started)
+        res.raise_for_status()
+        stats = get_stats(args.base_url)
+        thread_counts.append(stats["active_threads"])
+        queue_depths.append(stats["queue_depth"])
+    after = get_stats(args.base_url)
+
+    chunk = max(1, args.logins // 5)
+    print(f"\n{'logins':<10} {'avg ms':>8} {'max ms':>8} {'threads':>8} {'queue':>6}")
+    for start in range(0, args.logins, chunk):
+        end = min(start + chunk, args.logins)
+        window = latencies[start:end]
+        print(f"{start + 1:>3}-{end:<6} {statistics.mean(window) * 1000:>8.1f} {max(window) * 1000:>8.1f} "
+              f"{max(thread_counts[start:end]):>8} {max(queue_depths[start:end]):>6}")
+
+    print(f"\nthreads: {before['active_threads']} -> {after['active_threads']}, "
+          f"watch mode: {after['watch_mode']}, worker alive: {after['worker_alive']}")
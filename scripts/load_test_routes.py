@@ -0,0 +1,77 @@
+"""동시 클라이언트 N개로 조회 API에 부하를 걸어 엔드포인트별 requests/sec와 p50/p99 지연 측정
+
+python scripts/load_test_routes.py --identifier user1 --password password1 --store store1 --clients 500
+(서버가 먼저 실행 중이어야 한다: uvicorn main:app)
+"""
+import argparse
+import asyncio
+import time
+
+import httpx
+
+
+def percentile(values, pct):
+    if not values:
+        return float("nan")
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+async def client_loop(client, requests_to_send, deadline, results):
+    i = 0
+    while time.perf_counter() < deadline:
+        name, url, params = requests_to_send[i % len(requests_to_send)]
+        i += 1
+        started = time.perf_counter()
+        try:
+            res = await client.get(url, params=params)
+            ok = res.status_code < 500
+        except httpx.HTTPError:
+            ok = False
+        results[name].append((time.perf_counter() - started, ok))
+
+
+async def main(args):
+    limits = httpx.Limits(max_connections=args.clients, max_keepalive_connections=args.clients)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=60) as client:
+        res = await client.post("/login", json={"identifier": args.identifier, "password": args.password})
+        res.raise_for_status()
+        user_id = res.json()["user_id"]
+
+        requests_to_send = [
+            ("/api/user/stores", "/api/user/stores", {"user_id": user_id}),
+            ("/api/store/cameras", "/api/store/cameras", {"user_id": user_id, "store": args.store}),
+            ("/api/user/alerts/", "/api/user/alerts/", {"user_id": user_id}),
+        ]
+        results = {name: [] for name, _, _ in requests_to_send}
+        deadline = time.perf_counter() + args.seconds
+        started = time.perf_counter()
+        await asyncio.gather(*[
+            # 클라이언트마다 시작 엔드포인트를 달리해 세 API에 고르게 부하를 건다
+            client_loop(client, requests_to_send[i % 3:] + requests_to_send[:i % 3], deadline, results)
+            for i in range(args.clients)
+        ])
+        elapsed = time.perf_counter() - started
+
+    print(f"\n{args.clients} clients, {elapsed:.1f}s")
+    print(f"{'endpoint':<22} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    total = 0
+    for name, samples in results.items():
+        latencies = [latency for latency, _ in samples]
+        errors = sum(1 for _, ok in samples if not ok)
+        total += len(samples)
+        print(f"{name:<22} {len(samples) / elapsed:>8.0f} {percentile(latencies, 50) * 1000:>8.1f} "
+              f"{percentile(latencies, 99) * 1000:>8.1f} {errors:>7}")
+    print(f"{'total':<22} {total / elapsed:>8.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--base_url", default="http://localhost:8000")
+    parser.add_argument("--identifier", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--store", required=True)
+    parser.add_argument("--clients", type=int, default=500)
+    parser.add_argument("--seconds", type=float, default=20.0)
+    args = parser.parse_args()
+    asyncio.run(main(args))
@@ -0,0 +1,70 @@
+"""로컬 영상을 실제 속도로 재생해 카메라 스트림 대신 쓰고, 스트림 모드(stream=True)를 확인한다.
+클립이 소스가 끝나기 전에 바로바로 저장되는지, 추론이 밀려 버린 프레임 수와 재연결 횟수를 출력한다.
+
+python scripts/replay_stream.py --video test_data/theft.mp4 --model yolo/best.pt --replays 1
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+import cv2
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "yolo"))
+
+from detect import YOLOEventClipper
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--video", default=os.path.join(ROOT, "test_data", "theft.mp4"))
+    parser.add_argument("--model", default=os.path.join(ROOT, "yolo", "best.pt"))
+    parser.add_argument("--replays", type=int, default=0, help="영상이 끝나면 재연결로 처음부터 다시 재생할 횟수")
+    parser.add_argument("--stop_after", type=float, default=None, help="초 단위. 지정하면 그 시점에 stop()으로 끝낸다")
+    parser.add_argument("--batch_size", type=int, default=1)
+    parser.add_argument("--merge_gap_seconds", type=float, default=30.0)
+    parser.add_argument("--max_lag_seconds", type=float, default=2.0)
+    args = parser.parse_args()
+
+    cap = cv2.VideoCapture(args.video)
+    video_seconds = cap.get(cv2.CAP_PROP_FRAME_COUNT) / (cap.get(cv2.CAP_PROP_FPS) or 1)
+    cap.release()
+
+    saved = []
+    started = time.monotonic()
+
+    def on_clip_saved(clip_path, img_path):
+        saved.append((time.monotonic() - started, os.path.basename(clip_path)))
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        clipper = YOLOEventClipper(
+            model_path=args.model,
+            video_path=args.video,
+            output_dir=output_dir,
+            batch_size=args.batch_size,
+            merge_gap_seconds=args.merge_gap_seconds,
+            stream=True,
+            realtime=True,
+            reconnect_delay=0.5,
+            max_reconnects=args.replays,
+            max_lag_seconds=args.max_lag_seconds,
+            on_clip_saved=on_clip_saved,
+        )
+        if args.stop_after is not None:
+            threading.Timer(args.stop_after, clipper.stop).start()
+        clipper.run()
+        elapsed = time.monotonic() - started
+
+    source_seconds = video_seconds * (args.replays + 1)
+    print(f"\n{'saved at':>9}  clip")
+    for saved_at, clip_name in saved:
+        print(f"{saved_at:>8.1f}s  {clip_name}")
+    incremental = sum(1 for saved_at, _ in saved if saved_at < source_seconds)
+    print(f"\nsource {source_seconds:.1f}s, run {elapsed:.1f}s, frames {clipper.frames_buffer.end_frame if clipper.frames_buffer else 0}, "
+          f"inferred {clipper.inferred_frames}")
+    print(f"clips saved before the source ended: {incremental}/{len(saved)}")
+    print(f"dropped (inference behind) {clipper.dropped_frames + clipper.stale_frames}, "
+          f"skipped (buffer full) {clipper.skipped_frames}, reconnects {clipper.reconnects}")
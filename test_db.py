@@ -55,7 +55,8 @@ def create_database(conn):
         camera_id INTEGER NOT NULL,
         type_id INTEGER NOT NULL,
         event_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        video_url TEXT NOT NULL
+        video_url TEXT NOT NULL,
+        playlist_url TEXT
     )
     ''')
 
@@ -1,13 +1,264 @@
 # yolo/detect.py
 
-import torch
 import numpy as np
-from ultralytics import YOLO
 import cv2
 import os
+import shutil
 import subprocess
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 import re
+import json
+import sqlite3
+from contextlib import closing
+
+MOTION_FRAME_SIZE = (64, 36)
+# 스트림이 FPS를 알려 주지 않거나 비정상 값을 줄 때 쓰는 FPS
+STREAM_DEFAULT_FPS = 30.0
+# event_type 테이블을 읽을 수 없을 때 쓰는 기본 이벤트 종류 {type: id}. 서버는 빈 DB에 같은 id로 넣는다 (migrate_db)
+DEFAULT_EVENT_TYPES = {"theft": 1, "fall": 2, "fight": 3, "smoke": 4}
+# 이벤트 목록 화면용 미리보기: 썸네일 너비/형식, 스프라이트 시트 프레임 수와 칸 크기
+THUMBNAIL_WIDTHS = (160, 320)
+THUMBNAIL_FORMATS = ("webp", "jpg")
+SPRITE_FRAMES = 10
+SPRITE_TILE_WIDTH = 160
+SPRITE_COLUMNS = 5
+PREVIEW_QUALITY = 80
+# HLS 출력: (세로 해상도, 영상 비트레이트 kbps). 원본보다 큰 화질은 만들지 않는다
+HLS_RENDITIONS = ((720, 2500), (480, 1000), (360, 500))
+HLS_SEGMENT_SECONDS = 2
+# 파일 처리 진행 상황 저장 간격(영상 기준 초)과 파일 이름 (영상별 출력 폴더에 둔다)
+CHECKPOINT_SECONDS = 30.0
+CHECKPOINT_FILENAME = "checkpoint.json"
+# 스트림 모드에서 event_type 테이블을 다시 읽는 간격(초). 실행 중에 추가된 이벤트 종류를 반영한다
+EVENT_TYPES_RELOAD_SECONDS = 60.0
+
+
+def load_event_types(db_path):
+    """event_type 테이블을 {type: id}로 읽는다. DB나 테이블이 없으면 None"""
+    if not db_path or not os.path.exists(db_path):
+        return None
+    try:
+        with closing(sqlite3.connect(db_path)) as conn:
+            rows = conn.execute("SELECT id, type FROM event_type").fetchall()
+    except sqlite3.Error as e:
+        print(f"[Warn] event_type 테이블 조회 실패: {e}")
+        return None
+    return {str(name).lower(): type_id for type_id, name in rows} or None
+
+
+def build_class_type_ids(names, event_types):
+    """모델 클래스 인덱스 -> 이벤트 type_id 배열 (이벤트가 아니면 0).
+    클래스 이름에 이벤트 종류 이름이 포함되면 그 종류로 본다 (예: smoke_event -> smoke)."""
+    if isinstance(names, dict):
+        items = names.items()
+    else:
+        items = enumerate(names)
+    items = [(int(idx), str(name)) for idx, name in items]
+    lookup = np.zeros(max((idx for idx, _ in items), default=-1) + 1, dtype=np.int64)
+    for idx, name in items:
+        for label, type_id in event_types.items():
+            if label in name:
+                lookup[idx] = type_id
+                break
+    return lookup
+
+
+def video_fingerprint(video_path):
+    # 체크포인트/처리 완료 목록이 같은 영상의 것인지 확인하는 값. 파일이 바뀌면 처음부터 다시 처리한다
+    st = os.stat(video_path)
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def _write_file_atomic(path, data):
+    temp_path = path + ".part"
+    with open(temp_path, "wb") as f:
+        f.write(data)
+    os.replace(temp_path, path)
+
+
+def _encode_image(image, image_format, quality=PREVIEW_QUALITY):
+    if image_format == "webp":
+        params = [cv2.IMWRITE_WEBP_QUALITY, quality]
+    else:
+        params = [cv2.IMWRITE_JPEG_QUALITY, quality]
+    ok, data = cv2.imencode(f".{image_format}", image, params)
+    return data.tobytes() if ok else None
+
+
+def _resize_to_width(frame, width):
+    height, frame_width = frame.shape[:2]
+    if width >= frame_width:
+        return frame
+    return cv2.resize(frame, (width, max(1, round(height * width / frame_width))), interpolation=cv2.INTER_AREA)
+
+
+def write_clip_previews(clip_frames, fps, preview_base, thumbnail_widths=THUMBNAIL_WIDTHS,
+                        thumbnail_formats=THUMBNAIL_FORMATS, sprite_frames=SPRITE_FRAMES):
+    """메모리에 있는 클립 프레임으로 썸네일(너비 x 형식)과 스프라이트 시트를 만든다.
+    파일은 preview_base + "_<너비>.<형식>", "_sprite.<형식>"이고, 마지막에 목록(preview_base + ".json")을 쓴다.
+    썸네일은 캡처 이미지와 같은 첫 프레임, 스프라이트는 클립 전체에서 고르게 뽑은 프레임이다."""
+    directory = os.path.dirname(preview_base)
+    manifest = {"thumbnails": [], "sprite": None}
+
+    # 큰 너비부터 줄여 가며 만들어 원본 해상도 축소는 한 번만 한다. 원본보다 큰 너비는 원본 너비로 맞춘다
+    image = clip_frames[0]
+    for width in sorted({min(int(width), image.shape[1]) for width in thumbnail_widths}, reverse=True):
+        image = _resize_to_width(image, width)
+        for image_format in thumbnail_formats:
+            data = _encode_image(image, image_format)
+            if data is None:
+                continue
+            path = f"{preview_base}_{width}.{image_format}"
+            _write_file_atomic(path, data)
+            manifest["thumbnails"].append({"width": image.shape[1], "height": image.shape[0],
+                                           "format": image_format, "file": os.path.basename(path)})
+
+    if sprite_frames > 0:
+        indices = np.unique(np.linspace(0, len(clip_frames) - 1, min(sprite_frames, len(clip_frames))).round().astype(int))
+        tiles = [_resize_to_width(clip_frames[idx], SPRITE_TILE_WIDTH) for idx in indices]
+        tile_height, tile_width = tiles[0].shape[:2]
+        columns = min(SPRITE_COLUMNS, len(tiles))
+        rows = -(-len(tiles) // columns)
+        sheet = np.zeros((rows * tile_height, columns * tile_width, 3), dtype=np.uint8)
+        for i, tile in enumerate(tiles):
+            row, column = divmod(i, columns)
+            sheet[row * tile_height:(row + 1) * tile_height, column * tile_width:(column + 1) * tile_width] = tile
+        files = {}
+        for image_format in thumbnail_formats:
+            data = _encode_image(sheet, image_format)
+            if data is None:
+                continue
+            path = f"{preview_base}_sprite.{image_format}"
+            _write_file_atomic(path, data)
+            files[image_format] = os.path.basename(path)
+        if files:
+            manifest["sprite"] = {
+                "tile_width": tile_width,
+                "tile_height": tile_height,
+                "columns": columns,
+                "rows": rows,
+                "times": [round(float(idx) / fps, 3) for idx in indices],  # 각 칸의 클립 내 시각(초)
+                "files": files,
+            }
+
+    _write_file_atomic(preview_base + ".json", json.dumps(manifest).encode())
+    return manifest
+
+
+def write_hls(clip_frames, fps, hls_dir, renditions=HLS_RENDITIONS, segment_seconds=HLS_SEGMENT_SECONDS,
+              preset="veryfast"):
+    """클립 프레임을 ffmpeg 한 번으로 여러 화질의 HLS(VOD)로 만든다.
+    hls_dir/master.m3u8 아래 화질별 <세로>p/index.m3u8, segment_NNN.ts가 생기며,
+    모든 화질의 키프레임을 segment_seconds 간격으로 맞춰 플레이어가 세그먼트 경계에서 화질을 바꿀 수 있게 한다.
+    성공하면 master.m3u8 경로, 실패하면 None"""
+    height, width = clip_frames[0].shape[:2]
+    renditions = [(rendition_height, bitrate) for rendition_height, bitrate in renditions if rendition_height <= height]
+    if not renditions:
+        renditions = [(height - height % 2, HLS_RENDITIONS[-1][1])]
+    gop = max(1, round(fps * segment_seconds))
+
+    # 다 만들어진 뒤에 폴더 이름을 바꿔 반쯤 쓰인 재생 목록이 노출되지 않게 한다
+    temp_dir = hls_dir + ".part"
+    shutil.rmtree(temp_dir, ignore_errors=True)
+    os.makedirs(temp_dir)
+
+    filters = [f"[0:v]split={len(renditions)}" + "".join(f"[s{i}]" for i in range(len(renditions)))]
+    filters += [f"[s{i}]scale=-2:{rendition_height}[v{i}]" for i, (rendition_height, _) in enumerate(renditions)]
+    cmd = [
+        "ffmpeg", "-y", "-loglevel", "error",
+        "-f", "rawvideo", "-pix_fmt", "bgr24", "-s", f"{width}x{height}", "-r", str(fps), "-i", "-",
+        "-filter_complex", ";".join(filters),
+    ]
+    for i, (_, bitrate) in enumerate(renditions):
+        cmd += ["-map", f"[v{i}]", f"-b:v:{i}", f"{bitrate}k", f"-maxrate:v:{i}", f"{bitrate * 107 // 100}k",
+                f"-bufsize:v:{i}", f"{bitrate * 3 // 2}k"]
+    cmd += [
+        "-c:v", "libx264", "-preset", preset, "-profile:v", "baseline", "-pix_fmt", "yuv420p",
+        "-g", str(gop), "-keyint_min", str(gop), "-sc_threshold", "0",
+        "-f", "hls", "-hls_time", str(segment_seconds), "-hls_playlist_type", "vod",
+        "-hls_flags", "independent_segments",
+        "-hls_segment_filename", os.path.join(temp_dir, "%v", "segment_%03d.ts"),
+        "-master_pl_name", "master.m3u8",
+        "-var_stream_map", " ".join(f"v:{i},name:{rendition_height}p"
+                                    for i, (rendition_height, _) in enumerate(renditions)),
+        os.path.join(temp_dir, "%v", "index.m3u8"),
+    ]
+    proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    _, stderr = proc.communicate(memoryview(np.ascontiguousarray(clip_frames)).cast("B"))
+    if proc.returncode != 0:
+        print(f"[Error] HLS 인코딩 실패: {stderr.decode(errors='ignore').strip()}")
+        shutil.rmtree(temp_dir, ignore_errors=True)
+        return None
+    shutil.rmtree(hls_dir, ignore_errors=True)
+    os.replace(temp_dir, hls_dir)
+    return os.path.join(hls_dir, "master.m3u8")
+
+
+class FrameRingBuffer:
+    """고정 크기 프레임 버퍼. (N, H, W, 3) 배열 하나를 미리 할당해 두고 절대 프레임 번호로 접근한다."""
+
+    def __init__(self, capacity, frame_shape, dtype=np.uint8, start_frame=0):
+        self.capacity = capacity
+        self.frames = np.empty((capacity, *frame_shape), dtype=dtype)
+        # 이어서 처리할 때는 중간 프레임 번호부터 채운다
+        self.start_frame = start_frame
+        self.end_frame = start_frame
+
+    def __len__(self):
+        return self.end_frame - self.start_frame
+
+    def next_slot(self):
+        return self.frames[self.end_frame % self.capacity]
+
+    def commit(self):
+        self.end_frame += 1
+        if self.end_frame - self.start_frame > self.capacity:
+            self.start_frame = self.end_frame - self.capacity
+
+    def push(self, frame):
+        self.next_slot()[...] = frame
+        self.commit()
+
+    def get(self, frame_idx):
+        return self.frames[frame_idx % self.capacity]
+
+    def get_range(self, start_frame, end_frame, copy=False):
+        # 버퍼에 남아 있는 구간으로 잘라낸다. 랩어라운드가 없고 copy=False면 복사 없이 view를 반환한다.
+        start_frame = max(start_frame, self.start_frame)
+        end_frame = min(end_frame, self.end_frame)
+        if end_frame <= start_frame:
+            return self.frames[:0].copy() if copy else self.frames[:0]
+        first = start_frame % self.capacity
+        last = first + (end_frame - start_frame)
+        if last <= self.capacity:
+            frames = self.frames[first:last]
+            return frames.copy() if copy else frames
+        return np.concatenate((self.frames[first:], self.frames[:last - self.capacity]))
+
+
+class YOLODetector:
+    def __init__(self, model_path):
+        # 모델 서버 모드의 디코딩 워커가 torch/ultralytics를 불러오지 않도록 여기서 import 한다
+        from ultralytics import YOLO
+        self.model = YOLO(model_path)
+        self.names = self.model.names
+
+    def detect(self, frames):
+        results = self.model(frames if len(frames) > 1 else frames[0], verbose=False)
+        detections = []
+        for result in results:
+            if result.boxes is not None:
+                boxes = result.boxes
+                detections.append((boxes.cls.cpu().numpy().astype(int), boxes.conf.cpu().numpy()))
+            else:
+                detections.append((np.empty(0, dtype=int), np.empty(0)))
+        return detections
+
 
 class YOLOEventClipper:
     def __init__(self, 
@@ -18,39 +269,139 @@ class YOLOEventClipper:
                  start_time=datetime.now(),
                  confidence_threshold=0.90,
                  valid_labels=None,
+                 event_types=None,
+                 event_types_db=None,
+                 event_types_reload_seconds=EVENT_TYPES_RELOAD_SECONDS,
                  base_clip_duration=5.0,
                  merge_gap_seconds=30.0,
                  max_buffer_seconds=30.0,
+                 batch_size=1,
+                 inference_stride=1,
+                 motion_threshold=None,
+                 decode_queue_size=32,
+                 clip_writers=2,
+                 max_pending_clips=4,
+                 encode_preset="veryfast",
+                 previews=True,
+                 thumbnail_widths=THUMBNAIL_WIDTHS,
+                 thumbnail_formats=THUMBNAIL_FORMATS,
+                 sprite_frames=SPRITE_FRAMES,
+                 hls=False,
+                 hls_renditions=HLS_RENDITIONS,
+                 hls_segment_seconds=HLS_SEGMENT_SECONDS,
+                 stream=False,
+                 realtime=False,
+                 reconnect_delay=1.0,
+                 max_reconnect_delay=30.0,
+                 max_reconnects=None,
+                 max_lag_seconds=2.0,
+                 checkpoint_path=None,
+                 checkpoint_seconds=CHECKPOINT_SECONDS,
+                 detector=None,
+                 on_clip_saved=None,
                  debug=False):
         
         self.DEBUG = debug
-        self.model = YOLO(model_path)
-        self.names = self.model.names
+        self.detector = detector or YOLODetector(model_path)
+        self.names = self.detector.names
+        self.on_clip_saved = on_clip_saved
         self.video_path = video_path
         self.output_dir = output_dir
         self.web_base_url = web_base_url
         self.video_start_time = start_time
 
         self.CONFIDENCE_THERESHOLD = confidence_threshold
-        self.VALID_EVENT_LABELS = valid_labels or {'theft', 'fall', 'fight', 'smoke'}
+        if event_types is None and event_types_db:
+            event_types = load_event_types(event_types_db)
+        if event_types is None and valid_labels:
+            event_types = {label: type_id for type_id, label in enumerate(sorted(valid_labels), start=1)}
+        self.set_event_types(event_types or DEFAULT_EVENT_TYPES)
         self.BASE_CLIP_DURATION = base_clip_duration
         self.MERGE_GAP_SECONDS = merge_gap_seconds
+        self.MAX_BUFFER_SECONDS = max_buffer_seconds
         self.MAX_BUFFER_FRAMES = None
+        self.BATCH_SIZE = max(1, int(batch_size))
+        self.INFERENCE_STRIDE = max(1, int(inference_stride))
+        self.MOTION_THRESHOLD = motion_threshold
+        self.DECODE_QUEUE_SIZE = max(1, int(decode_queue_size))
+        self.CLIP_WRITERS = max(1, int(clip_writers))
+        self.MAX_PENDING_CLIPS = max(1, int(max_pending_clips))
+        self.ENCODE_PRESET = encode_preset
+        self.PREVIEWS = previews
+        self.THUMBNAIL_WIDTHS = tuple(thumbnail_widths)
+        self.THUMBNAIL_FORMATS = tuple(thumbnail_formats)
+        self.SPRITE_FRAMES = max(0, int(sprite_frames))
+        self.HLS = hls
+        self.HLS_RENDITIONS = tuple(hls_renditions)
+        self.HLS_SEGMENT_SECONDS = hls_segment_seconds
+        self.STREAM = stream
+        self.REALTIME = realtime
+        self.RECONNECT_DELAY = reconnect_delay
+        self.MAX_RECONNECT_DELAY = max_reconnect_delay
+        self.MAX_RECONNECTS = max_reconnects
+        self.MAX_LAG_SECONDS = max_lag_seconds
+        # 파일 처리만 체크포인트를 쓴다 (스트림은 이어서 볼 위치가 없다)
+        self.CHECKPOINT_PATH = None if stream else checkpoint_path
+        self.CHECKPOINT_SECONDS = checkpoint_seconds
+        # 스트림은 계속 실행되므로 event_types_db의 event_type 테이블을 주기적으로(또는 요청 시) 다시 읽는다
+        self.EVENT_TYPES_DB = event_types_db if stream else None
+        self.EVENT_TYPES_RELOAD_SECONDS = event_types_reload_seconds
+        self.event_types_reload_requested = threading.Event()
+        self.last_event_types_reload = time.monotonic()
+        self.resume_frame = 0
+        self.decode_start_frame = 0
         self.padding_frames = None
+        self.fps = None
+        self.frames_buffer = None
+        self.frame_times = None
+        self.live_frame = 0
+        self.stream_lag_frames = None
+        self.stop_requested = threading.Event()
+        self.dropped_frames = 0
+        self.stale_frames = 0
+        self.skipped_frames = 0
+        self.reconnects = 0
 
         self.event_logs = []
+        self.event_frames = []
+        self.frame_count = 0
+        self.inferred_frames = 0
+        self.last_detection = (np.empty(0, dtype=int), np.empty(0))
+        self.last_motion_frame = None
         self.clip_counter = 0
         self.active_events = {}
 
+        self.clip_writer = None
+        # (future, 클립 작업) 제출 순서대로. 작업은 체크포인트에 남겨 재시작 시 다시 제출한다
+        self.clip_futures = deque()
+        self.pending_clip_jobs = []
+        self.pending_clip_slots = threading.BoundedSemaphore(self.MAX_PENDING_CLIPS)
+        self.stage_times = {}
+        self.stage_lock = threading.Lock()
+
         self._prepare_output_dirs()
 
     def _debug_log(self, *args):
         if self.DEBUG:
             print("[DEBUG]", *args)
 
+    def _add_stage_time(self, stage, seconds):
+        with self.stage_lock:
+            self.stage_times[stage] = self.stage_times.get(stage, 0.0) + seconds
+
+    def _print_stage_times(self):
+        print("\n[단계별 처리 시간]")
+        for stage, seconds in self.stage_times.items():
+            per_frame_ms = seconds * 1000 / self.frame_count if self.frame_count else 0.0
+            print(f"- {stage:<18} {seconds:8.2f}s  ({per_frame_ms:.2f} ms/frame)")
+
     def _prepare_output_dirs(self):
         os.makedirs(os.path.join(self.output_dir, "captures"), exist_ok=True)
         os.makedirs(os.path.join(self.output_dir, "clips"), exist_ok=True)
+        if self.PREVIEWS:
+            os.makedirs(os.path.join(self.output_dir, "thumbnails"), exist_ok=True)
+        if self.HLS:
+            os.makedirs(os.path.join(self.output_dir, "hls"), exist_ok=True)
 
     def _to_web_url(self, path):
         relative_path = path.replace(self.output_dir + "/", "")
@@ -59,152 +410,557 @@ class YOLOEventClipper:
     def _safe_filename(self, s):
         return re.sub(r'[\\/*?:"<>|{}]', "_", str(s))
 
-    def _convert_to_h264(self, input_path, output_path):
+    def _encode_h264(self, clip_frames, fps, output_path):
+        # BGR 프레임을 stdin으로 바로 넘겨 한 번만 인코딩한다 (브라우저 재생용 baseline/yuv420p/faststart)
+        height, width = clip_frames[0].shape[:2]
         cmd = [
-            "ffmpeg", "-y", "-i", input_path,
-            "-vcodec", "libx264", "-profile:v", "baseline",
-            "-level", "3.0", "-pix_fmt", "yuv420p",
-            "-acodec", "aac", "-strict", "experimental", output_path
+            "ffmpeg", "-y", "-loglevel", "error",
+            "-f", "rawvideo", "-pix_fmt", "bgr24", "-s", f"{width}x{height}", "-r", str(fps), "-i", "-",
+            "-vcodec", "libx264", "-preset", self.ENCODE_PRESET, "-profile:v", "baseline",
+            "-level", "3.0", "-pix_fmt", "yuv420p", "-movflags", "+faststart",
+            "-f", "mp4", output_path
         ]
-        subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-
-    def _normalize_label(self, label_raw):
-        if not isinstance(label_raw, str):
-            return f"invalid_label_{type(label_raw).__name__}"
-        for base_label in self.VALID_EVENT_LABELS:
-            if base_label in label_raw:
-                return base_label
-        return label_raw
-
-    def _save_clip(self, buffer, start_idx, end_idx, fps, output_base):
-        if start_idx >= len(buffer) or end_idx <= start_idx:
-            return False, None
-
-        clip_frames = buffer[start_idx:end_idx]
-        if not clip_frames:
+        proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        _, stderr = proc.communicate(memoryview(np.ascontiguousarray(clip_frames)).cast("B"))
+        if proc.returncode != 0:
+            print(f"[Error] ffmpeg 인코딩 실패: {stderr.decode(errors='ignore').strip()}")
+        return proc.returncode == 0
+
+    def set_event_types(self, event_types):
+        """이벤트 종류 {type: id}를 바꾸고 클래스 인덱스 조회 배열을 다시 만든다."""
+        self.event_types = {str(label).lower(): int(type_id) for label, type_id in event_types.items()}
+        self.event_labels = {type_id: label for label, type_id in self.event_types.items()}
+        self.VALID_EVENT_LABELS = set(self.event_types)
+        self.class_type_ids = build_class_type_ids(self.names, self.event_types)
+        # 탐지 후처리용: 클래스 인덱스 -> 이벤트 슬롯 번호 (이벤트가 아니면 -1).
+        # 범위를 벗어난 클래스는 take(mode="clip")으로 맨 끝의 -1 칸에 걸리게 한다
+        self.event_slot_labels = list(self.event_types)
+        slot_by_type_id = {type_id: slot for slot, type_id in enumerate(self.event_types.values())}
+        self.class_event_slots = np.array([slot_by_type_id.get(int(type_id), -1) for type_id in self.class_type_ids]
+                                          + [-1], dtype=np.int64)
+
+    def _detected_events(self, classes, confidences):
+        """한 프레임의 탐지 결과를 이벤트 종류별 최대 confidence로 줄인다.
+        박스 수와 무관하게 배열 연산만 하며, 결과는 confidence 내림차순이다
+        (YOLO 결과도 confidence 내림차순이므로 박스를 차례로 보던 예전 순서와 같다)."""
+        confidences = np.asarray(confidences)
+        if confidences.size == 0:
+            return []
+        confident = confidences >= self.CONFIDENCE_THERESHOLD
+        if not confident.any():
+            return []
+        slots = self.class_event_slots.take(np.asarray(classes)[confident], mode="clip")
+        is_event = slots >= 0
+        if not is_event.any():
+            return []
+        max_conf = np.full(len(self.event_slot_labels), -np.inf)
+        np.maximum.at(max_conf, slots[is_event], confidences[confident][is_event])
+        found = np.flatnonzero(max_conf > -np.inf)
+        found = found[np.argsort(-max_conf[found], kind="stable")]
+        return [(self.event_slot_labels[slot], float(max_conf[slot])) for slot in found]
+
+    def _save_clip(self, clip_frames, fps, output_base):
+        if len(clip_frames) == 0:
             return False, None
 
-        height, width = clip_frames[0].shape[:2]
-        temp_path = output_base + "_raw.mp4"
-
-        out = cv2.VideoWriter(temp_path, cv2.VideoWriter_fourcc(*'mp4v'), fps, (width, height))
-        for f in clip_frames:
-            out.write(f)
-        out.release()
-
+        # 인코딩이 끝난 뒤에 .mp4 이름으로 바꿔 반쯤 쓰인 파일이 노출되지 않게 한다
         final_path = output_base + ".mp4"
-        self._convert_to_h264(temp_path, final_path)
-        os.remove(temp_path)
-        return os.path.exists(final_path), final_path
-
-    def _save_event_clip(self, norm_label, start_frame, end_frame, frames_buffer, buffer_start_frame_idx, fps):
-        start_idx = max(0, start_frame - self.padding_frames - buffer_start_frame_idx)
-        end_idx = min(len(frames_buffer), end_frame + self.padding_frames - buffer_start_frame_idx)
+        temp_path = final_path + ".part"
+        if not self._encode_h264(clip_frames, fps, temp_path):
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            return False, None
+        os.replace(temp_path, final_path)
+        return True, final_path
+
+    def _save_event_clip(self, norm_label, start_frame, end_frame, current_frame):
+        # 배치 모드에서도 프레임별 처리 시점에 버퍼에 있던 구간만 사용한다.
+        # 링 버퍼 슬롯은 디코더가 곧 덮어쓰므로 클립 작성 스레드에는 복사본을 넘긴다.
+        started = time.perf_counter()
+        first_frame = max(start_frame - self.padding_frames, current_frame - self.MAX_BUFFER_FRAMES + 1,
+                          self.frames_buffer.start_frame)
+        last_frame = min(end_frame + self.padding_frames, current_frame + 1, self.frames_buffer.end_frame)
+        clip_frames = self.frames_buffer.get_range(first_frame, last_frame, copy=True)
+        self._add_stage_time("clip_copy", time.perf_counter() - started)
+
+        job = {"label": norm_label, "start_frame": start_frame, "end_frame": end_frame,
+               "first_frame": first_frame, "last_frame": last_frame, "clip_number": self.clip_counter}
+        self.clip_counter += 1
+        self._submit_clip(job, clip_frames)
 
+    def _submit_clip(self, job, clip_frames):
+        norm_label = job["label"]
         safe_label = self._safe_filename(norm_label)
-        time_str = (self.video_start_time + timedelta(seconds=start_frame / fps)).strftime("%Y-%m-%dT%H-%M-%S")
-        clip_base = os.path.join(self.output_dir, "clips", f"{time_str}_{norm_label}_clip_{self.clip_counter}")
-
-        clip_saved, clip_path = self._save_clip(frames_buffer, start_idx, end_idx, fps, clip_base)
-
-        img_path = None
-        if start_idx < len(frames_buffer):
-            img_path = os.path.join(self.output_dir, "captures", f"{time_str}_{safe_label}_capture_{self.clip_counter}.jpg")
-            cv2.imwrite(img_path, frames_buffer[start_idx])
-
-        if clip_saved and img_path:
-            self.event_logs.append((time_str, self._to_web_url(img_path), self._to_web_url(clip_path)))
+        time_str = self._frame_time(job["start_frame"]).strftime("%Y-%m-%dT%H-%M-%S")
+        clip_number = job["clip_number"]
+        clip_base = os.path.join(self.output_dir, "clips", f"{time_str}_{norm_label}_clip_{clip_number}")
+        img_path = os.path.join(self.output_dir, "captures", f"{time_str}_{safe_label}_capture_{clip_number}.jpg")
+        preview_base = os.path.join(self.output_dir, "thumbnails", f"{time_str}_{norm_label}_preview_{clip_number}")
+
+        started = time.perf_counter()
+        self.pending_clip_slots.acquire()
+        self._add_stage_time("clip_backpressure", time.perf_counter() - started)
+        future = self.clip_writer.submit(
+            self._write_event_clip, norm_label, job["start_frame"], job["end_frame"], clip_frames, time_str, clip_base,
+            img_path, preview_base)
+        self.clip_futures.append((future, job))
+
+    def _resubmit_pending_clips(self, cap):
+        # 체크포인트 시점에 저장 중이던 클립은 영상에서 같은 구간을 다시 읽어 같은 번호(같은 파일 이름)로 다시 만든다
+        for job in self.pending_clip_jobs:
+            self._seek(cap, job["first_frame"])
+            frames = []
+            for _ in range(job["last_frame"] - job["first_frame"]):
+                ret, frame = cap.read()
+                if not ret:
+                    break
+                frames.append(frame)
+            self._submit_clip(job, np.stack(frames) if frames else np.empty((0,), dtype=np.uint8))
+        self.pending_clip_jobs = []
+
+    def _write_previews(self, norm_label, clip_frames, preview_base):
+        # 미리보기는 부가 기능이므로 실패해도 클립 저장은 계속한다
+        started = time.perf_counter()
+        try:
+            write_clip_previews(clip_frames, self.fps, preview_base, self.THUMBNAIL_WIDTHS, self.THUMBNAIL_FORMATS,
+                                self.SPRITE_FRAMES)
+        except Exception as e:
+            print(f"[Error] {norm_label} 미리보기 저장 실패: {e}")
+        self._add_stage_time("clip_previews", time.perf_counter() - started)
+
+    def _write_hls(self, norm_label, clip_frames, clip_base):
+        # HLS도 부가 출력이므로 실패해도 mp4 클립은 저장한다
+        started = time.perf_counter()
+        try:
+            write_hls(clip_frames, self.fps, os.path.join(self.output_dir, "hls", os.path.basename(clip_base)),
+                      self.HLS_RENDITIONS, self.HLS_SEGMENT_SECONDS, self.ENCODE_PRESET)
+        except Exception as e:
+            print(f"[Error] {norm_label} HLS 저장 실패: {e}")
+        self._add_stage_time("clip_hls", time.perf_counter() - started)
+
+    def _write_event_clip(self, norm_label, start_frame, end_frame, clip_frames, time_str, clip_base, img_path,
+                          preview_base):
+        started = time.perf_counter()
+        try:
+            if len(clip_frames) == 0:
+                return None
+            cv2.imwrite(img_path, clip_frames[0])
+            if self.PREVIEWS:
+                # 클립 파일이 생기면 바로 이벤트로 수집되므로 미리보기를 먼저 만든다
+                self._write_previews(norm_label, clip_frames, preview_base)
+            if self.HLS:
+                # 이벤트를 수집할 때 재생 목록 URL도 함께 저장하도록 mp4보다 먼저 만든다
+                self._write_hls(norm_label, clip_frames, clip_base)
+            clip_saved, clip_path = self._save_clip(clip_frames, self.fps, clip_base)
+            if not clip_saved:
+                return None
             print(f"[🟢 완료] {norm_label}: {time_str} → {clip_path}")
-
-        self.clip_counter += 1
-
-    def run(self):
+            if self.on_clip_saved is not None:
+                # 클립이 완성되는 즉시 알림 (캡처 이미지는 이미 저장된 상태)
+                self.on_clip_saved(clip_path, img_path)
+            return (time_str, self._to_web_url(img_path), self._to_web_url(clip_path)), (norm_label, start_frame, end_frame)
+        except Exception as e:
+            print(f"[Error] {norm_label} 클립 저장 실패: {e}")
+            return None
+        finally:
+            self.pending_clip_slots.release()
+            self._add_stage_time("clip_write", time.perf_counter() - started)
+
+    def _collect_clip_results(self, wait=False):
+        # 완료된 클립 결과를 제출 순서대로 이벤트 로그에 반영한다
+        while self.clip_futures and (wait or self.clip_futures[0][0].done()):
+            result = self.clip_futures.popleft()[0].result()
+            if result is not None:
+                event_log, event_frame = result
+                self.event_logs.append(event_log)
+                self.event_frames.append(event_frame)
+
+    def _frame_time(self, frame_idx):
+        # 스트림은 버퍼에 남아 있는 프레임이면 실제 수신 시각을, 아니면 시작 시각 + 프레임 번호 / FPS를 쓴다
+        if self.frame_times is not None and self.frames_buffer.start_frame <= frame_idx < self.frames_buffer.end_frame:
+            return datetime.fromtimestamp(self.frame_times[frame_idx % self.frames_buffer.capacity])
+        return self.video_start_time + timedelta(seconds=frame_idx / self.fps)
+
+    def _read_into_buffer(self, cap):
+        # 첫 프레임으로 버퍼 크기를 정한 뒤에는 버퍼 슬롯에 바로 디코딩한다
+        slot = self.frames_buffer.next_slot() if self.frames_buffer is not None else None
+        ret, frame = cap.read(slot)
+        if not ret:
+            return None
+
+        if self.frames_buffer is None:
+            # 디코딩 큐와 한 배치에서 읽는 프레임 수만큼 여유를 두어
+            # 디코더가 앞서 나가도 추론 시점 기준 최근 MAX_BUFFER_FRAMES 프레임은 덮어쓰지 않게 한다
+            capacity = self.MAX_BUFFER_FRAMES + self._batch_read_limit() + self.DECODE_QUEUE_SIZE + 1
+            if self.STREAM:
+                # 스트림 디코더는 추론을 기다리지 않으므로 추론이 밀린 만큼의 여유를 더 둔다
+                self.stream_lag_frames = self._batch_read_limit() + self.DECODE_QUEUE_SIZE + int(self.MAX_LAG_SECONDS * self.fps)
+                capacity = self.MAX_BUFFER_FRAMES + self.stream_lag_frames + 1
+                self.frame_times = np.zeros(capacity)
+            self.frames_buffer = FrameRingBuffer(capacity, frame.shape, frame.dtype, self.decode_start_frame)
+            slot = self.frames_buffer.next_slot()
+        if frame is not slot:
+            slot[...] = frame
+        if self.frame_times is not None:
+            self.frame_times[self.frames_buffer.end_frame % self.frames_buffer.capacity] = time.time()
+        self.frames_buffer.commit()
+        return slot
+
+    def _put_until_stopped(self, frame_queue, item, stop_event):
+        while not stop_event.is_set():
+            try:
+                frame_queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _decode_frames(self, cap, total_frames, frame_queue, stop_event):
+        frame_idx = self.decode_start_frame
+        try:
+            while frame_idx < total_frames and not stop_event.is_set():
+                started = time.perf_counter()
+                frame = self._read_into_buffer(cap)
+                self._add_stage_time("decode", time.perf_counter() - started)
+                if frame is None:
+                    break
+                # 이어서 처리할 때 체크포인트 이전 프레임은 클립용 버퍼에만 채우고 추론하지 않는다
+                if frame_idx >= self.resume_frame and not self._put_until_stopped(frame_queue, (frame_idx, frame), stop_event):
+                    break
+                frame_idx += 1
+        finally:
+            self._put_until_stopped(frame_queue, None, stop_event)
+
+    def _put_latest(self, frame_queue, item):
+        # 추론이 밀려 큐가 가득 차면 가장 오래된 프레임을 버린다.
+        # 버린 프레임은 추론만 건너뛰고 링 버퍼에는 남아 있어 클립에는 그대로 들어간다
+        while True:
+            try:
+                frame_queue.put_nowait(item)
+                return
+            except queue.Full:
+                try:
+                    frame_queue.get_nowait()
+                    self.dropped_frames += 1
+                except queue.Empty:
+                    pass
+
+    def _open_stream(self):
         cap = cv2.VideoCapture(self.video_path)
-        fps = cap.get(cv2.CAP_PROP_FPS)
-        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-        self.padding_frames = int(1.0 * fps)
-        self.MAX_BUFFER_FRAMES = int(fps * 30)
-
-        frame_count = 0
-        buffer_start_frame_idx = 0
-        frames_buffer = []
+        # 카메라 스트림은 내부 버퍼를 최소로 두어 오래된 프레임이 쌓이지 않게 한다 (파일은 무시됨)
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        return cap
 
-        while True:
-            ret, frame = cap.read()
-            if not ret or frame_count >= total_frames:
+    def _reconnect(self, cap, delay):
+        cap.release()
+        while not self.stop_requested.is_set():
+            if self.MAX_RECONNECTS is not None and self.reconnects >= self.MAX_RECONNECTS:
+                print(f"[Stream] 재연결 {self.reconnects}회 한도 도달, 스트림 종료: {self.video_path}")
+                return None
+            print(f"[Stream] 연결 끊김, {delay:.1f}s 후 재연결: {self.video_path}")
+            if self.stop_requested.wait(delay):
+                return None
+            self.reconnects += 1
+            cap = self._open_stream()
+            if cap.isOpened():
+                return cap
+            cap.release()
+            delay = min(delay * 2, self.MAX_RECONNECT_DELAY)
+        return None
+
+    def _decode_stream(self, cap, frame_queue, stop_event):
+        # 끝이 없는 소스: 끊기면 지수 백오프로 다시 연결하고, 디코딩은 추론을 기다리지 않는다
+        frame_idx = 0
+        delay = self.RECONNECT_DELAY
+        next_frame_at = time.monotonic()
+        try:
+            while not stop_event.is_set() and not self.stop_requested.is_set():
+                if self.REALTIME:
+                    # 로컬 파일을 카메라처럼 원래 속도로 흘려보낸다
+                    wait = next_frame_at - time.monotonic()
+                    if wait > 0:
+                        time.sleep(wait)
+                    next_frame_at += 1.0 / self.fps
+
+                if self.stream_lag_frames is not None and frame_idx - self.live_frame >= self.stream_lag_frames:
+                    # 추론 중인 프레임을 덮어쓰지 않도록 링 버퍼에 넣지 않고 읽어서 버린다
+                    if cap.grab():
+                        self.skipped_frames += 1
+                        continue
+                    frame = None
+                else:
+                    started = time.perf_counter()
+                    frame = self._read_into_buffer(cap) if cap.isOpened() else None
+                    self._add_stage_time("decode", time.perf_counter() - started)
+
+                if frame is None:
+                    cap = self._reconnect(cap, delay)
+                    if cap is None:
+                        break
+                    delay = min(delay * 2, self.MAX_RECONNECT_DELAY)
+                    next_frame_at = time.monotonic()
+                    continue
+                delay = self.RECONNECT_DELAY
+                self._put_latest(frame_queue, (frame_idx, frame))
+                frame_idx += 1
+        finally:
+            if cap is not None:
+                cap.release()
+            self._put_latest(frame_queue, None)
+
+    def stop(self):
+        """스트림 모드 실행을 멈춘다. 진행 중인 이벤트는 클립으로 저장하고 run()이 끝난다."""
+        self.stop_requested.set()
+
+    def reload_event_types(self):
+        """다음 배치 처리 후 event_type 테이블을 바로 다시 읽게 한다 (시그널 핸들러에서 호출해도 된다)."""
+        self.event_types_reload_requested.set()
+
+    def _maybe_reload_event_types(self):
+        if not self.EVENT_TYPES_DB:
+            return
+        now = time.monotonic()
+        if not self.event_types_reload_requested.is_set() and now - self.last_event_types_reload < self.EVENT_TYPES_RELOAD_SECONDS:
+            return
+        self.event_types_reload_requested.clear()
+        self.last_event_types_reload = now
+        event_types = load_event_types(self.EVENT_TYPES_DB)
+        if not event_types or event_types == self.event_types:
+            return
+        # 진행 중인 이벤트는 그대로 두고, 이후 프레임부터 새 클래스 -> 종류 매핑을 쓴다
+        print(f"[Stream] 이벤트 종류 갱신: {sorted(self.event_types)} -> {sorted(event_types)}")
+        self.set_event_types(event_types)
+
+    def _batch_read_limit(self):
+        return self.BATCH_SIZE * self.INFERENCE_STRIDE
+
+    def _seek(self, cap, frame_idx):
+        # 키프레임 기준으로 탐색한 뒤 목표 프레임까지 디코딩한다. 위치가 맞지 않으면 처음부터 grab으로 건너뛴다
+        if cap.set(cv2.CAP_PROP_POS_FRAMES, frame_idx) and int(cap.get(cv2.CAP_PROP_POS_FRAMES)) == frame_idx:
+            return
+        cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+        for _ in range(frame_idx):
+            if not cap.grab():
                 break
 
-            frames_buffer.append(frame.copy())
-            if len(frames_buffer) > self.MAX_BUFFER_FRAMES:
-                frames_buffer.pop(0)
-                buffer_start_frame_idx += 1
+    def _load_checkpoint(self):
+        """같은 영상의 체크포인트가 있으면 이벤트 상태를 되살리고 이어서 추론할 프레임 번호를 돌려준다 (없으면 0)"""
+        if not os.path.exists(self.CHECKPOINT_PATH):
+            return 0
+        try:
+            with open(self.CHECKPOINT_PATH) as f:
+                checkpoint = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"[Warn] 체크포인트를 읽지 못해 처음부터 처리합니다: {e}")
+            return 0
+        if checkpoint.get("video") != video_fingerprint(self.video_path):
+            print(f"[Checkpoint] 영상이 바뀌어 처음부터 처리합니다: {self.video_path}")
+            return 0
+
+        # 파일 이름에 시각이 없는 영상은 시작 시각이 실행할 때마다 달라지므로 처음 실행한 시각을 이어 쓴다
+        self.video_start_time = datetime.fromisoformat(checkpoint["start_time"])
+        self.active_events = checkpoint["active_events"]
+        self.clip_counter = checkpoint["clip_counter"]
+        self.inferred_frames = checkpoint["inferred_frames"]
+        classes, confidences = checkpoint["last_detection"]
+        self.last_detection = (np.array(classes, dtype=int), np.array(confidences))
+        self.event_logs = [tuple(event_log) for event_log in checkpoint["event_logs"]]
+        self.event_frames = [tuple(event_frame) for event_frame in checkpoint["event_frames"]]
+        # 이전 형식의 체크포인트는 저장 중인 클립이 없을 때만 기록됐다
+        self.pending_clip_jobs = checkpoint.get("pending_clips", [])
+        print(f"[Checkpoint] {self.video_path}: {checkpoint['frame']} 프레임부터 이어서 처리 "
+              f"(진행 중 이벤트 {len(self.active_events)}개, 저장된 클립 {self.clip_counter}개, "
+              f"다시 만들 클립 {len(self.pending_clip_jobs)}개)")
+        return checkpoint["frame"]
+
+    def _save_checkpoint(self, frame_idx):
+        # frame_idx 이전 프레임까지 반영된 상태. 클립 번호도 저장해 다시 만든 클립이 같은 이름으로 덮어쓰게 한다.
+        # 아직 이벤트 로그에 반영되지 않은(저장 중이거나 순서를 기다리는) 클립 작업도 남겨 재시작 시 다시 만든다
+        started = time.perf_counter()
+        checkpoint = {
+            "video": video_fingerprint(self.video_path),
+            "frame": frame_idx,
+            "start_time": self.video_start_time.isoformat(),
+            "clip_counter": self.clip_counter,
+            "active_events": self.active_events,
+            "last_detection": [self.last_detection[0].tolist(), self.last_detection[1].tolist()],
+            "inferred_frames": self.inferred_frames,
+            "event_logs": self.event_logs,
+            "event_frames": self.event_frames,
+            "pending_clips": [job for _, job in self.clip_futures],
+        }
+        _write_file_atomic(self.CHECKPOINT_PATH, json.dumps(checkpoint).encode())
+        self._add_stage_time("checkpoint", time.perf_counter() - started)
+
+    def _should_infer(self, frame_count, frame):
+        if frame_count % self.INFERENCE_STRIDE != 0:
+            return False
+        if self.MOTION_THRESHOLD is None:
+            return True
+
+        # 축소한 흑백 프레임을 마지막으로 추론한 프레임과 비교해 변화가 없으면 건너뛴다
+        small = cv2.cvtColor(cv2.resize(frame, MOTION_FRAME_SIZE, interpolation=cv2.INTER_AREA), cv2.COLOR_BGR2GRAY)
+        if self.last_motion_frame is not None and cv2.absdiff(small, self.last_motion_frame).mean() < self.MOTION_THRESHOLD:
+            return False
+        self.last_motion_frame = small
+        return True
+
+    def _update_events(self, frame_count, classes, confidences):
+        fps = self.fps
+        detected_norm_labels = set()
+        ended_labels = []
+
+        for norm_label, conf in self._detected_events(classes, confidences):
+            detected_norm_labels.add(norm_label)
+
+            if norm_label not in self.active_events:
+                self.active_events[norm_label] = {
+                    'start_frame': frame_count,
+                    'end_frame': frame_count + int(self.BASE_CLIP_DURATION * fps),
+                    'last_seen_frame': frame_count,
+                    'max_confidence': conf
+                }
+            else:
+                ev = self.active_events[norm_label]
+                ev['last_seen_frame'] = frame_count
+                ev['end_frame'] = max(ev['end_frame'], frame_count + int(self.BASE_CLIP_DURATION * fps))
+                ev['max_confidence'] = max(ev['max_confidence'], conf)
 
-            results = self.model(frame, verbose=False)
-            detected_norm_labels = set()
-            ended_labels = []
+        for norm_label, ev in list(self.active_events.items()):
+            if norm_label not in detected_norm_labels:
+                if frame_count - ev['last_seen_frame'] > int(self.MERGE_GAP_SECONDS * fps):
+                    ended_labels.append(norm_label)
 
-            if results and results[0].boxes is not None:
-                boxes = results[0].boxes
-                classes = boxes.cls.cpu().numpy().astype(int)
-                confidences = boxes.conf.cpu().numpy()
+        for norm_label in ended_labels:
+            ev = self.active_events.pop(norm_label)
+            if ev['max_confidence'] >= self.CONFIDENCE_THERESHOLD:
+                self._save_event_clip(norm_label, ev['start_frame'], ev['end_frame'], frame_count)
+            else:
+                print(f"[Error] {norm_label} 이벤트: confidence {ev['max_confidence']:.2f} < {self.CONFIDENCE_THERESHOLD}")
 
-                for cls_idx, conf in zip(classes, confidences):
-                    if conf < self.CONFIDENCE_THERESHOLD:
-                        continue
-                    raw_label = str(self.names.get(cls_idx, cls_idx))
-                    norm_label = self._normalize_label(raw_label)
-                    if norm_label not in self.VALID_EVENT_LABELS:
+    def run(self):
+        if self.STREAM:
+            cap = self._open_stream()
+            fps = cap.get(cv2.CAP_PROP_FPS)
+            if not 1 <= fps <= 120:
+                fps = STREAM_DEFAULT_FPS
+            self.video_start_time = datetime.now()
+        else:
+            cap = cv2.VideoCapture(self.video_path)
+            fps = cap.get(cv2.CAP_PROP_FPS)
+            total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        self.fps = fps
+        self.padding_frames = int(1.0 * fps)
+        self.MAX_BUFFER_FRAMES = int(fps * self.MAX_BUFFER_SECONDS)
+
+        self.clip_writer = ThreadPoolExecutor(max_workers=self.CLIP_WRITERS, thread_name_prefix="clip-writer")
+        checkpoint_frames = max(1, int(self.CHECKPOINT_SECONDS * fps))
+        if self.CHECKPOINT_PATH:
+            self.resume_frame = self._load_checkpoint()
+            if self.resume_frame:
+                self._resubmit_pending_clips(cap)
+                # 진행 중 이벤트와 곧 시작될 이벤트의 클립 앞부분(padding)이 들어갈 구간부터 다시 읽어 버퍼를 채운다
+                needed_frame = min([self.resume_frame] + [ev['start_frame'] for ev in self.active_events.values()])
+                self.decode_start_frame = max(0, needed_frame - self.padding_frames,
+                                              self.resume_frame - self.MAX_BUFFER_FRAMES + 1)
+                self._seek(cap, self.decode_start_frame)
+        last_checkpoint = self.resume_frame
+
+        # 디코딩 스레드 → 추론 루프 → 클립 작성 스레드 풀
+        frame_queue = queue.Queue(maxsize=self.DECODE_QUEUE_SIZE)
+        stop_event = threading.Event()
+        if self.STREAM:
+            decoder = threading.Thread(target=self._decode_stream, args=(cap, frame_queue, stop_event), daemon=True)
+        else:
+            decoder = threading.Thread(target=self._decode_frames,
+                                       args=(cap, total_frames, frame_queue, stop_event), daemon=True)
+        decoder.start()
+
+        frame_count = self.resume_frame
+        finished = False
+        try:
+            while not finished:
+                # 추론할 프레임 BATCH_SIZE개를 모아 한 번에 추론하고, 결과는 프레임 순서대로 반영한다
+                pending_frames = []
+                batch_frames = []
+                while len(batch_frames) < self.BATCH_SIZE and len(pending_frames) < self._batch_read_limit():
+                    started = time.perf_counter()
+                    item = frame_queue.get()
+                    self._add_stage_time("decode_wait", time.perf_counter() - started)
+                    if item is None:
+                        finished = True
+                        break
+                    frame_idx, frame = item
+                    if not pending_frames:
+                        # 이 배치에서 가장 오래된 프레임. 스트림 디코더는 이보다 앞선 링 버퍼 칸만 덮어쓴다
+                        self.live_frame = frame_idx
+                    if self.STREAM and time.time() - self.frame_times[frame_idx % self.frames_buffer.capacity] > self.MAX_LAG_SECONDS:
+                        # 수신한 지 MAX_LAG_SECONDS가 지난 프레임은 추론하지 않아 지연이 그 이상 쌓이지 않게 한다
+                        self.stale_frames += 1
                         continue
-                    detected_norm_labels.add(norm_label)
-
-                    if norm_label not in self.active_events:
-                        self.active_events[norm_label] = {
-                            'start_frame': frame_count,
-                            'end_frame': frame_count + int(self.BASE_CLIP_DURATION * fps),
-                            'last_seen_frame': frame_count,
-                            'max_confidence': conf
-                        }
-                    else:
-                        ev = self.active_events[norm_label]
-                        ev['last_seen_frame'] = frame_count
-                        ev['end_frame'] = max(ev['end_frame'], frame_count + int(self.BASE_CLIP_DURATION * fps))
-                        ev['max_confidence'] = max(ev['max_confidence'], conf)
-
-            for norm_label, ev in list(self.active_events.items()):
-                if norm_label not in detected_norm_labels:
-                    if frame_count - ev['last_seen_frame'] > int(self.MERGE_GAP_SECONDS * fps):
-                        ended_labels.append(norm_label)
-
-            for norm_label in ended_labels:
-                ev = self.active_events.pop(norm_label)
-                if ev['max_confidence'] >= self.CONFIDENCE_THERESHOLD:
-                    self._save_event_clip(norm_label, ev['start_frame'], ev['end_frame'],
-                                          frames_buffer, buffer_start_frame_idx, fps)
-                else:
-                    print(f"[Error] {norm_label} 이벤트: confidence {ev['max_confidence']:.2f} < {self.CONFIDENCE_THERESHOLD}")
-
-            frame_count += 1
-            if cv2.waitKey(1) == 27:
-                break
-
-        cap.release()
-        cv2.destroyAllWindows()
+                    started = time.perf_counter()
+                    infer = self._should_infer(frame_idx, frame)
+                    self._add_stage_time("gate", time.perf_counter() - started)
+                    pending_frames.append((frame_idx, infer))
+                    if infer:
+                        batch_frames.append(frame)
+
+                if not pending_frames:
+                    break
+
+                started = time.perf_counter()
+                detections = iter(self.detector.detect(batch_frames)) if batch_frames else iter(())
+                self._add_stage_time("infer", time.perf_counter() - started)
+                self.inferred_frames += len(batch_frames)
+
+                started = time.perf_counter()
+                for frame_idx, infer in pending_frames:
+                    # 건너뛴 프레임은 직전 추론 결과를 그대로 이어받아 last_seen_frame 계산에 포함된다.
+                    # 스트림에서 큐가 버린 프레임은 번호가 비므로 frame_idx를 그대로 쓴다
+                    if infer:
+                        self.last_detection = next(detections)
+                    classes, confidences = self.last_detection
+                    self._update_events(frame_idx, classes, confidences)
+                    frame_count = frame_idx + 1
+                self._add_stage_time("events", time.perf_counter() - started)
+                self._collect_clip_results()
+                self._maybe_reload_event_types()
+                if self.CHECKPOINT_PATH and frame_count - last_checkpoint >= checkpoint_frames:
+                    # 저장 중인 클립은 작업으로 함께 기록되므로 클립 작성 스레드를 기다리지 않는다
+                    self._save_checkpoint(frame_count)
+                    last_checkpoint = frame_count
+        finally:
+            stop_event.set()
+            decoder.join()
+            cap.release()
+
+        self.frame_count = frame_count
+        self._debug_log(f"inferred {self.inferred_frames}/{frame_count} frames")
+        if self.STREAM:
+            print(f"[Stream] 종료: {self.frames_buffer.end_frame if self.frames_buffer else 0} frames, 추론 생략(밀림) {self.dropped_frames + self.stale_frames}, "
+                  f"버림(버퍼 부족) {self.skipped_frames}, 재연결 {self.reconnects}")
 
         for norm_label, ev in list(self.active_events.items()):
             if norm_label not in self.VALID_EVENT_LABELS:
                 continue
             if ev['max_confidence'] >= self.CONFIDENCE_THERESHOLD:
-                self._save_event_clip(norm_label, ev['start_frame'], ev['end_frame'],
-                                      frames_buffer, buffer_start_frame_idx, fps)
+                self._save_event_clip(norm_label, ev['start_frame'], ev['end_frame'], frame_count - 1)
             else:
                 print(f"[Error: ] {norm_label} 이벤트: confidence {ev['max_confidence']:.2f} < {self.CONFIDENCE_THERESHOLD}")
 
+        self.clip_writer.shutdown(wait=True)
+        self._collect_clip_results(wait=True)
+        if self.CHECKPOINT_PATH and os.path.exists(self.CHECKPOINT_PATH):
+            # 끝까지 처리한 영상은 체크포인트가 필요 없다 (완료 여부는 process_videos.py의 처리 완료 목록이 관리)
+            os.remove(self.CHECKPOINT_PATH)
+
         print("\n[전체 처리 완료] 저장된 이벤트 로그:")
         for time_str, img_url, clip_url in self.event_logs:
             print(f"- {time_str} | 📸 {img_url} | 🎞️ {clip_url}")
+        self._print_stage_times()
 
     @classmethod
-    def run_for_path(cls, video_path, output_dir="output", debug=False):
+    def run_for_path(cls, video_path, output_dir="output", debug=False, checkpoint=False, **clipper_kwargs):
         filename = os.path.basename(video_path)
         match = re.search(r"(\d{4}-\d{2}-\d{2}[_T ]?\d{2}-\d{2}-\d{2})", filename)
         if match:
@@ -219,7 +975,10 @@ class YOLOEventClipper:
         clipper = cls(
             video_path=video_path,
             output_dir=specific_output_dir,
+            checkpoint_path=os.path.join(specific_output_dir, CHECKPOINT_FILENAME) if checkpoint else None,
             start_time=start_time,
-            debug=debug
+            debug=debug,
+            **clipper_kwargs
         )
         clipper.run()
+        return clipper
@@ -0,0 +1,200 @@
+# yolo/model_server.py
+
+import multiprocessing as mp
+import queue
+import threading
+import time
+from multiprocessing import resource_tracker, shared_memory
+from multiprocessing.util import Finalize
+
+import numpy as np
+
+from detect import YOLODetector
+
+# 서버 프로세스가 살아 있는 동안 HEARTBEAT_SECONDS마다 시각을 기록한다.
+# 클라이언트는 응답을 기다리다 SERVER_TIMEOUT_SECONDS 동안 기록이 없으면 서버가 죽은 것으로 보고 예외를 낸다
+HEARTBEAT_SECONDS = 1.0
+SERVER_TIMEOUT_SECONDS = 10.0
+
+
+class ModelServerError(RuntimeError):
+    pass
+
+
+def _heartbeat(heartbeat):
+    while True:
+        heartbeat.value = time.time()
+        time.sleep(HEARTBEAT_SECONDS)
+
+
+def _serve(model_path, request_queue, response_queues, ready_queue, max_batch_frames, batch_timeout, heartbeat):
+    try:
+        detector = YOLODetector(model_path)
+    except Exception as e:
+        ready_queue.put(("error", str(e)))
+        return
+    threading.Thread(target=_heartbeat, args=(heartbeat,), daemon=True).start()
+    ready_queue.put(("ready", detector.names))
+
+    attached = {}
+    running = True
+    while running:
+        request = request_queue.get()
+        if request is None:
+            break
+
+        # batch_timeout 동안 다른 워커(카메라)의 요청을 더 모아 한 번에 추론한다
+        requests = [request]
+        batch_frames = request[3][0]
+        deadline = time.monotonic() + batch_timeout
+        while batch_frames < max_batch_frames:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                request = request_queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if request is None:
+                running = False
+                break
+            requests.append(request)
+            batch_frames += request[3][0]
+
+        # 추론이 실패해도 서버는 계속 돌고, 이 배치를 보낸 클라이언트에게만 오류를 돌려준다
+        try:
+            frames = []
+            for client_id, _, shm_name, shape in requests:
+                shm = attached.get(client_id)
+                if shm is None or shm.name != shm_name:
+                    if shm is not None:
+                        shm.close()
+                    shm = attached[client_id] = shared_memory.SharedMemory(name=shm_name)
+                frames.extend(np.ndarray(shape, dtype=np.uint8, buffer=shm.buf))
+            detections = detector.detect(frames)
+            frames = []
+        except Exception as e:
+            frames = []
+            error = f"{type(e).__name__}: {e}"
+            print(f"[ModelServer] detect failed: {error}")
+            for client_id, request_id, _, _ in requests:
+                response_queues[client_id].put((request_id, "error", error))
+            continue
+
+        offset = 0
+        for client_id, request_id, _, shape in requests:
+            response_queues[client_id].put((request_id, "ok", detections[offset:offset + shape[0]]))
+            offset += shape[0]
+
+    for shm in attached.values():
+        shm.close()
+
+
+class RemoteDetector:
+    """모델 서버에 프레임을 공유 메모리로 넘기고 탐지 결과를 받아오는 YOLODetector 대체 객체"""
+
+    def __init__(self, client_id, request_queue, response_queue, names, free_client_ids=None, heartbeat=None):
+        self.client_id = client_id
+        self.request_queue = request_queue
+        self.response_queue = response_queue
+        self.free_client_ids = free_client_ids
+        self.names = names
+        self.heartbeat = heartbeat
+        self.request_id = 0
+        self.shm = None
+
+    def detect(self, frames):
+        shape = (len(frames), *frames[0].shape)
+        nbytes = int(np.prod(shape))
+        if self.shm is None or self.shm.size < nbytes:
+            self._release_shared_memory()
+            self.shm = shared_memory.SharedMemory(create=True, size=nbytes)
+
+        batch = np.ndarray(shape, dtype=np.uint8, buffer=self.shm.buf)
+        for i, frame in enumerate(frames):
+            batch[i] = frame
+        del batch
+
+        self.request_id += 1
+        self.request_queue.put((self.client_id, self.request_id, self.shm.name, shape))
+        return self._wait_response(self.request_id)
+
+    def _wait_response(self, request_id):
+        # 서버가 죽으면 응답이 영영 오지 않으므로 heartbeat를 보며 기다리고, 끊겼으면 예외로 작업을 실패시킨다
+        while True:
+            try:
+                response_id, status, payload = self.response_queue.get(timeout=HEARTBEAT_SECONDS)
+            except queue.Empty:
+                if self.heartbeat is not None and time.time() - self.heartbeat.value > SERVER_TIMEOUT_SECONDS:
+                    raise ModelServerError(f"model server stopped responding (no heartbeat for {SERVER_TIMEOUT_SECONDS:.0f}s)")
+                continue
+            if response_id != request_id:
+                continue  # 예외로 포기한 이전 요청의 늦은 응답
+            if status != "ok":
+                raise ModelServerError(f"model server detect failed: {payload}")
+            return payload
+
+    def _release_shared_memory(self):
+        if self.shm is not None:
+            self.shm.close()
+            self.shm.unlink()
+            self.shm = None
+
+    def close(self):
+        self._release_shared_memory()
+        if self.free_client_ids is not None:
+            self.free_client_ids.put(self.client_id)
+            self.free_client_ids = None
+
+
+class ModelServer:
+    """YOLO 모델을 한 번만 올려 두고 여러 디코딩 워커의 요청을 묶어 처리하는 추론 서버 프로세스"""
+
+    def __init__(self, model_path, num_clients, max_batch_frames=16, batch_timeout=0.005):
+        # 워커들이 같은 resource_tracker를 쓰도록 fork 전에 미리 띄워 둔다
+        resource_tracker.ensure_running()
+
+        self.request_queue = mp.Queue()
+        self.response_queues = [mp.Queue() for _ in range(num_clients)]
+        self.free_client_ids = mp.Queue()
+        for client_id in range(num_clients):
+            self.free_client_ids.put(client_id)
+
+        ready_queue = mp.Queue()
+        self.heartbeat = mp.Value("d", time.time(), lock=False)
+        self.process = mp.Process(
+            target=_serve,
+            args=(model_path, self.request_queue, self.response_queues, ready_queue,
+                  max_batch_frames, batch_timeout, self.heartbeat),
+            daemon=True,
+        )
+        self.process.start()
+
+        status, payload = ready_queue.get()
+        if status != "ready":
+            self.process.join()
+            raise RuntimeError(f"Model server failed to start: {payload}")
+        self.names = payload
+
+    def worker_initargs(self):
+        return (self.request_queue, self.response_queues, self.free_client_ids, self.names, self.heartbeat)
+
+    def stop(self):
+        self.request_queue.put(None)
+        self.process.join()
+
+
+_worker_detector = None
+
+
+def init_worker(request_queue, response_queues, free_client_ids, names, heartbeat=None):
+    # multiprocessing.Pool initializer: 워커마다 클라이언트 ID 하나와 응답 큐를 배정한다
+    global _worker_detector
+    client_id = free_client_ids.get()
+    _worker_detector = RemoteDetector(client_id, request_queue, response_queues[client_id], names, free_client_ids,
+                                      heartbeat)
+    Finalize(_worker_detector, _worker_detector.close, exitpriority=10)
+
+
+def get_worker_detector():
+    return _worker_detector
@@ -0,0 +1,249 @@
+# yolo/multi_camera.py
+
+import argparse
+import os
+import signal
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+from detect import EVENT_TYPES_RELOAD_SECONDS, YOLODetector, YOLOEventClipper, load_event_types
+
+SCHEDULING_POLICIES = ("round_robin", "deadline")
+
+
+class CameraDetector:
+    """카메라 하나에 배정되는 YOLODetector 대체 객체. detect()는 스케줄러에 요청을 넣고 결과를 기다린다"""
+
+    def __init__(self, scheduler, camera_id):
+        self.scheduler = scheduler
+        self.camera_id = camera_id
+        self.names = scheduler.names
+
+    def detect(self, frames):
+        return self.scheduler.submit(self.camera_id, frames).result()
+
+
+class InferenceScheduler:
+    """여러 카메라의 추론 요청을 고정된 수의 추론 워커에 나눠 준다.
+    카메라마다 처리 중인 요청은 하나뿐이고, 워커는 대기 중인 카메라들의 요청을 한 배치로 묶어 추론한다.
+    - round_robin: 지난 배치에 들어가지 못한 카메라부터 차례로 고른다
+    - deadline: 가장 오래 기다린 요청부터 고른다
+    과부하에서도 모든 카메라가 라운드마다 한 번씩 처리되므로 카메라별 처리 fps가 고르게 줄어든다."""
+
+    def __init__(self, detector_factory, num_workers=1, max_batch_frames=16, batch_timeout=0.005,
+                 policy="round_robin"):
+        if policy not in SCHEDULING_POLICIES:
+            raise ValueError(f"Unknown scheduling policy: {policy}")
+        self.detectors = [detector_factory() for _ in range(max(1, int(num_workers)))]
+        self.names = self.detectors[0].names
+        self.max_batch_frames = max(1, int(max_batch_frames))
+        self.batch_timeout = batch_timeout
+        self.policy = policy
+
+        self.condition = threading.Condition()
+        self.cameras = deque()
+        self.pending = {}
+        self.stats = {}
+        self.running = False
+        self.workers = []
+
+    def register(self, camera_id):
+        with self.condition:
+            if camera_id not in self.stats:
+                self.cameras.append(camera_id)
+                self.stats[camera_id] = {"requests": 0, "frames": 0, "wait_seconds": 0.0, "max_wait_seconds": 0.0}
+        return CameraDetector(self, camera_id)
+
+    def start(self):
+        self.running = True
+        for i, detector in enumerate(self.detectors):
+            worker = threading.Thread(target=self._serve, args=(detector,), name=f"inference-{i}", daemon=True)
+            worker.start()
+            self.workers.append(worker)
+
+    def stop(self):
+        with self.condition:
+            self.running = False
+            for _, _, future in self.pending.values():
+                future.cancel()
+            self.pending.clear()
+            self.condition.notify_all()
+        for worker in self.workers:
+            worker.join()
+        self.workers = []
+
+    def submit(self, camera_id, frames):
+        future = Future()
+        with self.condition:
+            if not self.running:
+                future.set_exception(RuntimeError("Inference scheduler is not running"))
+                return future
+            self.pending[camera_id] = (frames, time.monotonic(), future)
+            self.condition.notify()
+        return future
+
+    def _select_batch(self):
+        # 호출 시점에 condition 잠금을 잡고 있어야 한다
+        if self.policy == "deadline":
+            order = sorted(self.pending, key=lambda camera_id: self.pending[camera_id][1])
+        else:
+            order = [camera_id for camera_id in self.cameras if camera_id in self.pending]
+
+        batch = []
+        batch_frames = 0
+        for camera_id in order:
+            frames = self.pending[camera_id][0]
+            if batch and batch_frames + len(frames) > self.max_batch_frames:
+                break
+            batch.append((camera_id, *self.pending.pop(camera_id)))
+            batch_frames += len(frames)
+
+        if self.policy == "round_robin" and batch:
+            # 이번에 처리한 마지막 카메라 다음 카메라가 다음 배치의 맨 앞이 되게 돌린다
+            self.cameras.rotate(-(self.cameras.index(batch[-1][0]) + 1))
+        return batch
+
+    def _serve(self, detector):
+        while True:
+            with self.condition:
+                while self.running and not self.pending:
+                    self.condition.wait()
+                if not self.running:
+                    return
+                # 다른 카메라의 요청이 더 들어올 수 있도록 batch_timeout만큼 기다린 뒤 배치를 만든다
+                deadline = time.monotonic() + self.batch_timeout
+                while (self.running and len(self.pending) < len(self.cameras)
+                       and sum(len(request[0]) for request in self.pending.values()) < self.max_batch_frames):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self.condition.wait(remaining)
+                batch = self._select_batch()
+
+            if not batch:
+                continue
+            started = time.monotonic()
+            frames = [frame for _, camera_frames, _, _ in batch for frame in camera_frames]
+            try:
+                detections = detector.detect(frames)
+            except Exception as e:
+                for _, _, _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            offset = 0
+            with self.condition:
+                for camera_id, camera_frames, submitted, _ in batch:
+                    stats = self.stats[camera_id]
+                    stats["requests"] += 1
+                    stats["frames"] += len(camera_frames)
+                    stats["wait_seconds"] += started - submitted
+                    stats["max_wait_seconds"] = max(stats["max_wait_seconds"], started - submitted)
+            for camera_id, camera_frames, _, future in batch:
+                future.set_result(detections[offset:offset + len(camera_frames)])
+                offset += len(camera_frames)
+
+    def camera_stats(self):
+        with self.condition:
+            return {camera_id: dict(stats) for camera_id, stats in self.stats.items()}
+
+
+class MultiCameraRunner:
+    """카메라 N대를 스트림 모드 YOLOEventClipper로 돌리고 추론은 InferenceScheduler 하나로 모은다"""
+
+    def __init__(self, sources, output_base, model_path="yolo/best.pt", inference_workers=1, max_batch_frames=16,
+                 batch_timeout=0.005, policy="round_robin", detector_factory=None, **clipper_kwargs):
+        self.scheduler = InferenceScheduler(
+            detector_factory or (lambda: YOLODetector(model_path)),
+            num_workers=inference_workers,
+            max_batch_frames=max_batch_frames,
+            batch_timeout=batch_timeout,
+            policy=policy,
+        )
+        self.clippers = {}
+        for camera_id, source in sources.items():
+            self.clippers[camera_id] = YOLOEventClipper(
+                video_path=source,
+                output_dir=os.path.join(output_base, camera_id),
+                detector=self.scheduler.register(camera_id),
+                stream=True,
+                **clipper_kwargs
+            )
+        self.threads = []
+
+    def run(self, duration=None):
+        self.scheduler.start()
+        self.threads = [threading.Thread(target=clipper.run, name=f"camera-{camera_id}", daemon=True)
+                        for camera_id, clipper in self.clippers.items()]
+        for thread in self.threads:
+            thread.start()
+        try:
+            if duration is not None:
+                timer = threading.Timer(duration, self.stop)
+                timer.daemon = True
+                timer.start()
+            for thread in self.threads:
+                thread.join()
+        finally:
+            self.stop()
+            for thread in self.threads:
+                thread.join()
+            self.scheduler.stop()
+
+    def stop(self):
+        for clipper in self.clippers.values():
+            clipper.stop()
+
+    def reload_event_types(self):
+        for clipper in self.clippers.values():
+            clipper.reload_event_types()
+
+
+if __name__ == "__main__":
+    # 예: python multi_camera.py --sources cam1=rtsp://... cam2=rtsp://... --output_base output/user1/store1
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sources", nargs="+", required=True, help="camera_name=rtsp://... 형식")
+    parser.add_argument("--output_base", required=True)
+    parser.add_argument("--model_path", default="yolo/best.pt")
+    parser.add_argument("--db_path", default="cctv_system.db", help="이벤트 종류를 읽어올 DB (없으면 기본 종류 사용)")
+    parser.add_argument("--event_types_reload_seconds", type=float, default=EVENT_TYPES_RELOAD_SECONDS,
+                        help="event_type 테이블을 다시 읽는 간격 (SIGHUP을 보내면 바로 다시 읽는다)")
+    parser.add_argument("--inference_workers", type=int, default=1)
+    parser.add_argument("--max_batch_frames", type=int, default=16)
+    parser.add_argument("--batch_timeout_ms", type=float, default=5.0)
+    parser.add_argument("--policy", choices=SCHEDULING_POLICIES, default="round_robin")
+    parser.add_argument("--realtime", action="store_true", help="로컬 파일을 원래 속도로 재생해 카메라 대신 쓴다")
+    parser.add_argument("--max_lag_seconds", type=float, default=2.0)
+    parser.add_argument("--max_buffer_seconds", type=float, default=30.0)
+    parser.add_argument("--duration", type=float, default=None, help="초 단위. 지정하지 않으면 Ctrl+C까지 실행")
+    parser.add_argument("--debug", action="store_true")
+    args = parser.parse_args()
+
+    sources = {}
+    for item in args.sources:
+        camera_id, _, source = item.partition("=")
+        sources[camera_id] = int(source) if source.isdigit() else source
+
+    runner = MultiCameraRunner(
+        sources,
+        args.output_base,
+        model_path=args.model_path,
+        inference_workers=args.inference_workers,
+        max_batch_frames=args.max_batch_frames,
+        batch_timeout=args.batch_timeout_ms / 1000,
+        policy=args.policy,
+        event_types=load_event_types(args.db_path),
+        event_types_db=args.db_path,
+        event_types_reload_seconds=args.event_types_reload_seconds,
+        realtime=args.realtime,
+        max_lag_seconds=args.max_lag_seconds,
+        max_buffer_seconds=args.max_buffer_seconds,
+        debug=args.debug,
+    )
+    signal.signal(signal.SIGINT, lambda *_: runner.stop())
+    signal.signal(signal.SIGTERM, lambda *_: runner.stop())
+    if hasattr(signal, "SIGHUP"):
+        signal.signal(signal.SIGHUP, lambda *_: runner.reload_event_types())
+    runner.run(args.duration)
@@ -1,20 +1,120 @@
 import os
 import argparse
+import json
+from datetime import datetime
 from multiprocessing import Pool
-from detect import YOLOEventClipper
+from detect import CHECKPOINT_SECONDS, YOLOEventClipper, load_event_types, video_fingerprint
+from model_server import ModelServer, init_worker, get_worker_detector
+
+# 끝까지 처리한 영상 목록 (output_base 아래). 같은 영상(크기/수정 시각)은 다음 실행에서 건너뛴다
+SKIP_LIST_FILENAME = "processed_videos.json"
 
 def get_video_list(video_dir):
     return [os.path.join(video_dir, f) for f in os.listdir(video_dir) if f.endswith(".mp4")]
 
+def load_skip_list(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+def save_skip_list(path, skip_list):
+    temp_path = path + ".part"
+    with open(temp_path, "w") as f:
+        json.dump(skip_list, f, indent=2)
+    os.replace(temp_path, path)
+
+def run_video(video_path, output_base, debug, clipper_kwargs):
+    # 모델 서버 모드에서는 워커에 배정된 RemoteDetector를 사용한다
+    detector = get_worker_detector()
+    if detector is not None:
+        clipper_kwargs = dict(clipper_kwargs, detector=detector)
+    clipper = YOLOEventClipper.run_for_path(video_path, output_base, debug, **clipper_kwargs)
+    return len(clipper.event_logs)
+
+def run_video_task(task):
+    # 한 영상이 실패해도 나머지는 계속 처리한다. 실패한 영상은 완료 목록에 넣지 않아 다음 실행에서 체크포인트부터 이어서 처리된다
+    video_path = task[0]
+    try:
+        return video_path, run_video(*task), None
+    except Exception as e:
+        return video_path, None, f"{type(e).__name__}: {e}"
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("--video_dir", required=True)
     parser.add_argument("--output_base", required=True)
     parser.add_argument("--debug", action="store_true")
+    parser.add_argument("--model_path", default="yolo/best.pt")
+    parser.add_argument("--db_path", default="cctv_system.db", help="이벤트 종류를 읽어올 DB (없으면 기본 종류 사용)")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--model_server", action="store_true")
+    parser.add_argument("--server_batch", type=int, default=16)
+    parser.add_argument("--server_batch_timeout_ms", type=float, default=5.0)
+    parser.add_argument("--batch_size", type=int, default=1)
+    parser.add_argument("--inference_stride", type=int, default=1)
+    parser.add_argument("--motion_threshold", type=float, default=None)
+    parser.add_argument("--decode_queue_size", type=int, default=32)
+    parser.add_argument("--clip_writers", type=int, default=2)
+    parser.add_argument("--max_pending_clips", type=int, default=4)
+    parser.add_argument("--encode_preset", default="veryfast")
+    parser.add_argument("--no_previews", action="store_true", help="썸네일/스프라이트 시트를 만들지 않는다")
+    parser.add_argument("--hls", action="store_true", help="이벤트 클립을 여러 화질의 HLS로도 저장한다")
+    parser.add_argument("--no_checkpoint", action="store_true", help="진행 상황을 저장하지 않고 항상 처음부터 처리한다")
+    parser.add_argument("--checkpoint_seconds", type=float, default=CHECKPOINT_SECONDS)
+    parser.add_argument("--force", action="store_true", help="처리 완료 목록을 무시하고 모든 영상을 다시 처리한다")
     args = parser.parse_args()
 
-    video_paths = get_video_list(args.video_dir)
-    yolo_args = [(path, args.output_base, args.debug) for path in video_paths]
+    skip_list_path = os.path.join(args.output_base, SKIP_LIST_FILENAME)
+    skip_list = {} if args.force else load_skip_list(skip_list_path)
+    video_paths = []
+    for path in get_video_list(args.video_dir):
+        entry = skip_list.get(os.path.abspath(path))
+        if entry is not None and entry["video"] == video_fingerprint(path):
+            print(f"[Skip] 이미 처리한 영상: {path} (클립 {entry['clips']}개, {entry['finished_at']})")
+            continue
+        video_paths.append(path)
+    clipper_kwargs = {
+        "model_path": args.model_path,
+        "batch_size": args.batch_size,
+        "inference_stride": args.inference_stride,
+        "motion_threshold": args.motion_threshold,
+        "decode_queue_size": args.decode_queue_size,
+        "clip_writers": args.clip_writers,
+        "max_pending_clips": args.max_pending_clips,
+        "encode_preset": args.encode_preset,
+        "previews": not args.no_previews,
+        "hls": args.hls,
+        "event_types": load_event_types(args.db_path),
+        "checkpoint": not args.no_checkpoint,
+        "checkpoint_seconds": args.checkpoint_seconds,
+    }
+    yolo_args = [(path, args.output_base, args.debug, clipper_kwargs) for path in video_paths]
+    workers = max(1, min(args.workers, len(video_paths)))
+
+    server = None
+    pool_kwargs = {}
+    if args.model_server and video_paths:
+        # 모델은 서버 프로세스에만 올리고, 워커는 디코딩/클립 저장만 담당한다
+        server = ModelServer(args.model_path, workers, args.server_batch, args.server_batch_timeout_ms / 1000)
+        pool_kwargs = {"initializer": init_worker, "initargs": server.worker_initargs()}
 
-    with Pool(processes=4) as pool:
-        pool.starmap(YOLOEventClipper.run_for_path, yolo_args)
+    try:
+        with Pool(processes=workers, **pool_kwargs) as pool:
+            # 영상이 끝나는 대로 완료 목록에 기록해, 도중에 중단돼도 끝난 영상은 다시 처리하지 않는다
+            for video_path, clips, error in pool.imap_unordered(run_video_task, yolo_args):
+                if error is not None:
+                    print(f"[Error] {video_path} 처리 실패: {error}")
+                    continue
+                skip_list[os.path.abspath(video_path)] = {
+                    "video": video_fingerprint(video_path),
+                    "clips": clips,
+                    "finished_at": datetime.now().isoformat(timespec="seconds"),
+                }
+                os.makedirs(args.output_base, exist_ok=True)
+                save_skip_list(skip_list_path, skip_list)
+            pool.close()
+            pool.join()
+    finally:
+        if server is not None:
+            server.stop()
@@ -0,0 +1,54 @@
+import argparse
+import signal
+from detect import EVENT_TYPES_RELOAD_SECONDS, YOLOEventClipper, load_event_types
+
+if __name__ == "__main__":
+    # RTSP/HTTP 카메라 스트림을 계속 읽으며 이벤트가 끝나는 대로 클립을 저장한다 (Ctrl+C로 종료)
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--source", required=True, help="rtsp://... 주소, 카메라 번호 또는 --realtime과 함께 쓸 로컬 파일")
+    parser.add_argument("--output_dir", required=True)
+    parser.add_argument("--debug", action="store_true")
+    parser.add_argument("--model_path", default="yolo/best.pt")
+    parser.add_argument("--db_path", default="cctv_system.db", help="이벤트 종류를 읽어올 DB (없으면 기본 종류 사용)")
+    parser.add_argument("--realtime", action="store_true", help="로컬 파일을 원래 속도로 재생해 카메라 대신 쓴다")
+    parser.add_argument("--reconnect_delay", type=float, default=1.0)
+    parser.add_argument("--max_reconnect_delay", type=float, default=30.0)
+    parser.add_argument("--max_reconnects", type=int, default=None)
+    parser.add_argument("--max_lag_seconds", type=float, default=2.0)
+    parser.add_argument("--batch_size", type=int, default=1)
+    parser.add_argument("--inference_stride", type=int, default=1)
+    parser.add_argument("--motion_threshold", type=float, default=None)
+    parser.add_argument("--encode_preset", default="veryfast")
+    parser.add_argument("--no_previews", action="store_true", help="썸네일/스프라이트 시트를 만들지 않는다")
+    parser.add_argument("--hls", action="store_true", help="이벤트 클립을 여러 화질의 HLS로도 저장한다")
+    parser.add_argument("--event_types_reload_seconds", type=float, default=EVENT_TYPES_RELOAD_SECONDS,
+                        help="event_type 테이블을 다시 읽는 간격 (SIGHUP을 보내면 바로 다시 읽는다)")
+    args = parser.parse_args()
+
+    source = int(args.source) if args.source.isdigit() else args.source
+    clipper = YOLOEventClipper(
+        model_path=args.model_path,
+        video_path=source,
+        output_dir=args.output_dir,
+        batch_size=args.batch_size,
+        inference_stride=args.inference_stride,
+        motion_threshold=args.motion_threshold,
+        encode_preset=args.encode_preset,
+        previews=not args.no_previews,
+        hls=args.hls,
+        event_types=load_event_types(args.db_path),
+        event_types_db=args.db_path,
+        event_types_reload_seconds=args.event_types_reload_seconds,
+        stream=True,
+        realtime=args.realtime,
+        reconnect_delay=args.reconnect_delay,
+        max_reconnect_delay=args.max_reconnect_delay,
+        max_reconnects=args.max_reconnects,
+        max_lag_seconds=args.max_lag_seconds,
+        debug=args.debug,
+    )
+    signal.signal(signal.SIGINT, lambda *_: clipper.stop())
+    signal.signal(signal.SIGTERM, lambda *_: clipper.stop())
+    if hasattr(signal, "SIGHUP"):
+        signal.signal(signal.SIGHUP, lambda *_: clipper.reload_event_types())
+    clipper.run()